@@ -10,10 +10,20 @@ import base64
 import requests
 import re
 import subprocess
-from typing import Optional, List, Dict, Any, Tuple
+import threading
+from typing import Optional, List, Dict, Any, Tuple, Iterator
 from pathlib import Path
 from datetime import datetime
 
+from transcript import Transcript, get_transcript, load_transcript, fold_accents, tokenize
+from event_dedup import sweep_deduplicate, type_team_bucket, event_time_seconds
+import llm_cache
+import http_pool
+import provider_health
+import prompt_context
+import validation_pool
+import media_probe
+
 # ═══════════════════════════════════════════════════════════════════════════
 # KAKTTUS AI - Modelo local especializado em futebol brasileiro
 # ═══════════════════════════════════════════════════════════════════════════
@@ -82,6 +92,8 @@ OTHER_GAME_PHRASES = [
     "lá no castelão", "lá na arena", "resultado parcial",
     "outros jogos", "nas outras partidas"
 ]
+# Matched accent-insensitively (Whisper drops accents inconsistently)
+_OTHER_GAME_PHRASES_FOLDED = tuple(fold_accents(p) for p in OTHER_GAME_PHRASES)
 
 
 def clean_text_for_analysis(text: str) -> str:
@@ -95,24 +107,38 @@ def clean_text_for_analysis(text: str) -> str:
     return text
 
 
-def count_goal_hits(text: str) -> int:
+_GOAL_TOKEN_RE = re.compile(r"g[o]{1,8}l")
+_GOAL_WORD_RE = re.compile(r'\bgol\b(?!eiro)', re.IGNORECASE)
+
+
+def goal_token_stats(text: str) -> Tuple[int, bool]:
     """
-    Count goal mentions including emotional variations.
-    Pattern: g[o]{1,8}l captures: gol, gool, goool, gooool, etc.
-    Excludes 'goleiro'.
+    Tokenize once and return (goal tokens, mentions 'goleiro').
+    Goal tokens match g + 1-8 o's + l: gol, gool, goool, gooool, etc.
     """
-    t = clean_text_for_analysis(text)
-    t = re.sub(r"[^\w\s]", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
+    return _goal_token_stats(tokenize(text))
+
 
+def _goal_token_stats(tokens: List[str]) -> Tuple[int, bool]:
+    """goal_token_stats over already tokenized text (e.g. Transcript.tokens)."""
     hits = 0
-    for tok in t.split(" "):
-        if not tok:
-            continue
-        # Match g + 1-8 o's + l, but exclude "goleiro"
-        if re.fullmatch(r"g[o]{1,8}l", tok) and "goleiro" not in t:
+    has_goleiro = False
+    for tok in tokens:
+        if _GOAL_TOKEN_RE.fullmatch(tok):
             hits += 1
-    return hits
+        elif "goleiro" in tok:
+            has_goleiro = True
+    return hits, has_goleiro
+
+
+def count_goal_hits(text: str) -> int:
+    """
+    Count goal mentions including emotional variations.
+    Pattern: g[o]{1,8}l captures: gol, gool, goool, gooool, etc.
+    Excludes 'goleiro' (any mention zeroes the count).
+    """
+    hits, has_goleiro = goal_token_stats(text)
+    return 0 if has_goleiro else hits
 
 
 def intensity_score(text: str) -> int:
@@ -147,15 +173,30 @@ def looks_like_other_game_commentary(text: str) -> bool:
     Detect if text is about OTHER game (anti-false-positive).
     Returns True if it's commentary about another match.
     """
-    t = clean_text_for_analysis(text)
+    t = fold_accents(clean_text_for_analysis(text))
 
-    for p in OTHER_GAME_PHRASES:
+    for p in _OTHER_GAME_PHRASES_FOLDED:
         if p in t:
             return True
 
     return False
 
 
+def _other_game_lines(transcript: Transcript) -> List[bool]:
+    """looks_like_other_game_commentary for every line, in one pass over transcript.folded."""
+    flags = [False] * len(transcript.lines)
+    folded = transcript.folded
+    for p in _OTHER_GAME_PHRASES_FOLDED:
+        pos = folded.find(p)
+        while pos != -1:
+            line = transcript.line_at_offset(pos)
+            # Phrases crossing into the next line are left to the window check
+            if pos + len(p) <= transcript.offsets[line] + len(transcript.lines[line]):
+                flags[line] = True
+            pos = folded.find(p, pos + 1)
+    return flags
+
+
 def detect_teams_in_text(text: str) -> List[str]:
     """
     Detect all teams mentioned in text using KNOWN_TEAMS + TEAM_ALIASES.
@@ -480,7 +521,7 @@ def is_other_game_commentary(
 # KAKTTUS AI - Funções principais de análise
 # ═══════════════════════════════════════════════════════════════════════════
 
-def ask_kakttus(system: str, user: str, timeout: int = 120) -> str:
+def ask_kakttus(system: str, user: str, timeout: int = 120, use_cache: bool = True) -> str:
     """
     Chama Ollama com modelo Kakttus (washingtonlima/kakttus).
     
@@ -488,16 +529,18 @@ def ask_kakttus(system: str, user: str, timeout: int = 120) -> str:
         system: System prompt
         user: User prompt
         timeout: Timeout em segundos
+        use_cache: Reaproveitar resposta idêntica do cache persistente (llm_cache)
     
     Returns:
         Resposta da IA como string
     """
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
     payload = {
         "model": OLLAMA_MODEL,  # washingtonlima/kakttus
-        "messages": [
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
+        "messages": messages,
         "stream": False,
         "options": {
             "temperature": 0.1,
@@ -505,12 +548,18 @@ def ask_kakttus(system: str, user: str, timeout: int = 120) -> str:
         }
     }
     
-    try:
+    def _request() -> str:
         print(f"[Kakttus] Chamando {OLLAMA_MODEL} em {OLLAMA_URL}...")
-        r = requests.post(f"{OLLAMA_URL}/api/chat", json=payload, timeout=timeout)
+        r = http_pool.session('ollama').post(f"{OLLAMA_URL}/api/chat", json=payload, timeout=http_pool.timeout(timeout, 'ollama'))
         r.raise_for_status()
         data = r.json()
-        content = (data.get("message") or {}).get("content", "").strip()
+        return (data.get("message") or {}).get("content", "").strip()
+    
+    try:
+        content = llm_cache.cached_call(
+            'ollama', OLLAMA_MODEL, messages, _request,
+            temperature=0.1, max_tokens=4096, use_cache=use_cache
+        ) or ""
         print(f"[Kakttus] Resposta: {len(content)} chars")
         return content
     except requests.exceptions.Timeout:
@@ -564,26 +613,11 @@ def strip_srt_to_text(srt_content: str) -> str:
     Converte SRT para texto corrido, removendo timestamps e numeros de bloco.
     Se o texto ja for plain text (sem formato SRT), retorna como esta.
     """
-    lines = srt_content.strip().split('\n')
-    srt_timestamp = re.compile(r'\d{2}:\d{2}:\d{2}[,.]\d{3}\s*-->\s*\d{2}:\d{2}:\d{2}[,.]\d{3}')
-    block_number = re.compile(r'^\d+$')
-
-    has_srt = any(srt_timestamp.search(line) for line in lines[:20])
-    if not has_srt:
+    transcript = get_transcript(srt_content)
+    if not transcript.is_srt:
         return srt_content
 
-    text_lines = []
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        if block_number.match(line):
-            continue
-        if srt_timestamp.search(line):
-            continue
-        text_lines.append(line)
-
-    result = ' '.join(text_lines)
+    result = transcript.plain_text
     if len(srt_content) > 0:
         reduction = 100 - len(result) * 100 // len(srt_content)
         print(f"[SRT->TXT] Convertido: {len(srt_content)} chars SRT -> {len(result)} chars texto ({reduction}% menor)")
@@ -657,15 +691,6 @@ _GAME_END_PATTERNS = [
 ]
 
 
-def _parse_srt_timestamp_to_seconds(ts: str) -> float:
-    """Converte timestamp SRT (HH:MM:SS,mmm) para segundos."""
-    try:
-        parts = ts.replace(',', '.').split(':')
-        return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
-    except (ValueError, IndexError):
-        return 0.0
-
-
 def calculate_game_minute(video_second: float, boundaries: dict, game_start_minute: int = 0) -> tuple:
     """
     Converte segundo absoluto do vídeo para minuto de jogo.
@@ -728,6 +753,8 @@ def detect_match_periods_from_transcription(
 
     text_len = len(transcription_text)
     is_srt = '-->' in transcription_text[:1000]
+    # Parsed once (memoized by content) - timestamp lookups are bisects
+    transcript = get_transcript(transcription_text) if is_srt else None
 
     # ═══════════════════════════════════════════════════════════════
     # DETECTAR INÍCIO DO JOGO (primeiros 25% do texto)
@@ -751,13 +778,10 @@ def detect_match_periods_from_transcription(
         result['markers_found'].append({'type': 'game_start', **best_start})
 
         if is_srt:
-            ts_pat = re.compile(r'(\d{2}:\d{2}:\d{2}[,.]\d{3})\s*-->')
-            before_text = transcription_text[max(0, best_start['index'] - 500):best_start['index'] + 100]
-            ts_matches = list(ts_pat.finditer(before_text))
-            if ts_matches:
-                last_ts = ts_matches[-1].group(1)
-                result['game_start_second'] = _parse_srt_timestamp_to_seconds(last_ts)
-                print(f"[PERIOD-DETECT] ⚽ Início do jogo detectado: {result['game_start_second']:.0f}s ({last_ts})")
+            ts_seconds = transcript.timestamp_before(best_start['index'], 500, 100)
+            if ts_seconds is not None:
+                result['game_start_second'] = ts_seconds
+                print(f"[PERIOD-DETECT] ⚽ Início do jogo detectado: {result['game_start_second']:.0f}s")
         else:
             # TXT: buscar timestamps [MM:SS] ou "aos X minutos" próximo ao marcador
             before_text = transcription_text[max(0, best_start['index'] - 200):best_start['index'] + 100]
@@ -799,12 +823,9 @@ def detect_match_periods_from_transcription(
         result['markers_found'].append({'type': 'halftime_end', **best})
 
         if is_srt:
-            ts_pat = re.compile(r'(\d{2}:\d{2}:\d{2}[,.]\d{3})\s*-->')
-            before_text = transcription_text[max(0, best['index'] - 500):best['index']]
-            ts_matches = list(ts_pat.finditer(before_text))
-            if ts_matches:
-                last_ts = ts_matches[-1].group(1)
-                result['halftime_timestamp_seconds'] = _parse_srt_timestamp_to_seconds(last_ts)
+            ts_seconds = transcript.timestamp_before(best['index'], 500, 0)
+            if ts_seconds is not None:
+                result['halftime_timestamp_seconds'] = ts_seconds
         else:
             # TXT: buscar timestamps próximo ao marcador de halftime
             before_text = transcription_text[max(0, best['index'] - 200):best['index'] + 100]
@@ -845,13 +866,10 @@ def detect_match_periods_from_transcription(
 
                 # Extrair timestamp SRT do início do 2T
                 if is_srt:
-                    ts_pat = re.compile(r'(\d{2}:\d{2}:\d{2}[,.]\d{3})\s*-->')
-                    before_text = transcription_text[max(0, abs_pos - 500):abs_pos + 100]
-                    ts_matches = list(ts_pat.finditer(before_text))
-                    if ts_matches:
-                        last_ts = ts_matches[-1].group(1)
-                        result['second_half_start_second'] = _parse_srt_timestamp_to_seconds(last_ts)
-                        print(f"[PERIOD-DETECT] ⚽ Início do 2T detectado: {result['second_half_start_second']:.0f}s ({last_ts})")
+                    ts_seconds = transcript.timestamp_before(abs_pos, 500, 100)
+                    if ts_seconds is not None:
+                        result['second_half_start_second'] = ts_seconds
+                        print(f"[PERIOD-DETECT] ⚽ Início do 2T detectado: {result['second_half_start_second']:.0f}s")
                 else:
                     # TXT fallback
                     before_text = transcription_text[max(0, abs_pos - 200):abs_pos + 100]
@@ -883,13 +901,10 @@ def detect_match_periods_from_transcription(
         result['markers_found'].append({'type': 'game_end', **best_end})
 
         if is_srt:
-            ts_pat = re.compile(r'(\d{2}:\d{2}:\d{2}[,.]\d{3})\s*-->')
-            before_text = transcription_text[max(0, best_end['index'] - 500):best_end['index'] + 100]
-            ts_matches = list(ts_pat.finditer(before_text))
-            if ts_matches:
-                last_ts = ts_matches[-1].group(1)
-                result['game_end_second'] = _parse_srt_timestamp_to_seconds(last_ts)
-                print(f"[PERIOD-DETECT] 🏁 Fim do jogo detectado: {result['game_end_second']:.0f}s ({last_ts})")
+            ts_seconds = transcript.timestamp_before(best_end['index'], 500, 100)
+            if ts_seconds is not None:
+                result['game_end_second'] = ts_seconds
+                print(f"[PERIOD-DETECT] 🏁 Fim do jogo detectado: {result['game_end_second']:.0f}s")
         else:
             # TXT fallback
             before_text = transcription_text[max(0, best_end['index'] - 200):best_end['index'] + 100]
@@ -911,11 +926,7 @@ def detect_match_periods_from_transcription(
             result['extra_time_index'] = abs_pos
 
             if is_srt:
-                ts_pat = re.compile(r'(\d{2}:\d{2}:\d{2}[,.]\d{3})\s*-->')
-                before_text = transcription_text[max(0, abs_pos - 500):abs_pos]
-                ts_matches = list(ts_pat.finditer(before_text))
-                if ts_matches:
-                    result['extra_time_timestamp_seconds'] = _parse_srt_timestamp_to_seconds(ts_matches[-1].group(1))
+                result['extra_time_timestamp_seconds'] = transcript.timestamp_before(abs_pos, 500, 0)
 
             snippet = transcription_text[max(0, abs_pos - 20):abs_pos + 40]
             result['markers_found'].append({
@@ -1081,10 +1092,20 @@ def analyze_with_kakttus(
     # ═══════════════════════════════════════════════════════════════
     # FALLBACK: Pipeline legado (transcrição inteira)
     # ═══════════════════════════════════════════════════════════════
+    # Janelas relevantes (candidatos + gols) com timestamps, dentro do orçamento de tokens
+    context = prompt_context.build_relevance_context(
+        transcript, home_team, away_team,
+        token_budget=prompt_context.TOKEN_BUDGETS['kakttus'],
+        half=match_half
+    )
     max_chars = 50000
-    transcript_truncated = transcript_clean[:max_chars] if len(transcript_clean) > max_chars else transcript_clean
-    if len(transcript_clean) > max_chars:
-        print(f"[Kakttus] Transcrição truncada: {len(transcript)} → {max_chars} chars")
+    if context['compressed']:
+        transcript_truncated = context['text']
+    else:
+        transcript_truncated = transcript_clean[:max_chars] if len(transcript_clean) > max_chars else transcript_clean
+        if len(transcript_clean) > max_chars:
+            print(f"[Kakttus] Transcrição truncada: {len(transcript)} → {max_chars} chars")
+            context['prompt_tokens'] = prompt_context.estimate_tokens(transcript_truncated)
     
     system_prompt = (
         "Você é a IA Kakttus, especialista em futebol, usando raciocínio tático e contextual. "
@@ -1120,7 +1141,10 @@ Retorne neste formato:
 }}
 """.strip()
     
+    import time
+    started = time.time()
     raw = ask_kakttus(system_prompt, user_prompt)
+    prompt_stats = prompt_context.record_prompt_stats('analyze_with_kakttus', match_half, context, started, bool(raw))
     
     if not raw:
         print(f"[Kakttus] ⚠ Sem resposta, retornando vazio")
@@ -1145,7 +1169,7 @@ Retorne neste formato:
     for g in goals[:5]:
         print(f"[Kakttus] ⚽ GOL: {g.get('team', 'unknown')} - {g.get('detail', '')[:50]}")
     
-    return {"events": events, "summary": summary, "tactical": tactical}
+    return {"events": events, "summary": summary, "tactical": tactical, "prompt_stats": prompt_stats}
 
 
 def consolidate_match_analysis(
@@ -2096,19 +2120,17 @@ def refine_event_timestamp_from_srt(
     ai_total_seconds = ai_minute * 60 + ai_second
     
     try:
-        with open(srt_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Parse SRT blocks: find timestamps and text
-        # Format: HH:MM:SS,mmm --> HH:MM:SS,mmm
-        srt_pattern = r'(\d{2}):(\d{2}):(\d{2}),\d{3}\s*-->\s*\d{2}:\d{2}:\d{2},\d{3}\s*\n(.*?)(?=\n\n|\Z)'
-        matches = re.findall(srt_pattern, content, re.DOTALL)
+        # Parsed SRT shared with the other detectors (memoized per file version)
+        transcript = load_transcript(srt_path)
         
         best_match = None
         best_distance = float('inf')
         
-        for hours, minutes, seconds, text in matches:
-            srt_total_seconds = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+        # Only blocks starting inside the ±window (bisect on block start times)
+        candidate_range = transcript.blocks_between(ai_total_seconds - window_seconds, ai_total_seconds + window_seconds + 0.999)
+        for block_index in candidate_range:
+            _, hours, minutes, seconds, _, text = transcript.blocks[block_index]
+            srt_total_seconds = hours * 3600 + minutes * 60 + seconds
             
             # Check if within window
             distance = abs(srt_total_seconds - ai_total_seconds)
@@ -2220,47 +2242,14 @@ def deduplicate_events(events: List[Dict], threshold_seconds: int = 60) -> List[
     if not events:
         return []
     
-    # Sort by timestamp - use videoSecond if available, otherwise calculate from minute
-    sorted_events = sorted(events, key=lambda e: e.get('videoSecond') or ((e.get('minute') or 0) * 60 + (e.get('second') or 0)))
-    
-    result = []
-    
-    for event in sorted_events:
-        event_type = event.get('event_type')
-        event_team = event.get('team', 'unknown')
-        event_time = event.get('videoSecond') or ((event.get('minute') or 0) * 60 + (event.get('second') or 0))
-        
-        # Check if there's already an event of the SAME TYPE AND TEAM too close
-        is_duplicate = False
-        duplicate_index = -1
-        
-        for i, existing in enumerate(result):
-            existing_type = existing.get('event_type')
-            existing_team = existing.get('team', 'unknown')
-            
-            # Only compare same type AND same team
-            if existing_type == event_type and existing_team == event_team:
-                existing_time = existing.get('videoSecond') or ((existing.get('minute') or 0) * 60 + (existing.get('second') or 0))
-                time_diff = abs(event_time - existing_time)
-                
-                if time_diff < threshold_seconds:
-                    # Same type, same team, too close - it's a duplicate
-                    is_duplicate = True
-                    duplicate_index = i
-                    
-                    # Keep the one with higher confidence
-                    curr_conf = event.get('confidence', 0)
-                    existing_conf = existing.get('confidence', 0)
-                    
-                    if curr_conf > existing_conf:
-                        result[duplicate_index] = event  # Replace with higher confidence
-                        print(f"[DEDUP] ♻️ Substituindo duplicata: {event_type} @ {event_time}s (conf: {existing_conf:.2f} → {curr_conf:.2f})")
-                    else:
-                        print(f"[DEDUP] ⚠️ Ignorando duplicata: {event_type} {event_team} @ {event_time}s (Δ{time_diff:.0f}s)")
-                    break
-        
-        if not is_duplicate:
-            result.append(event)
+    # Sweep-line: only the last kept event of each (type, team) can collide
+    result, _ = sweep_deduplicate(
+        events,
+        threshold_seconds=threshold_seconds,
+        bucket_key=type_team_bucket,
+        time_key=event_time_seconds,
+        policy='confidence'
+    )
     
     print(f"[DEDUP] ✓ {len(events)} eventos → {len(result)} após deduplicação (threshold: {threshold_seconds}s)")
     return result
@@ -2274,7 +2263,8 @@ def detect_goals_by_sliding_window(
     half: str = 'first',
     window_size: int = 5,
     min_goal_mentions: int = 3,
-    min_block_gap: int = 5
+    min_block_gap: int = 5,
+    transcript: Transcript = None
 ) -> List[Dict[str, Any]]:
     """
     Detecta gols REAIS analisando repetição em janela deslizante de 5 linhas.
@@ -2303,15 +2293,14 @@ def detect_goals_by_sliding_window(
         window_size: Tamanho da janela (padrão: 5 linhas)
         min_goal_mentions: Mínimo de menções de "gol" para confirmar (padrão: 3)
         min_block_gap: Espaçamento mínimo entre gols do mesmo time (padrão: 5 blocos)
+        transcript: Transcript de onde vieram os srt_blocks (opcional) - tokens,
+            janelas e frases de outro jogo saem das views já normalizadas
     
     Returns:
         Lista de eventos de gol detectados
     """
     goals = []
     
-    # Padrão para contar "gol" (excluindo "goleiro")
-    goal_pattern = r'\bgol\b(?!eiro)'
-    
     # Track último bloco de gol por time para evitar duplicatas
     last_goal_block = {'home': -10, 'away': -10, 'unknown': -10}
     
@@ -2321,39 +2310,78 @@ def detect_goals_by_sliding_window(
     print(f"[SlidingWindow]   Espaçamento mínimo: {min_block_gap} blocos")
     print(f"[SlidingWindow]   Total de blocos: {len(srt_blocks)}")
     
-    for i in range(len(srt_blocks)):
-        # Criar janela: 2 antes + atual + 2 depois (5 linhas total)
-        start = max(0, i - 2)
-        end = min(len(srt_blocks), i + 3)
-        window = srt_blocks[start:end]
+    # ═══════════════════════════════════════════════════════════════
+    # Estatísticas por bloco (tokenização única por bloco):
+    # - tokens de gol (g+o+l), menção a "goleiro", hits do regex simples,
+    #   frase de "outro jogo"
+    # Blocos são unidos por espaço, então nenhuma contagem cruza blocos
+    # e o total da janela é a soma dos blocos.
+    # ═══════════════════════════════════════════════════════════════
+    n = len(srt_blocks)
+    texts = [b[5] for b in srt_blocks]
+    if transcript is not None:
+        block_tokens = transcript.tokens
+        other_game_flags = _other_game_lines(transcript)
+    else:
+        block_tokens = [tokenize(text) for text in texts]
+        other_game_flags = [looks_like_other_game_commentary(text) for text in texts]
+    token_hits = [0] * n
+    goleiro_flags = [0] * n
+    word_hits = [0] * n
+    for idx, text in enumerate(texts):
+        token_hits[idx], has_goleiro = _goal_token_stats(block_tokens[idx])
+        goleiro_flags[idx] = 1 if has_goleiro else 0
+        word_hits[idx] = len(_GOAL_WORD_RE.findall(text))
+    
+    # Janela: half antes + atual + half depois (5 linhas → 2 + 1 + 2)
+    half_w = window_size // 2
+    win_tokens = win_goleiro = win_words = 0
+    win_start, win_end = 0, 0
+    
+    for i in range(n):
+        start = max(0, i - half_w)
+        end = min(n, i + half_w + 1)
+        
+        # Atualizar totais da janela incrementalmente (entra à direita, sai à esquerda)
+        while win_end < end:
+            win_tokens += token_hits[win_end]
+            win_goleiro += goleiro_flags[win_end]
+            win_words += word_hits[win_end]
+            win_end += 1
+        while win_start < start:
+            win_tokens -= token_hits[win_start]
+            win_goleiro -= goleiro_flags[win_start]
+            win_words -= word_hits[win_start]
+            win_start += 1
+        
+        # Contar "gol" (excluindo "goleiro") - equivalente a count_goal_hits(janela)
+        goal_count = 0 if win_goleiro else win_tokens
+        
+        # Fallback: regex simples se a contagem por tokens for 0
+        if goal_count == 0:
+            goal_count = win_words
+        
+        # Critério 1: mínimo de menções (filtro barato antes de montar a janela)
+        if goal_count < min_goal_mentions:
+            continue
         
-        # Concatenar texto da janela
-        window_text = ' '.join([b[5] for b in window]).lower()
+        if transcript is not None:
+            window_text = transcript.window_text(start, end, 'lower')
+        else:
+            window_text = ' '.join(texts[start:end]).lower()
         
         # ═══════════════════════════════════════════════════════════════
         # NOVO: Filtro Anti-Times-Externos
-        # Se mencionar time que NÃO está jogando, é sobre outro jogo
+        # Se mencionar time que NÃO está jogando, é sobre outro jogo.
+        # Avaliado no texto da janela (frases/times podem cruzar blocos).
         # ═══════════════════════════════════════════════════════════════
         if is_other_game_commentary(window_text, home_team, away_team):
             print(f"[SlidingWindow] ⚠ Bloco {i}: Gol ignorado (menciona time externo ou outro jogo)")
             continue
         
-        # Contar "gol" (excluindo "goleiro") - usar função avançada
-        goal_count = count_goal_hits(window_text)
-        
-        # Fallback: usar regex simples se count_goal_hits retornar 0
-        if goal_count == 0:
-            goal_count = len(re.findall(goal_pattern, window_text, re.IGNORECASE))
-        
-        # Critério 1: mínimo de menções
-        if goal_count < min_goal_mentions:
-            continue
-        
-        # Extrair features avançadas da janela
-        features = window_goal_features(window)
-        
-        # Critério extra: verificar frases de "outro jogo"
-        if features['other_game_phrase']:
+        # Critério extra: frases de "outro jogo" em algum bloco da janela
+        # (mesmo critério de window_goal_features, pré-calculado por bloco)
+        if any(other_game_flags[start:end]):
             print(f"[SlidingWindow] ⚠ Bloco {i}: Gol ignorado (frase de outro jogo detectada)")
             continue
         
@@ -2453,7 +2481,8 @@ def detect_events_by_keywords(
     home_team: str,
     away_team: str,
     half: str = 'first',
-    segment_start_minute: int = 0
+    segment_start_minute: int = 0,
+    transcript: Transcript = None
 ) -> List[Dict[str, Any]]:
     """
     Detect events using keywords from SRT file.
@@ -2472,44 +2501,29 @@ def detect_events_by_keywords(
         away_team: Away team name
         half: 'first' or 'second'
         segment_start_minute: Starting minute for game time (0 for first, 45 for second)
+        transcript: Already parsed Transcript (default: load_transcript(srt_path))
     
     Returns:
         List of events with precise timestamps
     """
     events = []
     
-    # Read SRT file
-    try:
-        with open(srt_path, 'r', encoding='utf-8') as f:
-            srt_content = f.read()
-    except Exception as e:
-        print(f"[KEYWORDS] ❌ Erro ao ler SRT: {e}")
-        return []
+    # Read + parse SRT file (memoized per file version)
+    if transcript is None:
+        try:
+            transcript = load_transcript(srt_path)
+        except Exception as e:
+            print(f"[KEYWORDS] ❌ Erro ao ler SRT: {e}")
+            return []
     
     print(f"[KEYWORDS] 🔍 Iniciando detecção por palavras-chave...")
     print(f"[KEYWORDS] SRT: {srt_path}")
     print(f"[KEYWORDS] Times: {home_team} vs {away_team}")
     print(f"[KEYWORDS] Tempo: {half} (minuto inicial: {segment_start_minute})")
     
-    # Regex to extract SRT blocks: index, timestamp, text
-    # Format: "1\n00:24:45,000 --> 00:24:50,000\nText here\n\n"
-    pattern = r'(\d+)\n(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*\d{2}:\d{2}:\d{2},\d{3}\n(.+?)(?=\n\n|\Z)'
-    
-    matches = list(re.finditer(pattern, srt_content, re.DOTALL))
-    print(f"[KEYWORDS] 📄 Encontrados {len(matches)} blocos de legenda no SRT")
-    
-    # Pre-parse all blocks for context analysis
-    srt_blocks = []
-    for match in matches:
-        block_data = (
-            int(match.group(1)),    # index
-            int(match.group(2)),    # hours
-            int(match.group(3)),    # minutes
-            int(match.group(4)),    # seconds
-            int(match.group(5)),    # milliseconds
-            match.group(6).replace('\n', ' ').strip()  # text
-        )
-        srt_blocks.append(block_data)
+    # SRT blocks: (index, hours, minutes, seconds, ms, text)
+    srt_blocks = transcript.blocks
+    print(f"[KEYWORDS] 📄 Encontrados {len(srt_blocks)} blocos de legenda no SRT")
     
     # ═══════════════════════════════════════════════════════════════
     # GOLS: Usar algoritmo de janela deslizante (mais preciso)
@@ -2522,7 +2536,8 @@ def detect_events_by_keywords(
         half=half,
         window_size=5,
         min_goal_mentions=3,
-        min_block_gap=20
+        min_block_gap=20,
+        transcript=transcript
     )
     events.extend(goal_events)
     print(f"[KEYWORDS] 🎯 {len(goal_events)} gols detectados por sliding window")
@@ -2545,8 +2560,7 @@ def detect_events_by_keywords(
         # ═══════════════════════════════════════════════════════════════
         window_start = max(0, block_index - 2)
         window_end = min(len(srt_blocks), block_index + 3)
-        window_blocks = srt_blocks[window_start:window_end]
-        window_text = ' '.join([b[5] for b in window_blocks])
+        window_text = transcript.window_text(window_start, window_end)
         
         # Search for keywords (SKIP GOALS - already handled by sliding window)
         for event_type, keywords in EVENT_KEYWORDS.items():
@@ -2711,6 +2725,16 @@ except Exception as e:
 # Enable by default if library is installed, or via env var
 LOCAL_WHISPER_ENABLED = _FASTER_WHISPER_AVAILABLE or os.environ.get('LOCAL_WHISPER_ENABLED', 'false').lower() == 'true'
 LOCAL_WHISPER_MODEL = os.environ.get('LOCAL_WHISPER_MODEL', 'base')
+# Parallel CPU transcription: N worker processes, each with its own int8 model
+# (0/1 = serial, single global model). cpu_threads 0 = cores / workers.
+LOCAL_WHISPER_WORKERS = int(os.environ.get('LOCAL_WHISPER_WORKERS', '0') or 0)
+LOCAL_WHISPER_CPU_THREADS = int(os.environ.get('LOCAL_WHISPER_CPU_THREADS', '0') or 0)
+# Inference mode: 'auto' (single file < 50MB, else chunked), 'chunked' (45s chunks)
+# or 'batched' (VAD once over the whole audio + BatchedInferencePipeline)
+LOCAL_WHISPER_MODE = os.environ.get('LOCAL_WHISPER_MODE', 'auto')
+LOCAL_WHISPER_BATCH_SIZE = int(os.environ.get('LOCAL_WHISPER_BATCH_SIZE', '16') or 16)
+# Batched mode hands segments to streaming consumers in groups of this size
+BATCHED_EMIT_EVERY = 20
 
 LOVABLE_API_URL = 'https://ai.gateway.lovable.dev/v1/chat/completions'
 OPENAI_API_URL = 'https://api.openai.com/v1'
@@ -2725,10 +2749,6 @@ print(f"[AI Services] GOOGLE_API_KEY: {'✓ configurada' if GOOGLE_API_KEY else
 print(f"[AI Services] LOCAL_WHISPER: {'✓ disponível' if LOCAL_WHISPER_ENABLED else '✗ não disponível'}")
 print(f"[AI Services] =====================================\n")
 
-# Faster-Whisper model cache (singleton)
-_whisper_model = None
-_whisper_model_name = None
-
 
 def set_api_keys(
     lovable_key: str = None, 
@@ -2742,13 +2762,19 @@ def set_api_keys(
     openai_enabled: bool = None,
     elevenlabs_enabled: bool = None,
     local_whisper_enabled: bool = None,
-    local_whisper_model: str = None
+    local_whisper_model: str = None,
+    local_whisper_workers: int = None,
+    local_whisper_cpu_threads: int = None,
+    local_whisper_mode: str = None,
+    local_whisper_batch_size: int = None
 ):
     """Set API keys programmatically."""
     global LOVABLE_API_KEY, OPENAI_API_KEY, ELEVENLABS_API_KEY, GOOGLE_API_KEY
     global OLLAMA_URL, OLLAMA_MODEL, OLLAMA_ENABLED
     global GEMINI_ENABLED, OPENAI_ENABLED, ELEVENLABS_ENABLED
     global LOCAL_WHISPER_ENABLED, LOCAL_WHISPER_MODEL
+    global LOCAL_WHISPER_WORKERS, LOCAL_WHISPER_CPU_THREADS
+    global LOCAL_WHISPER_MODE, LOCAL_WHISPER_BATCH_SIZE
     if lovable_key:
         LOVABLE_API_KEY = lovable_key
     if openai_key:
@@ -2773,6 +2799,14 @@ def set_api_keys(
         LOCAL_WHISPER_ENABLED = local_whisper_enabled
     if local_whisper_model is not None:
         LOCAL_WHISPER_MODEL = local_whisper_model
+    if local_whisper_workers is not None:
+        LOCAL_WHISPER_WORKERS = local_whisper_workers
+    if local_whisper_cpu_threads is not None:
+        LOCAL_WHISPER_CPU_THREADS = local_whisper_cpu_threads
+    if local_whisper_mode is not None:
+        LOCAL_WHISPER_MODE = local_whisper_mode
+    if local_whisper_batch_size is not None:
+        LOCAL_WHISPER_BATCH_SIZE = local_whisper_batch_size
 
 
 def call_ollama(
@@ -2780,7 +2814,8 @@ def call_ollama(
     model: str = None,
     temperature: float = 0.7,
     max_tokens: int = 4096,
-    format: str = None  # NOVO: "json" para forçar resposta JSON válida
+    format: str = None,  # NOVO: "json" para forçar resposta JSON válida
+    use_cache: Optional[bool] = None
 ) -> Optional[str]:
     """
     Call local Ollama API.
@@ -2791,11 +2826,28 @@ def call_ollama(
         temperature: Sampling temperature
         max_tokens: Maximum tokens in response
         format: Response format - "json" forces valid JSON output (recommended for structured extraction)
+        use_cache: llm_cache mode - None caches low-temperature calls only,
+            True opts in at any temperature, False skips the cache
     
     Returns:
         The AI response text or None on error
     """
     model = model or OLLAMA_MODEL
+    return llm_cache.cached_call(
+        'ollama', model, messages,
+        lambda: _request_ollama(messages, model, temperature, max_tokens, format),
+        temperature=temperature, max_tokens=max_tokens, format=format, use_cache=use_cache
+    )
+
+
+def _request_ollama(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    format: Optional[str]
+) -> Optional[str]:
+    """Uncached Ollama /api/chat request (see call_ollama)."""
     url = f"{OLLAMA_URL}/api/chat"
     
     # Preparar payload
@@ -2815,10 +2867,10 @@ def call_ollama(
         print(f"[Ollama] Modo JSON nativo ativado para resposta estruturada")
     
     try:
-        response = requests.post(
+        response = http_pool.session('ollama').post(
             url,
             json=payload,
-            timeout=300
+            timeout=http_pool.timeout('local_chat', 'ollama')
         )
         
         if not response.ok:
@@ -2839,7 +2891,8 @@ def call_google_gemini(
     messages: List[Dict[str, str]],
     model: str = 'gemini-2.5-flash',
     temperature: float = 0.7,
-    max_tokens: int = 4096
+    max_tokens: int = 4096,
+    use_cache: Optional[bool] = None
 ) -> Optional[str]:
     """
     Call Google Gemini API directly.
@@ -2849,6 +2902,8 @@ def call_google_gemini(
         model: Model to use (default: gemini-2.5-flash)
         temperature: Sampling temperature
         max_tokens: Maximum tokens in response
+        use_cache: llm_cache mode - None caches low-temperature calls only,
+            True opts in at any temperature, False skips the cache
     
     Returns:
         The AI response text or None on error
@@ -2856,6 +2911,50 @@ def call_google_gemini(
     if not GOOGLE_API_KEY:
         raise ValueError("GOOGLE_API_KEY not configured")
     
+    return llm_cache.cached_call(
+        'gemini', model, messages,
+        lambda: _request_google_gemini(messages, model, temperature, max_tokens),
+        temperature=temperature, max_tokens=max_tokens, use_cache=use_cache
+    )
+
+
+def _request_google_gemini(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int
+) -> Optional[str]:
+    """Uncached Gemini generateContent request (see call_google_gemini)."""
+    api_model, payload = _build_gemini_payload(messages, model, temperature, max_tokens)
+    url = f"{GOOGLE_API_URL}/models/{api_model}:generateContent?key={GOOGLE_API_KEY}"
+    
+    try:
+        response = http_pool.session('gemini').post(url, json=payload, timeout=http_pool.timeout('chat', 'gemini'))
+        
+        if not response.ok:
+            print(f"Google Gemini error: {response.status_code} - {response.text}")
+            return None
+        
+        data = response.json()
+        candidates = data.get('candidates', [])
+        if candidates:
+            content = candidates[0].get('content', {})
+            parts = content.get('parts', [])
+            if parts:
+                return parts[0].get('text', '')
+        return None
+    except Exception as e:
+        print(f"Google Gemini request error: {e}")
+        return None
+
+
+def _build_gemini_payload(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int
+) -> Tuple[str, Dict[str, Any]]:
+    """(api_model, generateContent payload) for chat messages."""
     # Map model names
     model_map = {
         'gemini-2.5-flash': 'gemini-2.0-flash',
@@ -2893,26 +2992,7 @@ def call_google_gemini(
     if system_instruction:
         payload['systemInstruction'] = {'parts': [{'text': system_instruction}]}
     
-    url = f"{GOOGLE_API_URL}/models/{api_model}:generateContent?key={GOOGLE_API_KEY}"
-    
-    try:
-        response = requests.post(url, json=payload, timeout=120)
-        
-        if not response.ok:
-            print(f"Google Gemini error: {response.status_code} - {response.text}")
-            return None
-        
-        data = response.json()
-        candidates = data.get('candidates', [])
-        if candidates:
-            content = candidates[0].get('content', {})
-            parts = content.get('parts', [])
-            if parts:
-                return parts[0].get('text', '')
-        return None
-    except Exception as e:
-        print(f"Google Gemini request error: {e}")
-        return None
+    return api_model, payload
 
 
 def get_ai_status() -> Dict[str, Any]:
@@ -3028,15 +3108,243 @@ def get_ai_priority_order(settings: Dict[str, str] = None) -> List[str]:
     return result
 
 
+def _provider_ready(provider: str) -> bool:
+    """Provider is enabled and has its credentials (priority routing rules)."""
+    if provider == 'ollama':
+        return OLLAMA_ENABLED
+    if provider == 'lovable':
+        return bool(LOVABLE_API_KEY)
+    if provider == 'gemini':
+        return GEMINI_ENABLED and bool(GOOGLE_API_KEY)
+    if provider == 'openai':
+        return OPENAI_ENABLED and bool(OPENAI_API_KEY)
+    return False
+
+
+def _call_provider(
+    provider: str,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    use_cache: Optional[bool] = None
+) -> Optional[str]:
+    """Dispatch one chat completion to a provider (no routing, no health tracking)."""
+    if provider == 'ollama':
+        return call_ollama(messages, model=OLLAMA_MODEL, temperature=temperature, max_tokens=max_tokens, use_cache=use_cache)
+    if provider == 'lovable':
+        return call_lovable_ai(messages, model, temperature, max_tokens, use_cache=use_cache)
+    if provider == 'gemini':
+        return call_google_gemini(messages, model, temperature, max_tokens, use_cache=use_cache)
+    if provider == 'openai':
+        return call_openai(messages, 'gpt-4o-mini', temperature, max_tokens, use_cache=use_cache)
+    return None
+
+
+def _call_provider_tracked(
+    provider: str,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    use_cache: Optional[bool] = None
+) -> Optional[str]:
+    """_call_provider + outcome/latency recorded in the provider's circuit breaker."""
+    import time
+    
+    started = time.time()
+    try:
+        result = _call_provider(provider, messages, model, temperature, max_tokens, use_cache=use_cache)
+    except Exception as e:
+        provider_health.record_failure(provider, time.time() - started, e)
+        raise
+    if result and llm_cache.last_call_was_hit():
+        # Answered from llm_cache: says nothing about the provider's health/latency
+        provider_health.release(provider)
+    elif result:
+        provider_health.record_success(provider, time.time() - started)
+    else:
+        provider_health.record_failure(provider, time.time() - started, 'empty response')
+    return result
+
+
+# Hedged mode: start the next provider when the current one has not answered
+# within its p90 latency (or HEDGE_DEFAULT_DELAY before there are samples)
+HEDGE_PERCENTILE = 0.9
+HEDGE_MIN_DELAY = float(os.environ.get('AI_HEDGE_MIN_DELAY', '1.0') or 1.0)
+HEDGE_DEFAULT_DELAY = float(os.environ.get('AI_HEDGE_DEFAULT_DELAY', '6.0') or 6.0)
+
+
+def _hedge_delay(provider: str) -> float:
+    latency = provider_health.latency_percentile(provider, HEDGE_PERCENTILE)
+    if latency is None:
+        return HEDGE_DEFAULT_DELAY
+    return max(HEDGE_MIN_DELAY, latency)
+
+
+HEDGE_MAX_WORKERS = int(os.environ.get('AI_HEDGE_MAX_WORKERS', '8') or 8)
+_hedge_executor = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _get_hedge_executor():
+    """Shared bounded thread pool for hedged provider calls (created on first use)."""
+    global _hedge_executor
+    if _hedge_executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        with _hedge_executor_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix='ai-hedge')
+    return _hedge_executor
+
+
+def _call_provider_abortable(
+    provider: str,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    cancel_event: threading.Event
+) -> Optional[str]:
+    """
+    One hedged provider call, streamed so it can be aborted: once cancel_event
+    is set the stream is closed at the next chunk, which closes the HTTP
+    response and makes the provider (e.g. a local Ollama) stop generating.
+    Outcome/latency are recorded in the provider's circuit breaker.
+    """
+    import time
+    
+    started = time.time()
+    if cancel_event.is_set():
+        provider_health.release(provider)
+        return None
+    
+    chunks = _stream_provider(provider, messages, model, temperature, max_tokens)
+    parts = []
+    try:
+        for chunk in chunks:
+            if cancel_event.is_set():
+                provider_health.release(provider)
+                return None
+            parts.append(chunk)
+    except Exception as e:
+        if cancel_event.is_set():
+            provider_health.release(provider)
+            return None
+        provider_health.record_failure(provider, time.time() - started, e)
+        raise
+    finally:
+        chunks.close()
+    
+    result = ''.join(parts)
+    if result:
+        provider_health.record_success(provider, time.time() - started)
+    else:
+        provider_health.record_failure(provider, time.time() - started, 'empty response')
+    return result
+
+
+def _call_ai_hedged(
+    candidates: List[str],
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    use_cache: Optional[bool] = None
+) -> Optional[str]:
+    """
+    Hedged requests over candidates (in priority order): fire the first,
+    add the next one each time the hedge delay passes without an answer
+    (or immediately when everything in flight failed) and return the first
+    non-empty result. The losing calls are aborted (their streams closed),
+    not waited for. The race as a whole goes through llm_cache.
+    """
+    return llm_cache.cached_call(
+        'hedged', model, messages,
+        lambda: _race_providers(candidates, messages, model, temperature, max_tokens),
+        temperature=temperature, max_tokens=max_tokens, use_cache=use_cache
+    )
+
+
+def _race_providers(
+    candidates: List[str],
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int
+) -> Optional[str]:
+    import time
+    from concurrent.futures import wait, FIRST_COMPLETED
+    
+    queue = list(candidates)
+    in_flight = {}
+    executor = _get_hedge_executor()
+    cancel_event = threading.Event()
+    
+    def launch() -> Optional[float]:
+        """Start the next allowed provider; returns its hedge deadline."""
+        while queue:
+            provider = queue.pop(0)
+            if not provider_health.allow(provider):
+                print(f"[AI] ⏭ {provider} skipped (circuit open)")
+                continue
+            label = 'Hedge' if in_flight else 'Trying'
+            print(f"[AI] {label} {provider}...")
+            future = executor.submit(
+                _call_provider_abortable, provider, messages, model, temperature, max_tokens, cancel_event
+            )
+            in_flight[future] = provider
+            return time.time() + _hedge_delay(provider)
+        return None
+    
+    try:
+        deadline = launch()
+        while in_flight:
+            wait_for = max(0.0, deadline - time.time()) if (queue and deadline) else None
+            done, _ = wait(list(in_flight), timeout=wait_for, return_when=FIRST_COMPLETED)
+            
+            if not done:
+                print(f"[AI] ⏱ No answer after hedge delay, starting next provider")
+                deadline = launch() or deadline
+                continue
+            
+            for future in done:
+                provider = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"[AI] ✗ {provider} failed: {e}")
+                    continue
+                if result:
+                    if in_flight:
+                        print(f"[AI] ✓ Success with {provider} (hedged, aborting {', '.join(in_flight.values())})")
+                    else:
+                        print(f"[AI] ✓ Success with {provider}")
+                    return result
+            
+            if not in_flight:
+                deadline = launch()
+        
+        print(f"[AI] ⚠ All AI providers failed (hedged mode)")
+        return None
+    finally:
+        # Losing calls close their streams at the next chunk; queued ones never start
+        cancel_event.set()
+
+
 def call_ai(
     messages: List[Dict[str, str]],
     model: str = 'gemini-2.5-flash',
     temperature: float = 0.7,
     max_tokens: int = 4096,
-    settings: Dict[str, str] = None
+    settings: Dict[str, str] = None,
+    use_cache: Optional[bool] = None,
+    hedged: bool = False
 ) -> Optional[str]:
     """
     Universal AI caller with dynamic priority from database settings.
+    Providers whose circuit breaker is open (recent failures / timeouts)
+    are skipped immediately instead of waiting for their timeout.
     
     Args:
         messages: List of message dicts
@@ -3044,46 +3352,43 @@ def call_ai(
         temperature: Sampling temperature
         max_tokens: Maximum tokens
         settings: Optional settings dict with priority configuration
+        use_cache: llm_cache mode - None caches low-temperature calls only,
+            True opts in at any temperature, False skips the cache
+        hedged: Latency-critical calls - start the next provider if the
+            current one is slower than its p90 latency, first answer wins
     
     Returns:
         AI response text or None
     """
     priority_order = get_ai_priority_order(settings)
-    print(f"[AI] Priority order: {' → '.join(priority_order)}")
+    print(f"[AI] Priority order: {' → '.join(priority_order)}" + (" (hedged)" if hedged else ""))
+    
+    if hedged:
+        candidates = [p for p in priority_order if _provider_ready(p)]
+        candidates += [
+            provider for provider, api_key in (
+                ('lovable', LOVABLE_API_KEY), ('gemini', GOOGLE_API_KEY), ('openai', OPENAI_API_KEY)
+            )
+            if api_key and provider not in priority_order
+        ]
+        return _call_ai_hedged(candidates, messages, model, temperature, max_tokens, use_cache=use_cache)
     
     last_error = None
     result = None
     
     for provider in priority_order:
+        if not _provider_ready(provider):
+            print(f"[AI] ⚠ {provider} not available (disabled or no API key)")
+            continue
+        if not provider_health.allow(provider):
+            print(f"[AI] ⏭ {provider} skipped (circuit open)")
+            continue
         try:
             print(f"[AI] Trying {provider}...")
-            
-            if provider == 'ollama' and OLLAMA_ENABLED:
-                result = call_ollama(messages, model=OLLAMA_MODEL, temperature=temperature, max_tokens=max_tokens)
-                if result:
-                    print(f"[AI] ✓ Success with Ollama ({OLLAMA_MODEL})")
-                    return result
-                    
-            elif provider == 'lovable' and LOVABLE_API_KEY:
-                result = call_lovable_ai(messages, model, temperature, max_tokens)
-                if result:
-                    print(f"[AI] ✓ Success with Lovable AI")
-                    return result
-                    
-            elif provider == 'gemini' and GEMINI_ENABLED and GOOGLE_API_KEY:
-                result = call_google_gemini(messages, model, temperature, max_tokens)
-                if result:
-                    print(f"[AI] ✓ Success with Gemini")
-                    return result
-                    
-            elif provider == 'openai' and OPENAI_ENABLED and OPENAI_API_KEY:
-                result = call_openai(messages, 'gpt-4o-mini', temperature, max_tokens)
-                if result:
-                    print(f"[AI] ✓ Success with OpenAI")
-                    return result
-            else:
-                print(f"[AI] ⚠ {provider} not available (disabled or no API key)")
-                
+            result = _call_provider_tracked(provider, messages, model, temperature, max_tokens, use_cache=use_cache)
+            if result:
+                print(f"[AI] ✓ Success with {provider}")
+                return result
         except Exception as e:
             last_error = e
             print(f"[AI] ✗ {provider} failed: {e}")
@@ -3092,41 +3397,30 @@ def call_ai(
     # ═══════════════════════════════════════════════════════════════════════════
     # FALLBACK AUTOMÁTICO: Se todos os provedores priorizados falharem,
     # tentar outros provedores configurados que não estavam na lista
+    # (Lovable sempre disponível no Cloud, depois Gemini e OpenAI)
     # ═══════════════════════════════════════════════════════════════════════════
     print(f"[AI] ⚠ All priority providers failed, trying automatic fallback...")
     
-    # Fallback 1: Lovable AI (sempre disponível no Cloud)
-    if 'lovable' not in priority_order and LOVABLE_API_KEY:
-        try:
-            print(f"[AI] Fallback: Trying Lovable AI...")
-            result = call_lovable_ai(messages, model, temperature, max_tokens)
-            if result:
-                print(f"[AI] ✓ Fallback success with Lovable AI")
-                return result
-        except Exception as e:
-            print(f"[AI] ✗ Fallback Lovable AI failed: {e}")
-    
-    # Fallback 2: Gemini (se API key configurada)
-    if 'gemini' not in priority_order and GOOGLE_API_KEY:
-        try:
-            print(f"[AI] Fallback: Trying Gemini...")
-            result = call_google_gemini(messages, model, temperature, max_tokens)
-            if result:
-                print(f"[AI] ✓ Fallback success with Gemini")
-                return result
-        except Exception as e:
-            print(f"[AI] ✗ Fallback Gemini failed: {e}")
-    
-    # Fallback 3: OpenAI (se API key configurada)
-    if 'openai' not in priority_order and OPENAI_API_KEY:
+    fallbacks = [
+        ('lovable', LOVABLE_API_KEY),
+        ('gemini', GOOGLE_API_KEY),
+        ('openai', OPENAI_API_KEY),
+    ]
+    for provider, api_key in fallbacks:
+        if provider in priority_order or not api_key:
+            continue
+        if not provider_health.allow(provider):
+            print(f"[AI] ⏭ Fallback {provider} skipped (circuit open)")
+            continue
         try:
-            print(f"[AI] Fallback: Trying OpenAI...")
-            result = call_openai(messages, 'gpt-4o-mini', temperature, max_tokens)
+            print(f"[AI] Fallback: Trying {provider}...")
+            result = _call_provider_tracked(provider, messages, model, temperature, max_tokens, use_cache=use_cache)
             if result:
-                print(f"[AI] ✓ Fallback success with OpenAI")
+                print(f"[AI] ✓ Fallback success with {provider}")
                 return result
         except Exception as e:
-            print(f"[AI] ✗ Fallback OpenAI failed: {e}")
+            last_error = e
+            print(f"[AI] ✗ Fallback {provider} failed: {e}")
     
     # NUNCA CRASHAR: Retornar None para o chamador decidir
     print(f"[AI] ⚠ All AI providers failed (including fallbacks). Last error: {last_error}")
@@ -3138,7 +3432,8 @@ def call_lovable_ai(
     model: str = 'google/gemini-2.5-flash',
     temperature: float = 0.7,
     max_tokens: int = 4096,
-    max_retries: int = 3
+    max_retries: int = 3,
+    use_cache: Optional[bool] = None
 ) -> Optional[str]:
     """
     Call Lovable AI Gateway.
@@ -3150,18 +3445,35 @@ def call_lovable_ai(
         temperature: Sampling temperature
         max_tokens: Maximum tokens in response
         max_retries: Maximum retry attempts for rate limits
+        use_cache: llm_cache mode - None caches low-temperature calls only,
+            True opts in at any temperature, False skips the cache
     
     Returns:
         The AI response text or None on error
     """
-    import time
-    
     if not LOVABLE_API_KEY:
         raise ValueError("LOVABLE_API_KEY not configured")
     
+    return llm_cache.cached_call(
+        'lovable', model, messages,
+        lambda: _request_lovable_ai(messages, model, temperature, max_tokens, max_retries),
+        temperature=temperature, max_tokens=max_tokens, use_cache=use_cache
+    )
+
+
+def _request_lovable_ai(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    max_retries: int
+) -> Optional[str]:
+    """Uncached Lovable AI Gateway request with rate-limit retries (see call_lovable_ai)."""
+    import time
+    
     for attempt in range(max_retries):
         try:
-            response = requests.post(
+            response = http_pool.session('lovable').post(
                 LOVABLE_API_URL,
                 headers={
                     'Authorization': f'Bearer {LOVABLE_API_KEY}',
@@ -3173,7 +3485,7 @@ def call_lovable_ai(
                     'temperature': temperature,
                     'max_tokens': max_tokens
                 },
-                timeout=120
+                timeout=http_pool.timeout('chat', 'lovable')
             )
             
             # Handle rate limit with retry
@@ -3208,7 +3520,8 @@ def call_openai(
     messages: List[Dict[str, str]],
     model: str = 'gpt-4o-mini',
     temperature: float = 0.7,
-    max_tokens: int = 4096
+    max_tokens: int = 4096,
+    use_cache: Optional[bool] = None
 ) -> Optional[str]:
     """
     Call OpenAI API.
@@ -3218,6 +3531,8 @@ def call_openai(
         model: Model to use
         temperature: Sampling temperature
         max_tokens: Maximum tokens in response
+        use_cache: llm_cache mode - None caches low-temperature calls only,
+            True opts in at any temperature, False skips the cache
     
     Returns:
         The AI response text or None on error
@@ -3225,8 +3540,22 @@ def call_openai(
     if not OPENAI_API_KEY:
         raise ValueError("OPENAI_API_KEY not configured")
     
-    response = requests.post(
-        f'{OPENAI_API_URL}/chat/completions',
+    return llm_cache.cached_call(
+        'openai', model, messages,
+        lambda: _request_openai(messages, model, temperature, max_tokens),
+        temperature=temperature, max_tokens=max_tokens, use_cache=use_cache
+    )
+
+
+def _request_openai(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int
+) -> Optional[str]:
+    """Uncached OpenAI chat/completions request (see call_openai)."""
+    response = http_pool.session('openai').post(
+        f'{OPENAI_API_URL}/chat/completions',
         headers={
             'Authorization': f'Bearer {OPENAI_API_KEY}',
             'Content-Type': 'application/json'
@@ -3237,7 +3566,7 @@ def call_openai(
             'temperature': temperature,
             'max_tokens': max_tokens
         },
-        timeout=120
+        timeout=http_pool.timeout('chat', 'openai')
     )
     
     if not response.ok:
@@ -3248,6 +3577,241 @@ def call_openai(
     return data.get('choices', [{}])[0].get('message', {}).get('content')
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# STREAMING - respostas token a token (chatbot via SSE)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _iter_sse_data(response) -> Iterator[Dict[str, Any]]:
+    """JSON payloads of 'data: ...' lines of a server-sent events response."""
+    for raw_line in response.iter_lines():
+        line = raw_line.decode('utf-8', errors='replace')
+        if not line.startswith('data:'):
+            continue
+        data = line[5:].strip()
+        if data == '[DONE]':
+            break
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+
+def stream_ollama(
+    messages: List[Dict[str, str]],
+    model: str = None,
+    temperature: float = 0.7,
+    max_tokens: int = 4096
+) -> Iterator[str]:
+    """
+    Stream an Ollama chat completion (NDJSON, 'stream': True).
+    
+    Yields:
+        Text chunks as they are generated. Raises on HTTP/connection errors.
+    """
+    model = model or OLLAMA_MODEL
+    payload = {
+        'model': model,
+        'messages': messages,
+        'stream': True,
+        'options': {
+            'temperature': temperature,
+            'num_predict': max_tokens
+        }
+    }
+    with http_pool.session('ollama').post(
+        f"{OLLAMA_URL}/api/chat", json=payload, stream=True,
+        timeout=http_pool.timeout('local_chat', 'ollama')
+    ) as response:
+        if not response.ok:
+            raise RuntimeError(f"Ollama error: {response.status_code} - {response.text[:200]}")
+        for line in response.iter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            if data.get('error'):
+                raise RuntimeError(f"Ollama error: {data['error']}")
+            chunk = (data.get('message') or {}).get('content')
+            if chunk:
+                yield chunk
+            if data.get('done'):
+                break
+
+
+def _stream_openai_compatible(
+    provider: str,
+    url: str,
+    api_key: str,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int
+) -> Iterator[str]:
+    """Stream chat/completions from an OpenAI-compatible endpoint (OpenAI, Lovable Gateway)."""
+    with http_pool.session(provider).post(
+        url,
+        headers={
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        },
+        json={
+            'model': model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'stream': True
+        },
+        stream=True,
+        timeout=http_pool.timeout('chat', provider)
+    ) as response:
+        if not response.ok:
+            raise RuntimeError(f"{provider} error: {response.status_code} - {response.text[:200]}")
+        for data in _iter_sse_data(response):
+            choices = data.get('choices') or [{}]
+            chunk = (choices[0].get('delta') or {}).get('content')
+            if chunk:
+                yield chunk
+
+
+def stream_openai(
+    messages: List[Dict[str, str]],
+    model: str = 'gpt-4o-mini',
+    temperature: float = 0.7,
+    max_tokens: int = 4096
+) -> Iterator[str]:
+    """Stream an OpenAI chat completion. Yields text chunks."""
+    if not OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY not configured")
+    yield from _stream_openai_compatible(
+        'openai', f'{OPENAI_API_URL}/chat/completions', OPENAI_API_KEY,
+        messages, model, temperature, max_tokens
+    )
+
+
+def stream_lovable_ai(
+    messages: List[Dict[str, str]],
+    model: str = 'google/gemini-2.5-flash',
+    temperature: float = 0.7,
+    max_tokens: int = 4096
+) -> Iterator[str]:
+    """Stream a Lovable AI Gateway chat completion. Yields text chunks."""
+    if not LOVABLE_API_KEY:
+        raise ValueError("LOVABLE_API_KEY not configured")
+    yield from _stream_openai_compatible(
+        'lovable', LOVABLE_API_URL, LOVABLE_API_KEY,
+        messages, model, temperature, max_tokens
+    )
+
+
+def stream_google_gemini(
+    messages: List[Dict[str, str]],
+    model: str = 'gemini-2.5-flash',
+    temperature: float = 0.7,
+    max_tokens: int = 4096
+) -> Iterator[str]:
+    """Stream a Gemini completion (streamGenerateContent?alt=sse). Yields text chunks."""
+    if not GOOGLE_API_KEY:
+        raise ValueError("GOOGLE_API_KEY not configured")
+    
+    api_model, payload = _build_gemini_payload(messages, model, temperature, max_tokens)
+    url = f"{GOOGLE_API_URL}/models/{api_model}:streamGenerateContent?alt=sse&key={GOOGLE_API_KEY}"
+    with http_pool.session('gemini').post(
+        url, json=payload, stream=True, timeout=http_pool.timeout('chat', 'gemini')
+    ) as response:
+        if not response.ok:
+            raise RuntimeError(f"Google Gemini error: {response.status_code} - {response.text[:200]}")
+        for data in _iter_sse_data(response):
+            for candidate in data.get('candidates', [])[:1]:
+                for part in (candidate.get('content') or {}).get('parts', []):
+                    if part.get('text'):
+                        yield part['text']
+
+
+def _stream_provider(
+    provider: str,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int
+) -> Iterator[str]:
+    if provider == 'ollama':
+        return stream_ollama(messages, OLLAMA_MODEL, temperature, max_tokens)
+    if provider == 'lovable':
+        return stream_lovable_ai(messages, model, temperature, max_tokens)
+    if provider == 'gemini':
+        return stream_google_gemini(messages, model, temperature, max_tokens)
+    if provider == 'openai':
+        return stream_openai(messages, 'gpt-4o-mini', temperature, max_tokens)
+    return iter(())
+
+
+def stream_ai(
+    messages: List[Dict[str, str]],
+    model: str = 'gemini-2.5-flash',
+    temperature: float = 0.7,
+    max_tokens: int = 4096,
+    settings: Dict[str, str] = None
+) -> Iterator[str]:
+    """
+    Streaming counterpart of call_ai: same priority order, fallbacks and
+    circuit breakers. A provider that fails before its first token is
+    replaced by the next one; after the first token the stream is committed
+    to that provider.
+    
+    Yields:
+        Text chunks (nothing if every provider failed)
+    """
+    import time
+    
+    priority_order = get_ai_priority_order(settings)
+    candidates = [p for p in priority_order if _provider_ready(p)]
+    candidates += [
+        provider for provider, api_key in (
+            ('lovable', LOVABLE_API_KEY), ('gemini', GOOGLE_API_KEY), ('openai', OPENAI_API_KEY)
+        )
+        if api_key and provider not in priority_order
+    ]
+    print(f"[AI] Streaming, priority order: {' → '.join(candidates)}")
+    
+    for provider in candidates:
+        if not provider_health.allow(provider):
+            print(f"[AI] ⏭ {provider} skipped (circuit open)")
+            continue
+        
+        started = time.time()
+        chunks = _stream_provider(provider, messages, model, temperature, max_tokens)
+        try:
+            first = next(chunks)
+        except StopIteration:
+            provider_health.record_failure(provider, time.time() - started, 'empty stream')
+            print(f"[AI] ✗ {provider} stream vazio")
+            continue
+        except Exception as e:
+            provider_health.record_failure(provider, time.time() - started, e)
+            print(f"[AI] ✗ {provider} stream failed: {e}")
+            continue
+        
+        print(f"[AI] ⚡ {provider}: primeiro token em {time.time() - started:.2f}s")
+        recorded = False
+        try:
+            yield first
+            for chunk in chunks:
+                yield chunk
+            provider_health.record_success(provider, time.time() - started)
+            recorded = True
+        except Exception as e:
+            provider_health.record_failure(provider, time.time() - started, e)
+            recorded = True
+            print(f"[AI] ⚠ {provider} stream interrompido: {e}")
+        finally:
+            if not recorded:
+                # Client went away mid-stream (GeneratorExit): no outcome, but free a half-open probe
+                provider_health.release(provider)
+            chunks.close()
+        return
+    
+    print(f"[AI] ⚠ All AI providers failed (streaming)")
+
+
 def text_to_speech_elevenlabs(text: str, voice_id: str = 'JBFqnCBsd6RMkjVDRZzb') -> Optional[bytes]:
     """
     Convert text to speech using ElevenLabs TTS API.
@@ -3269,7 +3833,7 @@ def text_to_speech_elevenlabs(text: str, voice_id: str = 'JBFqnCBsd6RMkjVDRZzb')
     try:
         print(f"[ElevenLabs TTS] Gerando áudio com {len(text)} caracteres...")
         
-        response = requests.post(
+        response = http_pool.session('elevenlabs').post(
             f'https://api.elevenlabs.io/v1/text-to-speech/{voice_id}',
             headers={
                 'xi-api-key': ELEVENLABS_API_KEY,
@@ -3286,7 +3850,7 @@ def text_to_speech_elevenlabs(text: str, voice_id: str = 'JBFqnCBsd6RMkjVDRZzb')
                     'use_speaker_boost': True
                 }
             },
-            timeout=180
+            timeout=http_pool.timeout('tts', 'elevenlabs')
         )
         
         if not response.ok:
@@ -3335,7 +3899,7 @@ def text_to_speech_lovable(text: str, voice: str = 'nova') -> Optional[bytes]:
         
         print(f"[Lovable TTS] Gerando áudio via Lovable AI Gateway... ({len(truncated)} chars)")
         
-        response = requests.post(
+        response = http_pool.session('lovable').post(
             'https://ai.gateway.lovable.dev/v1/audio/speech',
             headers={
                 'Authorization': f'Bearer {LOVABLE_API_KEY}',
@@ -3347,7 +3911,7 @@ def text_to_speech_lovable(text: str, voice: str = 'nova') -> Optional[bytes]:
                 'voice': voice if voice in ['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer'] else 'nova',
                 'response_format': 'mp3'
             },
-            timeout=120
+            timeout=http_pool.timeout('tts', 'lovable')
         )
         
         if response.ok:
@@ -3386,7 +3950,7 @@ def text_to_speech(text: str, voice: str = 'nova') -> Optional[bytes]:
             # Truncate text if too long
             truncated = text[:4000]
             
-            response = requests.post(
+            response = http_pool.session('openai').post(
                 f'{OPENAI_API_URL}/audio/speech',
                 headers={
                     'Authorization': f'Bearer {OPENAI_API_KEY}',
@@ -3398,7 +3962,7 @@ def text_to_speech(text: str, voice: str = 'nova') -> Optional[bytes]:
                     'voice': voice if voice in ['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer'] else 'nova',
                     'response_format': 'mp3'
                 },
-                timeout=120
+                timeout=http_pool.timeout('tts', 'openai')
             )
             
             if response.ok:
@@ -3434,7 +3998,7 @@ def transcribe_audio(audio_path: str, language: str = 'pt') -> Optional[str]:
         raise ValueError("OPENAI_API_KEY not configured")
     
     with open(audio_path, 'rb') as audio_file:
-        response = requests.post(
+        response = http_pool.session('openai').post(
             f'{OPENAI_API_URL}/audio/transcriptions',
             headers={
                 'Authorization': f'Bearer {OPENAI_API_KEY}'
@@ -3447,7 +4011,7 @@ def transcribe_audio(audio_path: str, language: str = 'pt') -> Optional[str]:
                 'language': language,
                 'response_format': 'verbose_json'
             },
-            timeout=300
+            timeout=http_pool.timeout('transcription', 'openai')
         )
     
     if not response.ok:
@@ -3458,106 +4022,390 @@ def transcribe_audio(audio_path: str, language: str = 'pt') -> Optional[str]:
     return data.get('text')
 
 
+CHECKPOINT_LOG_VERSION = 1
+
+
 def _get_checkpoint_path(audio_path: str, match_id: str = None) -> str:
-    """Get checkpoint file path for resumable transcription."""
+    """Get checkpoint log path (append-only JSONL) for resumable transcription."""
     base_name = os.path.basename(audio_path).rsplit('.', 1)[0]
     checkpoint_dir = Path(audio_path).parent / "checkpoints"
     checkpoint_dir.mkdir(exist_ok=True)
-    return str(checkpoint_dir / f"{base_name}_checkpoint.json")
+    return str(checkpoint_dir / f"{base_name}_checkpoint.jsonl")
 
 
-def _load_checkpoint(checkpoint_path: str) -> Dict[str, Any]:
-    """Load existing checkpoint if available."""
+def _load_checkpoint(checkpoint_path: str, total_chunks: int = None) -> Dict[str, Any]:
+    """
+    Rebuild checkpoint state by replaying the append-only log.
+    
+    Line 1 is a header ({"v", "total_chunks", ...}); every other line is one
+    completed chunk ({"i", "segments", "text"}). A truncated last line (crash
+    mid-write) is ignored. If the header does not match total_chunks the log
+    is discarded.
+    """
+    state = {"completed_chunks": 0, "segments": [], "text_parts": []}
+    if not os.path.exists(checkpoint_path):
+        return state
+    
     try:
-        if os.path.exists(checkpoint_path):
-            with open(checkpoint_path, 'r', encoding='utf-8') as f:
-                data = json_module.load(f)
-                print(f"[LocalWhisper] ✓ Checkpoint encontrado: {data.get('completed_chunks', 0)} chunks completos")
-                return data
+        valid_bytes = 0
+        with open(checkpoint_path, 'rb') as f:
+            header = None
+            for raw in f:
+                line = raw.strip()
+                if not line:
+                    valid_bytes += len(raw)
+                    continue
+                try:
+                    record = json_module.loads(line.decode('utf-8'))
+                except ValueError:
+                    print(f"[LocalWhisper] ⚠ Linha de checkpoint incompleta ignorada")
+                    break
+                
+                if header is None:
+                    header = record
+                    if header.get('v') != CHECKPOINT_LOG_VERSION or (
+                            total_chunks is not None and header.get('total_chunks') != total_chunks):
+                        print(f"[LocalWhisper] ⚠ Checkpoint incompatível, reiniciando")
+                        f.close()
+                        os.remove(checkpoint_path)
+                        return state
+                    valid_bytes += len(raw)
+                    continue
+                
+                # Chunks are logged in order; stop at any gap
+                if record.get('i') != state["completed_chunks"]:
+                    break
+                state["segments"].extend(record.get('segments', []))
+                state["text_parts"].append(record.get('text', ''))
+                state["completed_chunks"] += 1
+                valid_bytes += len(raw)
+        
+        # Drop any torn/out-of-order tail so new appends start on a clean line
+        if valid_bytes < os.path.getsize(checkpoint_path):
+            os.truncate(checkpoint_path, valid_bytes)
+        
+        if state["completed_chunks"]:
+            print(f"[LocalWhisper] ✓ Checkpoint encontrado: {state['completed_chunks']} chunks completos")
     except Exception as e:
         print(f"[LocalWhisper] ⚠ Erro ao carregar checkpoint: {e}")
-    return {"completed_chunks": 0, "segments": [], "text_parts": []}
+        return {"completed_chunks": 0, "segments": [], "text_parts": []}
+    
+    return state
 
 
-def _save_checkpoint(checkpoint_path: str, data: Dict[str, Any]):
-    """Save checkpoint for resumable transcription."""
+def _append_checkpoint(checkpoint_path: str, record: Dict[str, Any]):
+    """Append one record to the checkpoint log and fsync it (constant cost per chunk)."""
     try:
-        with open(checkpoint_path, 'w', encoding='utf-8') as f:
-            json_module.dump(data, f, ensure_ascii=False, indent=2)
+        with open(checkpoint_path, 'a', encoding='utf-8') as f:
+            f.write(json_module.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
     except Exception as e:
         print(f"[LocalWhisper] ⚠ Erro ao salvar checkpoint: {e}")
 
 
-def _split_audio_into_chunks(audio_path: str, chunk_duration_seconds: int = 45, overlap_seconds: int = 2) -> List[Tuple[str, float, float]]:
+def _init_checkpoint(checkpoint_path: str, total_chunks: int, chunk_duration: int):
+    """Write the checkpoint log header if the log does not exist yet."""
+    if os.path.exists(checkpoint_path) and os.path.getsize(checkpoint_path) > 0:
+        return
+    _append_checkpoint(checkpoint_path, {
+        "v": CHECKPOINT_LOG_VERSION,
+        "total_chunks": total_chunks,
+        "chunk_duration": chunk_duration,
+        "created": datetime.now().isoformat()
+    })
+
+
+WHISPER_PCM_SAMPLE_RATE = 16000
+
+# Placeholder text of a chunk that failed every retry
+CHUNK_ERROR_PREFIX = "[ERRO: chunk"
+
+
+def _get_pcm_path(audio_path: str) -> str:
+    """Get path of the decoded 16kHz mono int16 PCM file used for chunking."""
+    base_name = os.path.basename(audio_path).rsplit('.', 1)[0]
+    checkpoint_dir = Path(audio_path).parent / "checkpoints"
+    checkpoint_dir.mkdir(exist_ok=True)
+    return str(checkpoint_dir / f"{base_name}.s16le")
+
+
+def _decode_audio_to_pcm(audio_path: str) -> Optional[str]:
+    """
+    Decode audio ONCE into a raw 16kHz mono int16 file (reused if up to date).
+    
+    Returns:
+        Path to the .s16le file or None on error
+    """
+    pcm_path = _get_pcm_path(audio_path)
+    
+    if os.path.exists(pcm_path) and os.path.getmtime(pcm_path) >= os.path.getmtime(audio_path):
+        return pcm_path
+    
+    tmp_path = pcm_path + '.tmp'
+    try:
+        result = subprocess.run([
+            'ffmpeg', '-y', '-i', audio_path,
+            '-vn', '-ar', str(WHISPER_PCM_SAMPLE_RATE), '-ac', '1',
+            '-f', 's16le', '-c:a', 'pcm_s16le',
+            tmp_path
+        ], capture_output=True, text=True, timeout=1800)
+        if result.returncode != 0 or not os.path.exists(tmp_path):
+            print(f"[LocalWhisper] ⚠ Erro ao decodificar áudio: {result.stderr[-300:]}")
+            return None
+        os.replace(tmp_path, pcm_path)
+        return pcm_path
+    except Exception as e:
+        print(f"[LocalWhisper] ⚠ Erro ao decodificar áudio: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+
+def _pcm_to_whisper_input(chunk_audio):
+    """Convert an int16 PCM view to the float32 array faster-whisper expects (paths pass through)."""
+    if isinstance(chunk_audio, str):
+        return chunk_audio
+    import numpy as np
+    return np.asarray(chunk_audio, dtype=np.float32) / 32768.0
+
+
+def _split_audio_into_chunks(audio_path: str, chunk_duration_seconds: int = 45, overlap_seconds: int = 2) -> List[Tuple[Any, float, float]]:
     """
     Split audio file into chunks for processing.
     
+    The audio is decoded once into a 16kHz mono int16 file and each chunk is a
+    numpy.memmap slice of it - no per-chunk WAV files or ffmpeg processes.
+    
     Args:
         audio_path: Path to audio file
         chunk_duration_seconds: Duration of each chunk (default 45s for Whisper optimization)
         overlap_seconds: Overlap between chunks to avoid cutting words (default 2s)
     
     Returns:
-        List of tuples: (chunk_path, start_time, end_time)
+        List of tuples: (chunk_audio, start_time, end_time)
+        chunk_audio is an int16 array view, or the original path if no split is needed
     """
-    import subprocess
+    import numpy as np
     
-    # Get audio duration
-    try:
-        result = subprocess.run(
-            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-             '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
-            capture_output=True, text=True, timeout=30
-        )
-        total_duration = float(result.stdout.strip())
-    except Exception as e:
-        print(f"[LocalWhisper] ⚠ Erro ao obter duração: {e}")
+    pcm_path = _decode_audio_to_pcm(audio_path)
+    if not pcm_path:
         return [(audio_path, 0.0, 0.0)]  # Return original file
     
+    pcm = np.memmap(pcm_path, dtype=np.int16, mode='r')
+    sample_rate = WHISPER_PCM_SAMPLE_RATE
+    total_duration = len(pcm) / float(sample_rate)
+    
     if total_duration <= chunk_duration_seconds:
-        return [(audio_path, 0.0, total_duration)]  # No need to split
+        # No need to split: the original file is used, so drop the decoded PCM
+        del pcm
+        try:
+            os.remove(pcm_path)
+        except OSError as e:
+            print(f"[LocalWhisper] ⚠ Erro ao limpar PCM: {e}")
+        return [(audio_path, 0.0, total_duration)]
     
     chunks = []
-    chunk_dir = Path(audio_path).parent / "chunks"
-    chunk_dir.mkdir(exist_ok=True)
-    
     start_time = 0.0
     chunk_index = 0
     
     while start_time < total_duration:
         end_time = min(start_time + chunk_duration_seconds, total_duration)
-        chunk_path = str(chunk_dir / f"chunk_{chunk_index:04d}.wav")
         
-        # Only create chunk if it doesn't exist
-        if not os.path.exists(chunk_path):
-            try:
-                subprocess.run([
-                    'ffmpeg', '-y', '-i', audio_path,
-                    '-ss', str(start_time), '-t', str(chunk_duration_seconds + overlap_seconds),
-                    '-ar', '16000', '-ac', '1',  # 16kHz mono for Whisper
-                    '-c:a', 'pcm_s16le',
-                    chunk_path
-                ], capture_output=True, timeout=60)
-            except Exception as e:
-                print(f"[LocalWhisper] ⚠ Erro ao criar chunk {chunk_index}: {e}")
-                continue
+        first_sample = int(start_time * sample_rate)
+        last_sample = min(int((start_time + chunk_duration_seconds + overlap_seconds) * sample_rate), len(pcm))
+        chunks.append((pcm[first_sample:last_sample], start_time, end_time))
+        
+        if end_time >= total_duration:
+            break
         
-        chunks.append((chunk_path, start_time, end_time))
         start_time = end_time - overlap_seconds  # Overlap for continuity
         chunk_index += 1
         
         if chunk_index > 500:  # Safety limit (500 chunks = ~6 hours)
             break
     
-    print(f"[LocalWhisper] Áudio dividido em {len(chunks)} chunks de ~{chunk_duration_seconds}s")
+    print(f"[LocalWhisper] Áudio dividido em {len(chunks)} chunks de ~{chunk_duration_seconds}s (memmap)")
     return chunks
 
 
+def _resolve_whisper_device() -> Tuple[str, str]:
+    """
+    Pick (device, compute_type) for the local Whisper model.
+    
+    WORKAROUND: ctranslate2 4.4.0 has a bug where it tries to access _rocm_sdk_core
+    on Windows/CUDA systems. If we detected this error during import, force CPU.
+    """
+    if _CTRANSLATE2_ROCM_ERROR:
+        return "cpu", "int8"
+    import torch
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    return device, ("float16" if device == "cuda" else "int8")
+
+
+def _load_whisper_model_uncached(model_name: str, device: str, compute_type: str):
+    """Instantiate a WhisperModel, falling back to CPU on ROCm/CUDA load errors."""
+    from faster_whisper import WhisperModel
+    try:
+        return WhisperModel(model_name, device=device, compute_type=compute_type)
+    except (OSError, FileNotFoundError, RuntimeError) as load_error:
+        error_str = str(load_error).lower()
+        # Check for ROCm-related errors and retry with CPU
+        if device != "cpu" and ('rocm' in error_str or '_rocm_sdk_core' in error_str or 'cuda' in error_str):
+            print(f"[LocalWhisper] ⚠️ Erro GPU detectado: {load_error}")
+            print(f"[LocalWhisper] ⚠️ Tentando fallback para CPU...")
+            return WhisperModel(model_name, device="cpu", compute_type="int8")
+        raise
+
+
+def _get_pooled_whisper_model(model_name: str = None) -> Tuple[Any, str, str]:
+    """Get a model from the memory-aware pool (loads on a miss). Returns (model, device, compute_type)."""
+    import whisper_pool
+    model_name = model_name or LOCAL_WHISPER_MODEL or 'base'
+    device, compute_type = _resolve_whisper_device()
+    model = whisper_pool.get_model(model_name, device, compute_type, _load_whisper_model_uncached)
+    return model, device, compute_type
+
+
+def _ensure_whisper_model(model_name: str = None) -> Tuple[Any, str, str]:
+    """
+    Load or reuse the configured model. Returns (model, device, compute_type).
+    
+    The pool owns the models: callers keep the returned model for the whole
+    transcription (no module-level singleton), so a model switch on another
+    thread - e.g. a background preload - never pulls it from under them,
+    and an evicted model is freed once its last transcription ends.
+    """
+    return _get_pooled_whisper_model(model_name)
+
+
+def preload_whisper_model_async(model_name: str = None):
+    """Warm up the configured Whisper model in the background (no-op if Whisper is unavailable)."""
+    if not (LOCAL_WHISPER_ENABLED and _FASTER_WHISPER_AVAILABLE):
+        return None
+    import whisper_pool
+    model_name = model_name or LOCAL_WHISPER_MODEL or 'base'
+    print(f"[LocalWhisper] 🔥 Pré-carregando modelo '{model_name}' em segundo plano...")
+    return whisper_pool.preload_async(model_name, _ensure_whisper_model)
+
+
+def get_whisper_model_stats() -> Dict[str, Any]:
+    """Loaded Whisper models, load times, resident sizes and pool limits."""
+    import whisper_pool
+    stats = whisper_pool.get_pool_stats()
+    stats['configured_model'] = LOCAL_WHISPER_MODEL
+    stats['available'] = _FASTER_WHISPER_AVAILABLE
+    stats['enabled'] = LOCAL_WHISPER_ENABLED
+    return stats
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PARALLEL LOCAL WHISPER - pool de processos, cada um com seu WhisperModel int8
+# ═══════════════════════════════════════════════════════════════════════════
+
+_worker_whisper_model = None
+
+
+def _get_whisper_worker_count(pending_chunks: int) -> int:
+    """Number of worker processes to use (<= 1 means serial with the global model)."""
+    if LOCAL_WHISPER_WORKERS <= 1 or pending_chunks <= 1:
+        return 1
+    return min(LOCAL_WHISPER_WORKERS, pending_chunks, os.cpu_count() or 1)
+
+
+def _whisper_worker_init(model_name: str, cpu_threads: int):
+    """Process pool initializer: load one CPU int8 model per worker."""
+    global _worker_whisper_model
+    from faster_whisper import WhisperModel
+    _worker_whisper_model = WhisperModel(
+        model_name, device="cpu", compute_type="int8",
+        cpu_threads=cpu_threads, num_workers=1
+    )
+
+
+def _whisper_worker_transcribe(index: int, chunk_audio, offset: float, max_retries: int = 3) -> Tuple[int, List[Dict[str, Any]], Optional[str]]:
+    """
+    Transcribe one chunk inside a worker process.
+    
+    Returns:
+        (index, segments with global timestamps, error or None)
+    """
+    last_error = None
+    for retry in range(max_retries):
+        try:
+            segments_gen, info = _worker_whisper_model.transcribe(
+                _pcm_to_whisper_input(chunk_audio),
+                language="pt",
+                beam_size=5,
+                vad_filter=True,
+                vad_parameters=dict(min_silence_duration_ms=500)
+            )
+            segments = []
+            for seg in segments_gen:
+                text = seg.text.strip()
+                if text:
+                    segments.append({
+                        'start': offset + seg.start,
+                        'end': offset + seg.end,
+                        'text': text
+                    })
+            return index, segments, None
+        except Exception as e:
+            last_error = str(e)
+    return index, [], last_error
+
+
+def _run_parallel_whisper(
+    tasks: List[Tuple[int, Any, float]],
+    workers: int,
+    max_retries: int = 3
+):
+    """
+    Transcribe (index, chunk_audio, offset) tasks on a pool of worker processes.
+    
+    Yields (index, segments, error) as chunks finish (completion order);
+    callers re-order by index so output stays in timestamp order.
+    
+    Raises BrokenProcessPool when a worker dies (model load failure, OOM);
+    callers catch it and finish the remaining tasks on the serial path.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    cpu_threads = LOCAL_WHISPER_CPU_THREADS or max(1, (os.cpu_count() or 1) // workers)
+    model_name = LOCAL_WHISPER_MODEL or 'base'
+    print(f"[LocalWhisper] 🚀 Modo paralelo: {workers} processos x {cpu_threads} threads (modelo {model_name}, int8)")
+    
+    # spawn: ctranslate2/torch threads in the server process are not fork-safe
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_whisper_worker_init,
+        initargs=(model_name, cpu_threads)
+    ) as executor:
+        futures = [
+            executor.submit(_whisper_worker_transcribe, index, chunk_audio, offset, max_retries)
+            for index, chunk_audio, offset in tasks
+        ]
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # Worker crashed (e.g. model load failure) - report every pending task
+                print(f"[LocalWhisper] ❌ Worker falhou: {e}")
+                for f in futures:
+                    f.cancel()
+                raise
+
+
 def _transcribe_with_local_whisper(
     audio_path: str, 
     match_id: str = None,
     force_restart: bool = False,
-    chunk_duration: int = 45
+    chunk_duration: int = 45,
+    mode: str = None,
+    on_segments: callable = None
 ) -> Dict[str, Any]:
     """
     Transcribe audio using local Faster-Whisper (100% FREE, offline).
@@ -3565,6 +4413,7 @@ def _transcribe_with_local_whisper(
     Enhanced with:
     - GPU (CUDA) acceleration when available
     - Chunked processing for large files
+    - Batched VAD-driven inference (mode='batched')
     - Checkpoint system for resumable transcription
     - Auto-retry on failures
     
@@ -3573,39 +4422,23 @@ def _transcribe_with_local_whisper(
         match_id: Optional match ID for metadata
         force_restart: If True, ignore existing checkpoints and start fresh
         chunk_duration: Duration of each chunk in seconds (default 45s)
+        mode: 'auto', 'chunked' or 'batched' (default: LOCAL_WHISPER_MODE)
+        on_segments: Optional callback(segments) called as segments finish,
+            e.g. IncrementalTranscript.add_segments
     
     Returns:
         Dict with 'success', 'text', 'srtContent', 'segments'
     """
-    global _whisper_model, _whisper_model_name
-    
     if not _FASTER_WHISPER_AVAILABLE:
         return {
             "error": "faster-whisper não instalado. Execute: pip install faster-whisper==1.1.0", 
             "success": False
         }
     
-    try:
-        from faster_whisper import WhisperModel
-        import torch
-    except ImportError as e:
-        return {"error": f"Dependência não instalada: {e}", "success": False}
-    
     try:
         model_name = LOCAL_WHISPER_MODEL or 'base'
         audio_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
-        
-        # Check device availability - prefer CUDA, but fallback to CPU if ROCm error
-        # WORKAROUND: ctranslate2 4.4.0 has a bug where it tries to access _rocm_sdk_core
-        # on Windows/CUDA systems. If we detected this error during import, force CPU.
-        if _CTRANSLATE2_ROCM_ERROR:
-            device = "cpu"
-            compute_type = "int8"
-            print(f"[LocalWhisper] ⚠️ Usando CPU devido a bug do ctranslate2 ROCm")
-        else:
-            cuda_available = torch.cuda.is_available()
-            device = "cuda" if cuda_available else "cpu"
-            compute_type = "float16" if device == "cuda" else "int8"
+        device, compute_type = _resolve_whisper_device()
         
         print(f"[LocalWhisper] =====================================")
         print(f"[LocalWhisper] 🎤 Iniciando transcrição robusta")
@@ -3616,35 +4449,23 @@ def _transcribe_with_local_whisper(
         if _CTRANSLATE2_ROCM_ERROR:
             print(f"[LocalWhisper] ⚠️ ROCm workaround ativo - GPU desabilitada temporariamente")
         
-        # Load or reuse model (singleton pattern for efficiency)
-        # With extra error handling for ctranslate2 issues
-        if _whisper_model is None or _whisper_model_name != model_name:
-            print(f"[LocalWhisper] Carregando modelo '{model_name}'... (pode levar alguns minutos na primeira vez)")
-            
-            try:
-                _whisper_model = WhisperModel(model_name, device=device, compute_type=compute_type)
-            except (OSError, FileNotFoundError, RuntimeError) as load_error:
-                error_str = str(load_error).lower()
-                # Check for ROCm-related errors and retry with CPU
-                if 'rocm' in error_str or '_rocm_sdk_core' in error_str or 'cuda' in error_str:
-                    print(f"[LocalWhisper] ⚠️ Erro GPU detectado: {load_error}")
-                    print(f"[LocalWhisper] ⚠️ Tentando fallback para CPU...")
-                    device = "cpu"
-                    compute_type = "int8"
-                    _whisper_model = WhisperModel(model_name, device=device, compute_type=compute_type)
-                else:
-                    raise
-            
-            _whisper_model_name = model_name
-            print(f"[LocalWhisper] ✓ Modelo carregado!")
+        mode = mode or LOCAL_WHISPER_MODE or 'auto'
         
         # Check if file is large enough to need chunking
-        needs_chunking = audio_size_mb > 50  # 50MB threshold
+        needs_chunking = mode == 'chunked' or audio_size_mb > 50  # 50MB threshold
+        
+        # Load or reuse model from the memory-aware pool (pre-loaded at startup).
+        # Chunked mode loads it itself, only when chunks run serially: parallel
+        # workers have their own models
+        if mode == 'batched':
+            model, _, _ = _ensure_whisper_model(model_name)
+            return _transcribe_batched(model, model_name, audio_path, match_id, on_segments=on_segments)
         
         if needs_chunking:
-            return _transcribe_chunked(audio_path, match_id, force_restart, chunk_duration)
+            return _transcribe_chunked(audio_path, match_id, force_restart, chunk_duration, on_segments=on_segments)
         else:
-            return _transcribe_single_file(audio_path, match_id)
+            model, _, _ = _ensure_whisper_model(model_name)
+            return _transcribe_single_file(model, model_name, audio_path, match_id, on_segments=on_segments)
         
     except Exception as e:
         import traceback
@@ -3653,13 +4474,21 @@ def _transcribe_with_local_whisper(
         return {"error": f"Local Whisper error: {str(e)}", "success": False}
 
 
-def _transcribe_single_file(audio_path: str, match_id: str = None) -> Dict[str, Any]:
-    """Transcribe a single file (small files only)."""
-    global _whisper_model
-    
+def _emit_segments(on_segments: callable, segments: List[Dict[str, Any]]):
+    """Hand finished segments to a streaming consumer; its errors never stop transcription."""
+    if not on_segments or not segments:
+        return
+    try:
+        on_segments(segments)
+    except Exception as e:
+        print(f"[LocalWhisper] ⚠ Erro no processamento incremental: {e}")
+
+
+def _transcribe_single_file(model, model_name: str, audio_path: str, match_id: str = None, on_segments: callable = None) -> Dict[str, Any]:
+    """Transcribe a single file (small files only), streaming every BATCHED_EMIT_EVERY segments."""
     print(f"[LocalWhisper] Transcrevendo arquivo único...")
     
-    segments_gen, info = _whisper_model.transcribe(
+    segments_gen, info = model.transcribe(
         audio_path, 
         language="pt",
         beam_size=5,
@@ -3673,35 +4502,111 @@ def _transcribe_single_file(audio_path: str, match_id: str = None) -> Dict[str,
     srt_lines = []
     full_text = []
     segments_list = []
+    emitted = 0
+    
+    for i, seg in enumerate(segments_gen, 1):
+        start_str = _format_srt_time(seg.start)
+        end_str = _format_srt_time(seg.end)
+        text = seg.text.strip()
+        
+        if text:
+            srt_lines.append(f"{i}\n{start_str} --> {end_str}\n{text}\n")
+            full_text.append(text)
+            segments_list.append({
+                'start': seg.start,
+                'end': seg.end,
+                'text': text
+            })
+            if len(segments_list) - emitted >= BATCHED_EMIT_EVERY:
+                _emit_segments(on_segments, segments_list[emitted:])
+                emitted = len(segments_list)
+    
+    _emit_segments(on_segments, segments_list[emitted:])
+    
+    srt_content = '\n'.join(srt_lines)
+    text_content = ' '.join(full_text)
+    
+    print(f"[LocalWhisper] ✓ Transcrição completa: {len(text_content)} chars, {len(segments_list)} segmentos")
+    
+    return {
+        "success": True,
+        "text": text_content,
+        "srtContent": srt_content,
+        "segments": segments_list,
+        "matchId": match_id,
+        "provider": "local_whisper",
+        "model": model_name,
+        "device": "cuda" if hasattr(model, 'device') else "cpu"
+    }
+
+
+def _transcribe_batched(model, model_name: str, audio_path: str, match_id: str = None, on_segments: callable = None) -> Dict[str, Any]:
+    """
+    Transcribe the whole file with faster-whisper's BatchedInferencePipeline.
+    
+    VAD runs once over the full audio; speech regions are packed into batches
+    of LOCAL_WHISPER_BATCH_SIZE and decoded together. Segment timestamps are
+    already relative to the start of the file (match time). Segments are
+    streamed to on_segments every BATCHED_EMIT_EVERY segments.
+    """
+    import time
+    from faster_whisper import BatchedInferencePipeline
+    
+    print(f"[LocalWhisper] Transcrevendo em modo batched (batch_size={LOCAL_WHISPER_BATCH_SIZE})...")
+    started = time.time()
+    
+    pipeline = BatchedInferencePipeline(model=model)
+    segments_gen, info = pipeline.transcribe(
+        audio_path,
+        language="pt",
+        beam_size=5,
+        batch_size=LOCAL_WHISPER_BATCH_SIZE,
+        vad_filter=True,
+        vad_parameters=dict(min_silence_duration_ms=500)
+    )
+    
+    srt_lines = []
+    full_text = []
+    segments_list = []
+    emitted = 0
+    
+    for seg in segments_gen:
+        text = seg.text.strip()
+        if not text:
+            continue
+        segments_list.append({
+            'start': seg.start,
+            'end': seg.end,
+            'text': text
+        })
+        if len(segments_list) - emitted >= BATCHED_EMIT_EVERY:
+            _emit_segments(on_segments, segments_list[emitted:])
+            emitted = len(segments_list)
+        full_text.append(text)
+        srt_lines.append(
+            f"{len(segments_list)}\n{_format_srt_time(seg.start)} --> {_format_srt_time(seg.end)}\n{text}\n"
+        )
     
-    for i, seg in enumerate(segments_gen, 1):
-        start_str = _format_srt_time(seg.start)
-        end_str = _format_srt_time(seg.end)
-        text = seg.text.strip()
-        
-        if text:
-            srt_lines.append(f"{i}\n{start_str} --> {end_str}\n{text}\n")
-            full_text.append(text)
-            segments_list.append({
-                'start': seg.start,
-                'end': seg.end,
-                'text': text
-            })
+    _emit_segments(on_segments, segments_list[emitted:])
     
-    srt_content = '\n'.join(srt_lines)
+    elapsed = time.time() - started
     text_content = ' '.join(full_text)
+    duration = getattr(info, 'duration', 0) or 0
+    rtf = (elapsed / duration) if duration else 0
     
-    print(f"[LocalWhisper] ✓ Transcrição completa: {len(text_content)} chars, {len(segments_list)} segmentos")
+    print(f"[LocalWhisper] ✓ Batched: {len(segments_list)} segmentos em {elapsed:.1f}s (RTF {rtf:.3f})")
     
     return {
         "success": True,
         "text": text_content,
-        "srtContent": srt_content,
+        "srtContent": '\n'.join(srt_lines),
         "segments": segments_list,
         "matchId": match_id,
         "provider": "local_whisper",
-        "model": _whisper_model_name,
-        "device": "cuda" if hasattr(_whisper_model, 'device') else "cpu"
+        "model": model_name,
+        "device": "cuda" if hasattr(model, 'device') else "cpu",
+        "mode": "batched",
+        "elapsed_seconds": round(elapsed, 2)
     }
 
 
@@ -3710,7 +4615,8 @@ def _transcribe_chunked(
     match_id: str = None,
     force_restart: bool = False,
     chunk_duration: int = 45,
-    max_retries: int = 3
+    max_retries: int = 3,
+    on_segments: callable = None
 ) -> Dict[str, Any]:
     """
     Transcribe large audio file in chunks with checkpoint support.
@@ -3720,6 +4626,7 @@ def _transcribe_chunked(
     - Saves progress after each chunk
     - Can resume from last checkpoint if interrupted
     - Auto-retries failed chunks
+    - Streams each finished chunk (in order) to on_segments
     
     Args:
         audio_path: Path to audio file
@@ -3727,27 +4634,30 @@ def _transcribe_chunked(
         force_restart: If True, ignore existing checkpoints
         chunk_duration: Duration of each chunk in seconds
         max_retries: Maximum retries per chunk
+        on_segments: Optional callback(segments) for incremental consumers
     
     Returns:
         Dict with transcription results
     """
-    global _whisper_model
+    import time
     
+    started = time.time()
     checkpoint_path = _get_checkpoint_path(audio_path, match_id)
     
     # Load or initialize checkpoint
     if force_restart and os.path.exists(checkpoint_path):
         os.remove(checkpoint_path)
     
-    checkpoint = _load_checkpoint(checkpoint_path)
-    completed_chunks = checkpoint.get("completed_chunks", 0)
-    all_segments = checkpoint.get("segments", [])
-    text_parts = checkpoint.get("text_parts", [])
-    
     # Split audio into chunks
     chunks = _split_audio_into_chunks(audio_path, chunk_duration)
     total_chunks = len(chunks)
     
+    checkpoint = _load_checkpoint(checkpoint_path, total_chunks)
+    completed_chunks = checkpoint.get("completed_chunks", 0)
+    all_segments = checkpoint.get("segments", [])
+    text_parts = checkpoint.get("text_parts", [])
+    _init_checkpoint(checkpoint_path, total_chunks, chunk_duration)
+    
     if completed_chunks >= total_chunks:
         print(f"[LocalWhisper] ✓ Transcrição já completa (checkpoint)")
     else:
@@ -3755,60 +4665,106 @@ def _transcribe_chunked(
         if completed_chunks > 0:
             print(f"[LocalWhisper] ⏩ Retomando do chunk {completed_chunks + 1}")
     
+    # Replay checkpointed segments so streaming consumers see the full prefix
+    _emit_segments(on_segments, all_segments)
+    
     # Process remaining chunks
-    for i in range(completed_chunks, total_chunks):
-        chunk_path, start_time, end_time = chunks[i]
-        
-        print(f"[LocalWhisper] 📍 Chunk {i + 1}/{total_chunks} ({start_time:.1f}s - {end_time:.1f}s)")
-        
-        # Retry logic for each chunk
-        for retry in range(max_retries):
-            try:
-                segments_gen, info = _whisper_model.transcribe(
-                    chunk_path,
-                    language="pt",
-                    beam_size=5,
-                    vad_filter=True,
-                    vad_parameters=dict(min_silence_duration_ms=500)
-                )
-                
-                chunk_text = []
-                for seg in segments_gen:
-                    text = seg.text.strip()
-                    if text:
-                        # Adjust timestamps to global time
-                        adjusted_start = start_time + seg.start
-                        adjusted_end = start_time + seg.end
-                        
-                        all_segments.append({
-                            'start': adjusted_start,
-                            'end': adjusted_end,
-                            'text': text
+    from concurrent.futures.process import BrokenProcessPool
+    
+    model_name = LOCAL_WHISPER_MODEL or 'base'
+    workers = _get_whisper_worker_count(total_chunks - completed_chunks)
+    if workers > 1:
+        tasks = [(i, chunks[i][0], chunks[i][1]) for i in range(completed_chunks, total_chunks)]
+        finished = {}
+        try:
+            for index, chunk_segments, error in _run_parallel_whisper(tasks, workers, max_retries):
+                finished[index] = (chunk_segments, error)
+                if error:
+                    print(f"[LocalWhisper] ❌ Chunk {index + 1} falhou após {max_retries} tentativas: {error}")
+                else:
+                    print(f"[LocalWhisper] ✓ Chunk {index + 1}/{total_chunks} ({len(chunk_segments)} frases)")
+            
+                # Commit finished chunks in order (keeps checkpoint log and output sorted)
+                while completed_chunks in finished:
+                    chunk_segments, error = finished.pop(completed_chunks)
+                    if error:
+                        chunk_text = f"{CHUNK_ERROR_PREFIX} {completed_chunks + 1} não transcrito]"
+                    else:
+                        chunk_text = ' '.join(seg['text'] for seg in chunk_segments)
+                    all_segments.extend(chunk_segments)
+                    text_parts.append(chunk_text)
+                    _append_checkpoint(checkpoint_path, {
+                        "i": completed_chunks,
+                        "segments": chunk_segments,
+                        "text": chunk_text
+                    })
+                    completed_chunks += 1
+                    _emit_segments(on_segments, chunk_segments)
+        except BrokenProcessPool as e:
+            # A worker died: whatever is not committed yet runs serially below
+            print(f"[LocalWhisper] ⚠ Pool de processos falhou ({e}), continuando em série do chunk {completed_chunks + 1}")
+    
+    model = None
+    if completed_chunks < total_chunks:
+        model, _, _ = _ensure_whisper_model(model_name)
+        for i in range(completed_chunks, total_chunks):
+            chunk_audio, start_time, end_time = chunks[i]
+            
+            print(f"[LocalWhisper] 📍 Chunk {i + 1}/{total_chunks} ({start_time:.1f}s - {end_time:.1f}s)")
+            
+            # Retry logic for each chunk
+            for retry in range(max_retries):
+                try:
+                    segments_gen, info = model.transcribe(
+                        _pcm_to_whisper_input(chunk_audio),
+                        language="pt",
+                        beam_size=5,
+                        vad_filter=True,
+                        vad_parameters=dict(min_silence_duration_ms=500)
+                    )
+                    
+                    chunk_text = []
+                    chunk_segments = []
+                    for seg in segments_gen:
+                        text = seg.text.strip()
+                        if text:
+                            # Adjust timestamps to global time
+                            adjusted_start = start_time + seg.start
+                            adjusted_end = start_time + seg.end
+                            
+                            chunk_segments.append({
+                                'start': adjusted_start,
+                                'end': adjusted_end,
+                                'text': text
+                            })
+                            chunk_text.append(text)
+                    
+                    all_segments.extend(chunk_segments)
+                    text_parts.append(' '.join(chunk_text))
+                    
+                    # Append this chunk to the checkpoint log
+                    completed_chunks = i + 1
+                    _append_checkpoint(checkpoint_path, {
+                        "i": i,
+                        "segments": chunk_segments,
+                        "text": text_parts[-1]
+                    })
+                    
+                    print(f"[LocalWhisper] ✓ Chunk {i + 1}/{total_chunks} ({len(chunk_text)} frases)")
+                    _emit_segments(on_segments, chunk_segments)
+                    break  # Success, exit retry loop
+                    
+                except Exception as e:
+                    print(f"[LocalWhisper] ⚠ Erro no chunk {i + 1} (tentativa {retry + 1}/{max_retries}): {e}")
+                    if retry == max_retries - 1:
+                        print(f"[LocalWhisper] ❌ Chunk {i + 1} falhou após {max_retries} tentativas. Continuando...")
+                        # Continue to next chunk instead of failing completely
+                        text_parts.append(f"{CHUNK_ERROR_PREFIX} {i + 1} não transcrito]")
+                        _append_checkpoint(checkpoint_path, {
+                            "i": i,
+                            "segments": [],
+                            "text": text_parts[-1]
                         })
-                        chunk_text.append(text)
-                
-                text_parts.append(' '.join(chunk_text))
-                
-                # Save checkpoint after each successful chunk
-                completed_chunks = i + 1
-                checkpoint = {
-                    "completed_chunks": completed_chunks,
-                    "total_chunks": total_chunks,
-                    "segments": all_segments,
-                    "text_parts": text_parts,
-                    "last_updated": datetime.now().isoformat()
-                }
-                _save_checkpoint(checkpoint_path, checkpoint)
-                
-                print(f"[LocalWhisper] ✓ Chunk {i + 1}/{total_chunks} ({len(chunk_text)} frases)")
-                break  # Success, exit retry loop
-                
-            except Exception as e:
-                print(f"[LocalWhisper] ⚠ Erro no chunk {i + 1} (tentativa {retry + 1}/{max_retries}): {e}")
-                if retry == max_retries - 1:
-                    print(f"[LocalWhisper] ❌ Chunk {i + 1} falhou após {max_retries} tentativas. Continuando...")
-                    # Continue to next chunk instead of failing completely
-                    text_parts.append(f"[ERRO: chunk {i + 1} não transcrito]")
     
     # Build final SRT
     srt_lines = []
@@ -3819,25 +4775,29 @@ def _transcribe_chunked(
     
     srt_content = '\n'.join(srt_lines)
     full_text = ' '.join(text_parts)
+    # Failed chunks (also the ones replayed from the checkpoint log) keep their placeholder text
+    errors = [part for part in text_parts if part.startswith(CHUNK_ERROR_PREFIX)]
     
     # Cleanup checkpoint on success
     if os.path.exists(checkpoint_path):
         os.remove(checkpoint_path)
         print(f"[LocalWhisper] 🧹 Checkpoint removido")
     
-    # Cleanup chunk files
-    chunk_dir = Path(audio_path).parent / "chunks"
-    if chunk_dir.exists():
-        import shutil
+    # Cleanup decoded PCM (release memmap views first)
+    del chunks
+    pcm_path = _get_pcm_path(audio_path)
+    if os.path.exists(pcm_path):
         try:
-            shutil.rmtree(chunk_dir)
-            print(f"[LocalWhisper] 🧹 Chunks temporários removidos")
+            os.remove(pcm_path)
+            print(f"[LocalWhisper] 🧹 PCM temporário removido")
         except Exception as e:
-            print(f"[LocalWhisper] ⚠ Erro ao limpar chunks: {e}")
+            print(f"[LocalWhisper] ⚠ Erro ao limpar PCM: {e}")
     
     print(f"[LocalWhisper] =====================================")
     print(f"[LocalWhisper] ✅ TRANSCRIÇÃO COMPLETA!")
     print(f"[LocalWhisper] Total: {len(full_text)} caracteres, {len(all_segments)} segmentos")
+    if errors:
+        print(f"[LocalWhisper] ⚠ Erros: {len(errors)} chunks falharam")
     print(f"[LocalWhisper] =====================================")
     
     return {
@@ -3847,10 +4807,14 @@ def _transcribe_chunked(
         "segments": all_segments,
         "matchId": match_id,
         "provider": "local_whisper",
-        "model": _whisper_model_name,
-        "device": "cuda" if hasattr(_whisper_model, 'device') else "cpu",
+        "model": model_name,
+        "device": "cuda" if hasattr(model, 'device') else "cpu",
         "chunked": True,
-        "total_chunks": total_chunks
+        "mode": "chunked",
+        "total_chunks": total_chunks,
+        "errors": errors,
+        "failed_chunks": len(errors),
+        "elapsed_seconds": round(time.time() - started, 2)
     }
 
 
@@ -3858,7 +4822,8 @@ def transcribe_upload_segments(
     upload_id: str,
     manifest_path: str,
     max_retries: int = 3,
-    progress_callback: callable = None
+    progress_callback: callable = None,
+    on_segments: callable = None
 ) -> Dict[str, Any]:
     """
     Transcribe audio segments created by audio_processor.
@@ -3874,12 +4839,11 @@ def transcribe_upload_segments(
         manifest_path: Path to manifest.json with segment info
         max_retries: Maximum retries per segment
         progress_callback: Function called with (current, total, segment_text)
+        on_segments: Optional callback(segments) called in order as each segment is available
     
     Returns:
         Dict with 'success', 'text', 'srtContent', 'segments', 'errors'
     """
-    global _whisper_model, _whisper_model_name
-    
     print(f"[UploadTranscribe] =====================================")
     print(f"[UploadTranscribe] 🎤 Iniciando transcrição de segmentos")
     print(f"[UploadTranscribe] Upload ID: {upload_id}")
@@ -3909,49 +4873,60 @@ def transcribe_upload_segments(
             "errors": ["faster-whisper not available"]
         }
     
-    # Load Whisper model (singleton)
-    try:
-        from faster_whisper import WhisperModel
-        import torch
-        
-        model_name = LOCAL_WHISPER_MODEL or 'base'
-        
-        # Check device availability
-        if _CTRANSLATE2_ROCM_ERROR:
-            device = "cpu"
-            compute_type = "int8"
-            print(f"[UploadTranscribe] ⚠️ Usando CPU (ROCm workaround)")
-        else:
-            cuda_available = torch.cuda.is_available()
-            device = "cuda" if cuda_available else "cpu"
-            compute_type = "float16" if device == "cuda" else "int8"
-        
-        print(f"[UploadTranscribe] Device: {device.upper()}")
-        
-        if _whisper_model is None or _whisper_model_name != model_name:
-            print(f"[UploadTranscribe] Carregando modelo '{model_name}'...")
-            try:
-                _whisper_model = WhisperModel(model_name, device=device, compute_type=compute_type)
-            except (OSError, FileNotFoundError, RuntimeError) as load_error:
-                if 'rocm' in str(load_error).lower() or 'cuda' in str(load_error).lower():
-                    print(f"[UploadTranscribe] ⚠️ Fallback para CPU...")
-                    _whisper_model = WhisperModel(model_name, device="cpu", compute_type="int8")
-                else:
-                    raise
-            _whisper_model_name = model_name
-            print(f"[UploadTranscribe] ✓ Modelo carregado!")
-            
-    except ImportError as e:
-        return {"success": False, "error": f"Dependência não instalada: {e}", "errors": [str(e)]}
-    except Exception as e:
-        return {"success": False, "error": f"Erro ao carregar modelo: {e}", "errors": [str(e)]}
-    
     # Import checkpoint functions from audio_processor
     from audio_processor import load_segment_checkpoint, save_segment_checkpoint
+    from concurrent.futures.process import BrokenProcessPool
+    
+    model_name = LOCAL_WHISPER_MODEL or 'base'
+    pending = [
+        (i, seg.get('path'), seg.get('startMs', 0) / 1000.0)
+        for i, seg in enumerate(segments)
+        if seg.get('path') and os.path.exists(seg.get('path')) and not load_segment_checkpoint(upload_id, i)
+    ]
+    workers = _get_whisper_worker_count(len(pending))
+    
+    # Load Whisper model (pooled singleton) - parallel mode only needs it if
+    # segments are left for the serial loop (the workers load their own)
+    if workers <= 1:
+        try:
+            model, device, compute_type = _ensure_whisper_model(model_name)
+            if _CTRANSLATE2_ROCM_ERROR:
+                print(f"[UploadTranscribe] ⚠️ Usando CPU (ROCm workaround)")
+            print(f"[UploadTranscribe] Device: {device.upper()} | Modelo: {model_name}")
+                
+        except ImportError as e:
+            return {"success": False, "error": f"Dependência não instalada: {e}", "errors": [str(e)]}
+        except Exception as e:
+            return {"success": False, "error": f"Erro ao carregar modelo: {e}", "errors": [str(e)]}
     
     all_transcripts = []
     errors = []
     
+    # Parallel mode: transcribe pending segments on the worker pool first and
+    # checkpoint each one; the loop below then picks them up from checkpoints.
+    # Segments that fail here (or are left when a worker dies) are retried
+    # serially with the global model.
+    if workers > 1:
+        done = total - len(pending)
+        try:
+            for index, seg_results, error in _run_parallel_whisper(pending, workers, max_retries):
+                done += 1
+                if error:
+                    print(f"[UploadTranscribe] ⚠ Segmento {index+1} falhou no pool: {error}")
+                    continue
+                segment_text = ' '.join(r['text'] for r in seg_results)
+                save_segment_checkpoint(
+                    upload_id, index,
+                    text=segment_text,
+                    start_ms=segments[index].get('startMs', 0),
+                    end_ms=segments[index].get('endMs', 0)
+                )
+                print(f"[UploadTranscribe] ✓ Segmento {index+1}/{total} ({len(segment_text)} chars)")
+                if progress_callback:
+                    progress_callback(done, total, segment_text[:50])
+        except BrokenProcessPool as e:
+            print(f"[UploadTranscribe] ⚠ Pool de processos falhou ({e}), restante em série")
+    
     for i, seg in enumerate(segments):
         segment_path = seg.get('path')
         start_ms = seg.get('startMs', 0)
@@ -3966,6 +4941,11 @@ def transcribe_upload_segments(
                 'startMs': checkpoint.get('startMs', start_ms),
                 'endMs': checkpoint.get('endMs', end_ms)
             })
+            _emit_segments(on_segments, [{
+                'start': checkpoint.get('startMs', start_ms) / 1000.0,
+                'end': checkpoint.get('endMs', end_ms) / 1000.0,
+                'text': checkpoint.get('text', '')
+            }])
             if progress_callback:
                 progress_callback(i + 1, total, checkpoint.get('text', '')[:50])
             continue
@@ -3982,7 +4962,8 @@ def transcribe_upload_segments(
         
         for retry in range(max_retries):
             try:
-                segments_gen, info = _whisper_model.transcribe(
+                model, _, _ = _ensure_whisper_model(model_name)
+                segments_gen, info = model.transcribe(
                     segment_path,
                     language="pt",
                     beam_size=5,
@@ -4014,6 +4995,7 @@ def transcribe_upload_segments(
                 })
                 
                 print(f"[UploadTranscribe] ✓ Segmento {i+1}/{total} ({len(segment_text)} chars)")
+                _emit_segments(on_segments, [{'start': start_ms / 1000.0, 'end': end_ms / 1000.0, 'text': segment_text}])
                 transcribed = True
                 break
                 
@@ -4060,7 +5042,7 @@ def transcribe_upload_segments(
         "segments": all_transcripts,
         "errors": errors,
         "provider": "local_whisper",
-        "model": _whisper_model_name or "base",
+        "model": model_name,
         "total_segments": total,
         "transcribed_segments": len(all_transcripts)
     }
@@ -4087,7 +5069,7 @@ def _transcribe_with_elevenlabs(audio_path: str, match_id: str = None) -> Dict[s
         print(f"[ElevenLabs] Transcrevendo {audio_size_mb:.1f}MB com Scribe v1...")
         
         with open(audio_path, 'rb') as audio_file:
-            response = requests.post(
+            response = http_pool.session('elevenlabs').post(
                 'https://api.elevenlabs.io/v1/speech-to-text',
                 headers={
                     'xi-api-key': ELEVENLABS_API_KEY
@@ -4101,7 +5083,7 @@ def _transcribe_with_elevenlabs(audio_path: str, match_id: str = None) -> Dict[s
                     'diarize': 'false',
                     'tag_audio_events': 'false'
                 },
-                timeout=900  # 15 minutes for large files
+                timeout=http_pool.timeout('long_upload', 'elevenlabs')  # 15 minutes for large files
             )
         
         if not response.ok:
@@ -4168,7 +5150,77 @@ def _transcribe_with_elevenlabs(audio_path: str, match_id: str = None) -> Dict[s
         return {"error": f"ElevenLabs error: {str(e)}", "success": False}
 
 
-def transcribe_audio_file(audio_path: str, match_id: str = None, language: str = 'pt') -> Dict[str, Any]:
+def _gemini_transcription_model() -> str:
+    """Gemini model _transcribe_with_gemini runs (Lovable gateway or direct Google API)."""
+    return 'google/gemini-2.5-flash' if LOVABLE_API_KEY else 'gemini-2.0-flash'
+
+
+def _transcription_model(provider: str) -> str:
+    """Model used by a transcription provider (part of the transcription cache key)."""
+    return {
+        'local_whisper': LOCAL_WHISPER_MODEL or 'base',
+        'gemini': _gemini_transcription_model(),
+        'openai_whisper': 'whisper-1',
+        'elevenlabs': 'scribe_v1',
+    }.get(provider, provider)
+
+
+def get_transcription_cache_candidates(providers: List[str]) -> List[Tuple[str, str]]:
+    """(provider, model) pairs to look up in the transcription cache, in priority order."""
+    return [(provider, _transcription_model(provider)) for provider in providers]
+
+
+def cache_transcription_result(audio_path: str, result: Dict[str, Any], language: str = 'pt') -> bool:
+    """Store a complete provider result in the transcription cache (partial results are never cached)."""
+    from transcription_cache import store_transcription
+    if not result or not result.get('success'):
+        return False
+    if result.get('errors') or result.get('failedChunks') or result.get('partial'):
+        print("[TranscriptionCache] ⚠ Transcrição parcial não será salva no cache")
+        return False
+    provider = result.get('provider') or 'unknown'
+    model = result.get('model') or _transcription_model(provider)
+    return store_transcription(audio_path, result, provider, model, language)
+
+
+def transcribe_audio_file(audio_path: str, match_id: str = None, language: str = 'pt', on_segments: callable = None) -> Dict[str, Any]:
+    """
+    Transcribe a single audio file, reusing the transcription cache when this
+    exact audio was already transcribed by one of the enabled providers.
+    
+    This is the main entry point for chunk-based transcription.
+    See _transcribe_audio_file_with_providers for the provider priority.
+    on_segments (e.g. IncrementalTranscript.add_segments) receives the
+    segments as they are produced, or the cached segments on a cache hit.
+    """
+    from transcription_cache import find_cached_transcription
+    
+    if not os.path.exists(audio_path):
+        return {
+            "success": False,
+            "error": f"Audio file not found: {audio_path}"
+        }
+    
+    providers = []
+    if LOCAL_WHISPER_ENABLED:
+        providers.append('local_whisper')
+    if OPENAI_API_KEY and OPENAI_ENABLED:
+        providers.append('openai_whisper')
+    if ELEVENLABS_API_KEY and ELEVENLABS_ENABLED:
+        providers.append('elevenlabs')
+    
+    cached = find_cached_transcription(audio_path, get_transcription_cache_candidates(providers), language)
+    if cached:
+        cached['matchId'] = match_id
+        _emit_segments(on_segments, cached.get('segments') or [])
+        return cached
+    
+    result = _transcribe_audio_file_with_providers(audio_path, match_id, language, on_segments=on_segments)
+    cache_transcription_result(audio_path, result, language)
+    return result
+
+
+def _transcribe_audio_file_with_providers(audio_path: str, match_id: str = None, language: str = 'pt', on_segments: callable = None) -> Dict[str, Any]:
     """
     Transcribe a single audio file using the best available provider.
     
@@ -4177,12 +5229,12 @@ def transcribe_audio_file(audio_path: str, match_id: str = None, language: str =
     2. OpenAI Whisper API (paid)
     3. ElevenLabs (paid)
     
-    This is the main entry point for chunk-based transcription.
-    
     Args:
         audio_path: Path to audio file (WAV, MP3, etc.)
         match_id: Optional match ID for metadata
         language: Language code (default: 'pt' for Portuguese)
+        on_segments: Optional callback(segments); Local Whisper streams them,
+            the API providers hand over all segments once they return
     
     Returns:
         Dict with:
@@ -4205,7 +5257,7 @@ def transcribe_audio_file(audio_path: str, match_id: str = None, language: str =
     # Priority 1: Local Whisper (FREE)
     if LOCAL_WHISPER_ENABLED:
         print(f"[TranscribeFile] Tentando Local Whisper...")
-        result = _transcribe_with_local_whisper(audio_path, match_id)
+        result = _transcribe_with_local_whisper(audio_path, match_id, on_segments=on_segments)
         if result.get('success'):
             result['provider'] = 'local_whisper'
             print(f"[TranscribeFile] ✓ Local Whisper: {len(result.get('text', ''))} chars")
@@ -4218,7 +5270,7 @@ def transcribe_audio_file(audio_path: str, match_id: str = None, language: str =
         print(f"[TranscribeFile] Tentando OpenAI Whisper API...")
         try:
             with open(audio_path, 'rb') as audio_file:
-                response = requests.post(
+                response = http_pool.session('openai').post(
                     f'{OPENAI_API_URL}/audio/transcriptions',
                     headers={'Authorization': f'Bearer {OPENAI_API_KEY}'},
                     files={'file': audio_file},
@@ -4227,7 +5279,7 @@ def transcribe_audio_file(audio_path: str, match_id: str = None, language: str =
                         'language': language,
                         'response_format': 'verbose_json'
                     },
-                    timeout=300
+                    timeout=http_pool.timeout('transcription', 'openai')
                 )
             
             if response.ok:
@@ -4243,6 +5295,10 @@ def transcribe_audio_file(audio_path: str, match_id: str = None, language: str =
                     srt_lines.append(f"{i}\n{start_str} --> {end_str}\n{seg.get('text', '').strip()}\n")
                 
                 print(f"[TranscribeFile] ✓ OpenAI Whisper: {len(text)} chars")
+                _emit_segments(on_segments, [
+                    {'start': seg.get('start', 0), 'end': seg.get('end', 0), 'text': seg.get('text', '').strip()}
+                    for seg in segments
+                ])
                 return {
                     "success": True,
                     "text": text,
@@ -4263,6 +5319,7 @@ def transcribe_audio_file(audio_path: str, match_id: str = None, language: str =
         if result.get('success'):
             result['provider'] = 'elevenlabs'
             print(f"[TranscribeFile] ✓ ElevenLabs: {len(result.get('text', ''))} chars")
+            _emit_segments(on_segments, result.get('segments') or [])
             return result
         else:
             print(f"[TranscribeFile] ElevenLabs falhou: {result.get('error')}")
@@ -4322,11 +5379,11 @@ def call_openai_gpt5(
     for attempt in range(max_retries):
         try:
             print(f"[AI] 🧠 Chamando OpenAI {model}..." + (f" (tentativa {attempt + 1}/{max_retries})" if attempt > 0 else ""))
-            response = requests.post(
+            response = http_pool.session('openai').post(
                 f'{OPENAI_API_URL}/chat/completions',
                 headers=headers,
                 json=payload,
-                timeout=180
+                timeout=http_pool.timeout('reasoning', 'openai')
             )
             
             # Handle rate limit with retry
@@ -4387,6 +5444,7 @@ def detect_events_with_gpt(
     Returns:
         Dict with detected events and metadata
     """
+    import time
     import hashlib
     from datetime import datetime
     from storage import get_subfolder_path
@@ -4447,14 +5505,27 @@ Para CADA evento detectado, extraia:
 
 FORMATO: Retorne APENAS um array JSON válido, sem explicações."""
 
+    # Apenas janelas relevantes (candidatos + gols) se a transcrição passar do orçamento
+    context = prompt_context.build_relevance_context(
+        transcription, home_team, away_team,
+        token_budget=prompt_context.TOKEN_BUDGETS['cloud'],
+        half=half,
+        segment_start_minute=game_start_minute
+    )
+    transcription_title = (
+        "TRECHOS RELEVANTES DA TRANSCRIÇÃO (formato SRT com timestamps, [...] = trecho omitido)"
+        if context['compressed'] else
+        "TRANSCRIÇÃO COMPLETA (formato SRT com timestamps)"
+    )
+
     user_prompt = f"""⚽ MISSÃO: ENCONTRAR TODOS OS EVENTOS DA PARTIDA ⚽
 
 PARTIDA: {home_team} vs {away_team}
 PERÍODO: {half_desc} (minutos {game_start_minute}' a {game_end_minute}')
 
-TRANSCRIÇÃO COMPLETA (formato SRT com timestamps):
+{transcription_title}:
 ═══════════════════════════════════════════════════════════════
-{transcription}
+{context['text']}
 ═══════════════════════════════════════════════════════════════
 
 CHECKLIST OBRIGATÓRIO:
@@ -4467,6 +5538,7 @@ CHECKLIST OBRIGATÓRIO:
 Retorne o array JSON com TODOS os eventos detectados:"""
 
     print(f"[AI] 🧠 FASE 1: GPT-4o detectando eventos do {half_desc}...")
+    started = time.time()
     
     # Try GPT-4o first (stable, cost-effective, good for structured extraction)
     response = call_openai_gpt5([
@@ -4482,9 +5554,11 @@ Retorne o array JSON com TODOS os eventos detectados:"""
         response = call_ai([
             {'role': 'system', 'content': system_prompt},
             {'role': 'user', 'content': user_prompt}
-        ], model='google/gemini-2.5-flash', max_tokens=8192)
+        ], model='google/gemini-2.5-flash', max_tokens=8192, use_cache=True)
         generator_model = 'google/gemini-2.5-flash'
     
+    prompt_stats = prompt_context.record_prompt_stats('detect_events_with_gpt', half, context, started, bool(response))
+    
     if not response:
         print(f"[AI] ❌ Nenhuma IA conseguiu processar a transcrição")
         return {"match_id": match_id, "events": [], "error": "AI processing failed"}
@@ -4523,7 +5597,8 @@ Retorne o array JSON com TODOS os eventos detectados:"""
         "home_team": home_team,
         "away_team": away_team,
         "total_events": len(events),
-        "events": events
+        "events": events,
+        "prompt_stats": prompt_stats
     }
     
     # Count events by type
@@ -4646,7 +5721,7 @@ Retorne APENAS o array JSON, sem explicações."""
     response = call_ai([
         {'role': 'system', 'content': 'Você é um sistema de revisão rigoroso. Confirme apenas eventos com evidência clara no texto.'},
         {'role': 'user', 'content': validation_prompt}
-    ], model='google/gemini-2.5-flash', max_tokens=4096)
+    ], model='google/gemini-2.5-flash', max_tokens=4096, use_cache=True)
     
     if not response:
         print(f"[AI] ⚠ Validação falhou, mantendo todos os eventos")
@@ -4791,37 +5866,20 @@ def deduplicate_goal_events(events: List[Dict[str, Any]], min_interval_seconds:
     if len(goals) <= 1:
         return events  # Nada a deduplicar
     
-    # Ordenar gols por tempo (minuto + segundo)
     def get_total_seconds(g):
         minute = g.get('minute', 0) or 0
         second = g.get('second', 0) or 0
         return minute * 60 + second
     
-    goals_sorted = sorted(goals, key=get_total_seconds)
-    
-    # Filtrar gols duplicados (mesmo time, intervalo < min_interval_seconds)
-    deduplicated_goals = []
-    last_goal_by_team = {}  # {team: last_goal_second}
-    
-    for goal in goals_sorted:
-        team = goal.get('team', 'home')
-        current_seconds = get_total_seconds(goal)
-        
-        # Verificar se já houve um gol recente do mesmo time
-        if team in last_goal_by_team:
-            last_seconds = last_goal_by_team[team]
-            interval = current_seconds - last_seconds
-            
-            if interval < min_interval_seconds:
-                # Gol duplicado detectado - pular
-                print(f"[AI] ⚠️ DEDUP: Removendo gol duplicado do time '{team}' - "
-                      f"intervalo de apenas {interval}s (min: {min_interval_seconds}s)")
-                print(f"[AI]   → Gol removido: {goal.get('minute', 0)}'{goal.get('second', 0)}'' - {goal.get('description', '')[:50]}")
-                continue
-        
-        # Gol válido - manter
-        deduplicated_goals.append(goal)
-        last_goal_by_team[team] = current_seconds
+    # Filtrar gols duplicados (mesmo time, intervalo < min_interval_seconds, mantém o primeiro)
+    deduplicated_goals, _ = sweep_deduplicate(
+        goals,
+        threshold_seconds=min_interval_seconds,
+        bucket_key=lambda g: g.get('team', 'home'),
+        time_key=get_total_seconds,
+        policy='first',
+        log_prefix='[AI] ⚠️ DEDUP:'
+    )
     
     if len(deduplicated_goals) < len(goals):
         removed = len(goals) - len(deduplicated_goals)
@@ -5276,17 +6334,14 @@ def detect_events_by_keywords_from_text(
     # 4. Validar timestamps (remover zeros inválidos)
     events = validate_event_timestamps(events, video_duration)
     
-    # 5. Deduplicar por tipo (gols precisam de janela maior)
-    events_by_type = {}
-    for e in events:
-        et = e.get('event_type', 'unknown')
-        events_by_type.setdefault(et, []).append(e)
-
+    # 5. Deduplicar por tipo e time (gols precisam de janela maior)
     text_dedup_thresholds = {'goal': 120, 'penalty': 60, 'red_card': 60, 'yellow_card': 45}
-    deduped = []
-    for etype, type_events in events_by_type.items():
-        threshold = text_dedup_thresholds.get(etype, 30)
-        deduped.extend(deduplicate_events(type_events, threshold_seconds=threshold))
+    deduped, _ = sweep_deduplicate(
+        events,
+        threshold_seconds=30,
+        thresholds_by_type=text_dedup_thresholds,
+        policy='confidence'
+    )
 
     events = sorted(deduped, key=lambda e: e.get('videoSecond', 0))
     print(f"[Keywords-Text] Total: {len(events)} eventos detectados")
@@ -5400,8 +6455,21 @@ def _analyze_events_with_ollama(
     Returns:
         List of detected events
     """
+    import time
+    
     half_desc = "1º Tempo" if match_half == 'first' else "2º Tempo"
     
+    # Janelas relevantes com timestamps em vez dos primeiros 24000 chars
+    context = prompt_context.build_relevance_context(
+        transcription, home_team, away_team,
+        token_budget=prompt_context.TOKEN_BUDGETS['ollama'],
+        half=match_half,
+        segment_start_minute=game_start_minute
+    )
+    prompt_transcription = context['text'] if context['compressed'] else transcription[:24000]
+    if not context['compressed']:
+        context['prompt_tokens'] = prompt_context.estimate_tokens(prompt_transcription)
+    
     # ═══════════════════════════════════════════════════════════════════════════
     # PROMPT OTIMIZADO - Versão 2.0
     # Simplificado para melhor performance com modelos 7B (mistral, qwen2.5)
@@ -5425,7 +6493,7 @@ Use o timestamp do bloco SRT (00:MM:SS), NÃO o minuto falado pelo narrador.
 Exemplo: Se o bloco SRT mostra "00:24:52,253 --> ..." use minute=24, second=52
 
 TRANSCRIÇÃO:
-{transcription[:24000]}
+{prompt_transcription}
 
 Retorne APENAS um array JSON com os eventos detectados. Sem texto antes ou depois.
 Formato obrigatório:
@@ -5433,6 +6501,7 @@ Formato obrigatório:
 
     try:
         print(f"[Ollama] Analisando transcrição com {OLLAMA_MODEL} (temperature=0.1, format=json)...")
+        started = time.time()
         
         result = call_ollama(
             messages=[{'role': 'user', 'content': prompt}],
@@ -5441,6 +6510,7 @@ Formato obrigatório:
             max_tokens=4096,
             format="json"     # Força JSON válido (elimina parsing errors)
         )
+        prompt_context.record_prompt_stats('_analyze_events_with_ollama', match_half, context, started, bool(result))
         
         # ═══════════════════════════════════════════════════════════════════════════
         # FALLBACK: Se Ollama falhou, tentar outros provedores de IA
@@ -6341,7 +7411,7 @@ RETORNE APENAS O ARRAY JSON, SEM TEXTO ADICIONAL."""
             response = call_ai([
                 {'role': 'system', 'content': system_prompt},
                 {'role': 'user', 'content': user_prompt}
-            ], model='google/gemini-2.5-flash', max_tokens=8192, settings=settings)
+            ], model='google/gemini-2.5-flash', max_tokens=8192, settings=settings, use_cache=True)
             
             if not response:
                 last_error = "Empty response from AI"
@@ -6715,7 +7785,7 @@ Retorne APENAS um JSON válido com a seguinte estrutura:
     response = call_ai([
         {'role': 'system', 'content': system_prompt},
         {'role': 'user', 'content': f"Eventos da partida:\n{events_text}"}
-    ], max_tokens=4096)
+    ], max_tokens=4096, use_cache=True)
     
     if not response:
         return {
@@ -6805,22 +7875,16 @@ Retorne um JSON com:
     return {'error': 'Failed to parse analysis'}
 
 
-def chatbot_response(
+CHATBOT_FALLBACK_REPLY = 'Desculpe, não consegui processar sua mensagem. Tente novamente.'
+TEAM_CHATBOT_FALLBACK_REPLY = 'Opa, deu ruim aqui! Manda de novo aí, torcedor!'
+
+
+def _build_chatbot_messages(
     message: str,
     match_context: Dict = None,
     conversation_history: List[Dict] = None
-) -> str:
-    """
-    Generate chatbot response for Arena Play assistant.
-    
-    Args:
-        message: User message
-        match_context: Optional match context
-        conversation_history: Previous conversation messages
-    
-    Returns:
-        Chatbot response text
-    """
+) -> List[Dict[str, str]]:
+    """System prompt + last 10 history messages + user message for the Arena Play assistant."""
     system_prompt = """Você é o Arena Play Assistant, um especialista multifunção da plataforma Arena Play.
 
 ## SUAS 3 FUNÇÕES PRINCIPAIS:
@@ -6898,31 +7962,46 @@ Foque em ajudar como mentor do sistema ou consultor de campanhas."""
         messages.extend(conversation_history[-10:])  # Keep last 10 messages
     
     messages.append({'role': 'user', 'content': message})
-    
-    response = call_ai(messages)
-    return response or 'Desculpe, não consegui processar sua mensagem. Tente novamente.'
+    return messages
 
 
-def team_chatbot_response(
+def chatbot_response(
     message: str,
-    team_name: str,
-    team_type: str,
     match_context: Dict = None,
     conversation_history: List[Dict] = None
 ) -> str:
     """
-    Generate team-specific chatbot response.
+    Generate chatbot response for Arena Play assistant.
     
     Args:
         message: User message
-        team_name: Team name
-        team_type: home or away
-        match_context: Match context
-        conversation_history: Previous messages
+        match_context: Optional match context
+        conversation_history: Previous conversation messages
     
     Returns:
         Chatbot response text
     """
+    response = call_ai(_build_chatbot_messages(message, match_context, conversation_history), hedged=True)
+    return response or CHATBOT_FALLBACK_REPLY
+
+
+def chatbot_response_stream(
+    message: str,
+    match_context: Dict = None,
+    conversation_history: List[Dict] = None
+) -> Iterator[str]:
+    """Streaming version of chatbot_response (yields text chunks, see stream_ai)."""
+    return stream_ai(_build_chatbot_messages(message, match_context, conversation_history))
+
+
+def _build_team_chatbot_messages(
+    message: str,
+    team_name: str,
+    team_type: str,
+    match_context: Dict = None,
+    conversation_history: List[Dict] = None
+) -> List[Dict[str, str]]:
+    """System prompt (team fan persona) + last 10 history messages + user message."""
     system_prompt = f"""Você é um torcedor fanático do {team_name}!
 Você vive e respira esse time. Defenda seu time com paixão!
 Use gírias de torcedor, seja emotivo e apaixonado.
@@ -6940,9 +8019,45 @@ Partida atual:
         messages.extend(conversation_history[-10:])
     
     messages.append({'role': 'user', 'content': message})
+    return messages
+
+
+def team_chatbot_response(
+    message: str,
+    team_name: str,
+    team_type: str,
+    match_context: Dict = None,
+    conversation_history: List[Dict] = None
+) -> str:
+    """
+    Generate team-specific chatbot response.
+    
+    Args:
+        message: User message
+        team_name: Team name
+        team_type: home or away
+        match_context: Match context
+        conversation_history: Previous messages
     
-    response = call_ai(messages)
-    return response or 'Opa, deu ruim aqui! Manda de novo aí, torcedor!'
+    Returns:
+        Chatbot response text
+    """
+    response = call_ai(
+        _build_team_chatbot_messages(message, team_name, team_type, match_context, conversation_history),
+        hedged=True
+    )
+    return response or TEAM_CHATBOT_FALLBACK_REPLY
+
+
+def team_chatbot_response_stream(
+    message: str,
+    team_name: str,
+    team_type: str,
+    match_context: Dict = None,
+    conversation_history: List[Dict] = None
+) -> Iterator[str]:
+    """Streaming version of team_chatbot_response (yields text chunks, see stream_ai)."""
+    return stream_ai(_build_team_chatbot_messages(message, team_name, team_type, match_context, conversation_history))
 
 
 def transcribe_audio_base64(audio_base64: str, language: str = 'pt') -> Optional[str]:
@@ -7087,7 +8202,7 @@ IMPORTANTE: Retorne APENAS um array JSON válido. Sem texto adicional."""
     response = call_ai([
         {'role': 'system', 'content': system_prompt},
         {'role': 'user', 'content': f"Transcrição: {transcript}"}
-    ], max_tokens=2048)
+    ], max_tokens=2048, hedged=True)
     
     if not response:
         return []
@@ -7159,7 +8274,7 @@ Retorne JSON com:
     
     # Try Lovable AI first
     if LOVABLE_API_KEY:
-        response = requests.post(
+        response = http_pool.session('lovable').post(
             LOVABLE_API_URL,
             headers={
                 'Authorization': f'Bearer {LOVABLE_API_KEY}',
@@ -7170,7 +8285,7 @@ Retorne JSON com:
                 'messages': [{'role': 'user', 'content': content}],
                 'max_tokens': 2048
             },
-            timeout=60
+            timeout=http_pool.timeout('validation', 'lovable')
         )
     elif GOOGLE_API_KEY:
         # Use Google Gemini directly for vision
@@ -7178,13 +8293,13 @@ Retorne JSON com:
         if image_data:
             parts.append({"inline_data": {"mime_type": "image/jpeg", "data": image_data}})
         
-        response = requests.post(
+        response = http_pool.session('gemini').post(
             f"{GOOGLE_API_URL}/models/gemini-2.0-flash:generateContent?key={GOOGLE_API_KEY}",
             json={
                 'contents': [{'role': 'user', 'parts': parts}],
                 'generationConfig': {'maxOutputTokens': 2048}
             },
-            timeout=60
+            timeout=http_pool.timeout('validation', 'gemini')
         )
     else:
         return {"error": "No API key configured"}
@@ -7249,7 +8364,7 @@ def generate_thumbnail_image(
     try:
         if use_lovable:
             # Usar Lovable AI Gateway
-            response = requests.post(
+            response = http_pool.session('lovable').post(
                 LOVABLE_API_URL,
                 headers={
                     'Authorization': f'Bearer {LOVABLE_API_KEY}',
@@ -7260,7 +8375,7 @@ def generate_thumbnail_image(
                     'messages': [{'role': 'user', 'content': image_prompt}],
                     'modalities': ['image', 'text']
                 },
-                timeout=120
+                timeout=http_pool.timeout('chat', 'lovable')
             )
             
             if not response.ok:
@@ -7286,14 +8401,14 @@ def generate_thumbnail_image(
             # Fallback: Usar Google Gemini API diretamente
             api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp-image-generation:generateContent?key={GOOGLE_API_KEY}"
             
-            response = requests.post(
+            response = http_pool.session('gemini').post(
                 api_url,
                 headers={'Content-Type': 'application/json'},
                 json={
                     'contents': [{'parts': [{'text': image_prompt}]}],
                     'generationConfig': {'responseModalities': ['TEXT', 'IMAGE']}
                 },
-                timeout=120
+                timeout=http_pool.timeout('chat', 'gemini')
             )
             
             if not response.ok:
@@ -7352,11 +8467,8 @@ def _transcribe_gemini_chunks(audio_path: str, tmpdir: str, match_id: str = None
     num_chunks = int(audio_size_mb / max_chunk_size_mb) + 1
     
     # Get audio duration using ffprobe
-    try:
-        probe_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1', audio_path]
-        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=30)
-        total_duration = float(probe_result.stdout.strip())
-    except:
+    total_duration = media_probe.get_duration(audio_path)
+    if total_duration <= 0:
         # Estimate duration based on file size (~128kbps = 16KB/s)
         total_duration = audio_size_bytes / (16 * 1024)
     
@@ -7485,6 +8597,7 @@ def _transcribe_gemini_chunks(audio_path: str, tmpdir: str, match_id: str = None
         "srtContent": combined_srt,
         "matchId": match_id,
         "provider": "gemini",
+        "model": _gemini_transcription_model(),
         "chunksProcessed": successful_chunks,
         "totalChunks": num_chunks,
         "partial": is_partial,
@@ -7496,10 +8609,9 @@ def _transcribe_gemini_chunks(audio_path: str, tmpdir: str, match_id: str = None
 def _get_audio_duration(audio_path: str) -> float:
     """Get audio duration in seconds using ffprobe."""
     try:
-        probe_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-                     '-of', 'default=noprint_wrappers=1:nokey=1', audio_path]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=30)
-        duration = float(result.stdout.strip())
+        duration = media_probe.get_duration(audio_path)
+        if duration <= 0:
+            raise ValueError('ffprobe sem duração')
         print(f"[AudioDuration] Duração real do áudio: {duration:.2f}s ({duration/60:.1f}min)")
         return duration
     except Exception as e:
@@ -7549,7 +8661,7 @@ def _transcribe_with_gemini(audio_path: str, match_id: str = None, audio_duratio
         
         # Use Lovable AI Gateway if available
         if LOVABLE_API_KEY:
-            response = requests.post(
+            response = http_pool.session('lovable').post(
                 LOVABLE_API_URL,
                 headers={
                     'Authorization': f'Bearer {LOVABLE_API_KEY}',
@@ -7576,11 +8688,11 @@ Se houver múltiplos falantes, separe as falas com quebras de linha.'''
                         ]
                     }]
                 },
-                timeout=600
+                timeout=http_pool.timeout('video_analysis', 'lovable')
             )
         else:
             # Use Google Generative AI API directly
-            response = requests.post(
+            response = http_pool.session('gemini').post(
                 f'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GOOGLE_API_KEY}',
                 headers={'Content-Type': 'application/json'},
                 json={
@@ -7600,7 +8712,7 @@ Se houver múltiplos falantes, separe as falas com quebras de linha.'''
                         ]
                     }]
                 },
-                timeout=600
+                timeout=http_pool.timeout('video_analysis', 'gemini')
             )
         
         if not response.ok:
@@ -7659,7 +8771,8 @@ Se houver múltiplos falantes, separe as falas com quebras de linha.'''
             "text": text,
             "srtContent": srt_content,
             "matchId": match_id,
-            "provider": "gemini"
+            "provider": "gemini",
+            "model": _gemini_transcription_model()
         }
         
     except Exception as e:
@@ -7670,7 +8783,8 @@ def transcribe_large_video(
     video_url: str,
     match_id: str = None,
     max_chunk_size_mb: int = 20,
-    half_type: str = None
+    half_type: str = None,
+    on_segments: callable = None
 ) -> Dict[str, Any]:
     """
     Transcribe a large video file with multi-chunk support.
@@ -7685,6 +8799,8 @@ def transcribe_large_video(
         match_id: Related match ID
         max_chunk_size_mb: Maximum size per chunk in MB (default: 20MB)
         half_type: 'first' or 'second' to label saved files
+        on_segments: Optional callback(segments) for streaming consumers
+            (only the local Whisper chunked/batched paths stream)
     
     Returns:
         Dict with transcription and SRT content
@@ -7745,7 +8861,7 @@ def transcribe_large_video(
         else:
             print(f"[Transcribe] URL externa, baixando...")
             try:
-                response = requests.get(video_url, stream=True, timeout=300)
+                response = http_pool.session('download').get(video_url, stream=True, timeout=http_pool.timeout('download', 'download'))
                 response.raise_for_status()
                 with open(video_path, 'wb') as f:
                     for chunk in response.iter_content(chunk_size=8192):
@@ -7790,10 +8906,17 @@ def transcribe_large_video(
                 traceback.print_exc()
         
         # ========== TRANSCRIPTION ==========
-        transcription_result = None
+        from transcription_cache import find_cached_transcription
+        cache_providers = (['gemini'] if gemini_available else []) + (['local_whisper'] if local_whisper_available else [])
+        transcription_result = find_cached_transcription(audio_path, get_transcription_cache_candidates(cache_providers))
+        
+        if transcription_result:
+            print(f"[Transcribe] ♻️ Transcrição reaproveitada do cache ({transcription_result.get('provider')})")
+            # Streaming consumers still get the cached segments, as a live run would send them
+            _emit_segments(on_segments, transcription_result.get('segments') or [])
         
         # ===== PROVEDOR 1: Google Gemini (via Lovable ou direto) =====
-        if gemini_available:
+        elif gemini_available:
             print(f"[Transcribe] 🌐 Usando Google Gemini para transcrição...")
             
             # Obter duração real do áudio para sincronização precisa do SRT
@@ -7817,18 +8940,20 @@ def transcribe_large_video(
                 # Fallback para Whisper Local se disponível
                 if local_whisper_available:
                     print(f"[Transcribe] 🔄 Fallback para Whisper Local...")
-                    transcription_result = _transcribe_with_local_whisper(audio_path, match_id)
+                    transcription_result = _transcribe_with_local_whisper(audio_path, match_id, on_segments=on_segments)
         
         # ===== PROVEDOR 2: Whisper Local (fallback) =====
         elif local_whisper_available:
             print(f"[Transcribe] 🆓 Usando Whisper Local (offline)...")
-            transcription_result = _transcribe_with_local_whisper(audio_path, match_id)
+            transcription_result = _transcribe_with_local_whisper(audio_path, match_id, on_segments=on_segments)
         
         # Verificar resultado final
         if not transcription_result or not transcription_result.get('success'):
             error_msg = transcription_result.get('error', 'Nenhum provedor conseguiu transcrever') if transcription_result else 'Falha na transcrição'
             return {"error": error_msg, "success": False}
         
+        cache_transcription_result(audio_path, transcription_result)
+        
         # ========== SAVE SRT AND TXT TO MATCH FOLDER ==========
         if match_id and transcription_result.get('success'):
             half_label = half_type or 'full'
@@ -7902,16 +9027,10 @@ def _transcribe_multi_chunk(
     from storage import save_file
     
     # Get audio duration
-    probe_cmd = [
-        'ffprobe', '-v', 'quiet', '-print_format', 'json',
-        '-show_format', audio_path
-    ]
-    probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=30)
-    if probe_result.returncode != 0:
+    if media_probe.probe(audio_path) is None:
         return {"error": "Failed to probe audio duration"}
     
-    probe_data = json.loads(probe_result.stdout)
-    total_duration = float(probe_data.get('format', {}).get('duration', 0))
+    total_duration = media_probe.get_duration(audio_path)
     audio_size_bytes = os.path.getsize(audio_path)
     audio_size_mb = audio_size_bytes / (1024 * 1024)
     
@@ -7975,7 +9094,7 @@ def _transcribe_multi_chunk(
         for attempt in range(max_retries):
             try:
                 with open(chunk_path, 'rb') as chunk_file:
-                    response = requests.post(
+                    response = http_pool.session('openai').post(
                         f'{OPENAI_API_URL}/audio/transcriptions',
                         headers={'Authorization': f'Bearer {OPENAI_API_KEY}'},
                         files={'file': chunk_file},
@@ -7984,7 +9103,7 @@ def _transcribe_multi_chunk(
                             'language': 'pt',
                             'response_format': 'verbose_json'
                         },
-                        timeout=300
+                        timeout=http_pool.timeout('transcription', 'openai')
                     )
                 
                 # Handle specific error codes
@@ -8185,6 +9304,11 @@ def extract_frames_for_analysis(video_path: str, center_second: float, window_se
     return frames_base64
 
 
+def get_vision_provider() -> str:
+    """Provider used by the Vision helpers (Lovable gateway first, then Gemini direct)."""
+    return 'lovable' if LOVABLE_API_KEY else 'gemini'
+
+
 def detect_goal_visual_cues(
     video_path: str, 
     estimated_second: float, 
@@ -8289,7 +9413,7 @@ IMPORTANTE: Responda APENAS com o JSON, sem markdown."""
     try:
         # Try Lovable AI Gateway first (supports vision)
         if LOVABLE_API_KEY:
-            response = requests.post(
+            response = http_pool.session('lovable').post(
                 LOVABLE_API_URL,
                 headers={
                     'Authorization': f'Bearer {LOVABLE_API_KEY}',
@@ -8303,7 +9427,7 @@ IMPORTANTE: Responda APENAS com o JSON, sem markdown."""
                     'temperature': 0.1,
                     'max_tokens': 1000
                 },
-                timeout=60
+                timeout=http_pool.timeout('validation', 'lovable')
             )
             
             if response.ok:
@@ -8361,13 +9485,13 @@ IMPORTANTE: Responda APENAS com o JSON, sem markdown."""
                     }
                 })
             
-            gemini_response = requests.post(
+            gemini_response = http_pool.session('gemini').post(
                 f"{GOOGLE_API_URL}/models/gemini-2.0-flash:generateContent?key={GOOGLE_API_KEY}",
                 json={
                     "contents": [{"parts": gemini_parts}],
                     "generationConfig": {"temperature": 0.1, "maxOutputTokens": 1000}
                 },
-                timeout=60
+                timeout=http_pool.timeout('validation', 'gemini')
             )
             
             if gemini_response.ok:
@@ -8559,7 +9683,8 @@ def analyze_video_events_vision_only(
     away_team: str = None,
     scan_interval_seconds: int = 30,
     frames_per_window: int = 6,
-    target_event_types: List[str] = None
+    target_event_types: List[str] = None,
+    cancel_event=None
 ) -> Dict[str, Any]:
     """
     Analisa um vídeo EXCLUSIVAMENTE por visão para detectar eventos de futebol.
@@ -8578,6 +9703,7 @@ def analyze_video_events_vision_only(
         scan_interval_seconds: Intervalo entre janelas de análise (default: 30s)
         frames_per_window: Frames a extrair por janela (default: 6)
         target_event_types: Tipos de eventos a detectar (default: goal, card, penalty, save)
+        cancel_event: threading.Event que interrompe as chamadas de visão pendentes
     
     Returns:
         Dict com:
@@ -8586,9 +9712,8 @@ def analyze_video_events_vision_only(
         - windows_analyzed: int
         - total_frames: int
         - error: str (se falhar)
+        - cancelled: True se cancel_event interrompeu a análise
     """
-    import subprocess
-    
     if not target_event_types:
         target_event_types = ['goal', 'red_card', 'yellow_card', 'penalty', 'save']
     
@@ -8611,10 +9736,9 @@ def analyze_video_events_vision_only(
     
     # Get video duration
     try:
-        probe_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-                     '-of', 'default=noprint_wrappers=1:nokey=1', video_path]
-        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=30)
-        video_duration = float(probe_result.stdout.strip())
+        video_duration = media_probe.get_duration(video_path)
+        if video_duration <= 0:
+            raise ValueError('ffprobe sem duração')
     except Exception as e:
         result['error'] = f'Não foi possível obter duração do vídeo: {e}'
         return result
@@ -8666,13 +9790,15 @@ Retorne APENAS JSON (sem markdown):
 Se nenhum evento importante for detectado, retorne:
 {{"events_detected": false, "events": []}}"""
 
-    # Primeira passada: scan por janelas
-    for window_idx in range(num_windows):
+    vision_provider = get_vision_provider()
+    
+    def scan_window(window_idx: int) -> Optional[Dict[str, Any]]:
+        """Extract frames of one window and ask Vision for events (None = skipped)."""
         window_start = window_idx * scan_interval_seconds
         window_end = min(window_start + scan_interval_seconds, video_duration)
         
         if window_end - window_start < 5:  # Janela muito pequena
-            continue
+            return None
         
         window_center = (window_start + window_end) / 2
         
@@ -8685,10 +9811,9 @@ Se nenhum evento importante for detectado, retorne:
         )
         
         if len(frames) < 2:
-            continue
+            return None
         
-        result['total_frames'] += len(frames)
-        result['windows_analyzed'] += 1
+        scanned = {'frames': len(frames), 'events': []}
         
         # Analisar frames com Vision
         try:
@@ -8702,7 +9827,7 @@ Se nenhum evento importante for detectado, retorne:
             
             # Call Gemini Vision
             if LOVABLE_API_KEY:
-                response = requests.post(
+                response = http_pool.session('lovable').post(
                     LOVABLE_API_URL,
                     headers={
                         'Authorization': f'Bearer {LOVABLE_API_KEY}',
@@ -8713,7 +9838,7 @@ Se nenhum evento importante for detectado, retorne:
                         'messages': [{'role': 'user', 'content': content_parts}],
                         'max_tokens': 1024
                     },
-                    timeout=60
+                    timeout=http_pool.timeout('validation', 'lovable')
                 )
                 
                 if response.ok:
@@ -8721,20 +9846,20 @@ Se nenhum evento importante for detectado, retorne:
                     response_text = data.get('choices', [{}])[0].get('message', {}).get('content', '')
                 else:
                     print(f"[VISION-ONLY] ⚠ API error janela {window_idx}: {response.status_code}")
-                    continue
+                    return scanned
                     
             elif GOOGLE_API_KEY:
                 parts = [{"text": detection_prompt}]
                 for frame_b64 in frames:
                     parts.append({"inline_data": {"mime_type": "image/jpeg", "data": frame_b64}})
                 
-                response = requests.post(
+                response = http_pool.session('gemini').post(
                     f"{GOOGLE_API_URL}/models/gemini-2.0-flash:generateContent?key={GOOGLE_API_KEY}",
                     json={
                         'contents': [{'role': 'user', 'parts': parts}],
                         'generationConfig': {'maxOutputTokens': 1024}
                     },
-                    timeout=60
+                    timeout=http_pool.timeout('validation', 'gemini')
                 )
                 
                 if response.ok:
@@ -8744,10 +9869,10 @@ Se nenhum evento importante for detectado, retorne:
                         parts_resp = candidates[0].get('content', {}).get('parts', [])
                         response_text = parts_resp[0].get('text', '') if parts_resp else ''
                     else:
-                        continue
+                        return scanned
                 else:
                     print(f"[VISION-ONLY] ⚠ Google API error: {response.status_code}")
-                    continue
+                    return scanned
             
             # Parse response
             try:
@@ -8770,7 +9895,7 @@ Se nenhum evento importante for detectado, retorne:
                             
                             print(f"[VISION-ONLY] ⚽ EVENTO: {event.get('event_type')} @ {event_timestamp:.1f}s (janela {window_idx})")
                             
-                            detected_events.append({
+                            scanned['events'].append({
                                 'event_type': event.get('event_type'),
                                 'timestamp_seconds': event_timestamp,
                                 'minute': int(event_timestamp / 60),
@@ -8788,40 +9913,65 @@ Se nenhum evento importante for detectado, retorne:
         except Exception as e:
             print(f"[VISION-ONLY] ⚠ Erro analisando janela {window_idx}: {e}")
         
-        # Progress log
-        if (window_idx + 1) % 5 == 0:
-            print(f"[VISION-ONLY] Progresso: {window_idx + 1}/{num_windows} janelas analisadas")
+        return scanned
+    
+    # Primeira passada: scan por janelas (em paralelo, limitado por provedor; ordem preservada)
+    try:
+        scanned_windows = validation_pool.map_bounded(
+            scan_window, range(num_windows), vision_provider, cancel_event=cancel_event, label='janelas de visão'
+        )
+    except validation_pool.ValidationCancelled:
+        result['error'] = 'Análise cancelada'
+        result['cancelled'] = True
+        return result
+    for scanned in scanned_windows:
+        if not scanned:
+            continue
+        result['total_frames'] += scanned['frames']
+        result['windows_analyzed'] += 1
+        detected_events.extend(scanned['events'])
+    
+    print(f"[VISION-ONLY] Progresso: {result['windows_analyzed']}/{num_windows} janelas analisadas")
     
     # Segunda passada: refinar timestamps para eventos de alta importância
-    refined_events = []
-    for event in detected_events:
-        if event['event_type'] in ['goal', 'penalty'] and event['confidence'] >= 0.6:
-            print(f"[VISION-ONLY] 🔍 Refinando timestamp de {event['event_type']} @ {event['timestamp_seconds']:.1f}s")
-            
-            # Análise mais detalhada com mais frames
-            refined = detect_goal_visual_cues(
-                video_path,
-                estimated_second=event['timestamp_seconds'],
-                window_seconds=15,  # Janela menor para precisão
-                home_team=home_team,
-                away_team=away_team,
-                num_frames=12
-            )
-            
-            if refined['visual_confirmed'] and refined['confidence'] > event['confidence']:
-                old_ts = event['timestamp_seconds']
-                event['timestamp_seconds'] = refined['exact_second']
-                event['minute'] = int(refined['exact_second'] / 60)
-                event['second'] = int(refined['exact_second'] % 60)
-                event['confidence'] = refined['confidence']
-                event['refined'] = True
-                print(f"[VISION-ONLY] ✓ Timestamp refinado: {old_ts:.1f}s → {refined['exact_second']:.1f}s")
-        
-        refined_events.append(event)
+    to_refine = [
+        event for event in detected_events
+        if event['event_type'] in ['goal', 'penalty'] and event['confidence'] >= 0.6
+    ]
+    
+    def refine_event(event: Dict[str, Any]) -> Dict[str, Any]:
+        print(f"[VISION-ONLY] 🔍 Refinando timestamp de {event['event_type']} @ {event['timestamp_seconds']:.1f}s")
+        # Análise mais detalhada com mais frames
+        return detect_goal_visual_cues(
+            video_path,
+            estimated_second=event['timestamp_seconds'],
+            window_seconds=15,  # Janela menor para precisão
+            home_team=home_team,
+            away_team=away_team,
+            num_frames=12
+        )
+    
+    try:
+        refined_results = validation_pool.map_bounded(
+            refine_event, to_refine, vision_provider, cancel_event=cancel_event, label='refinamento de visão'
+        )
+    except validation_pool.ValidationCancelled:
+        result['error'] = 'Análise cancelada'
+        result['cancelled'] = True
+        return result
+    for event, refined in zip(to_refine, refined_results):
+        if refined and refined['visual_confirmed'] and refined['confidence'] > event['confidence']:
+            old_ts = event['timestamp_seconds']
+            event['timestamp_seconds'] = refined['exact_second']
+            event['minute'] = int(refined['exact_second'] / 60)
+            event['second'] = int(refined['exact_second'] % 60)
+            event['confidence'] = refined['confidence']
+            event['refined'] = True
+            print(f"[VISION-ONLY] ✓ Timestamp refinado: {old_ts:.1f}s → {refined['exact_second']:.1f}s")
     
     # Deduplicar eventos muito próximos
     deduplicated = []
-    for event in sorted(refined_events, key=lambda e: e['timestamp_seconds']):
+    for event in sorted(detected_events, key=lambda e: e['timestamp_seconds']):
         is_duplicate = False
         for existing in deduplicated:
             if existing['event_type'] == event['event_type']:
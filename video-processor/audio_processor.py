@@ -7,18 +7,21 @@ import os
 import subprocess
 import json
 import shutil
+import wave
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Tuple
 import uuid
 
 from database import get_db_session
+import media_probe
 
 # Constants
 WHISPER_SAMPLE_RATE = 16000
 WHISPER_CHANNELS = 1
 SEGMENT_DURATION = 45  # seconds
 SEGMENT_OVERLAP = 2    # seconds
+SEGMENT_MODE = os.environ.get('AUDIO_SEGMENT_MODE', 'single_pass')  # single_pass | ffmpeg
 
 # FFmpeg paths
 FFMPEG = 'ffmpeg'
@@ -26,16 +29,9 @@ FFPROBE = 'ffprobe'
 
 
 def get_audio_duration(audio_path: str) -> float:
-    """Get audio duration in seconds using ffprobe."""
+    """Get audio duration in seconds using ffprobe (memoized)."""
     try:
-        result = subprocess.run([
-            FFPROBE, '-v', 'quiet',
-            '-show_entries', 'format=duration',
-            '-of', 'json',
-            audio_path
-        ], capture_output=True, text=True)
-        
-        data = json.loads(result.stdout)
+        data = media_probe.probe(audio_path, timeout=120)
         return float(data['format']['duration'])
     except Exception as e:
         print(f"[AUDIO] Error getting duration: {e}")
@@ -43,16 +39,9 @@ def get_audio_duration(audio_path: str) -> float:
 
 
 def get_video_info(video_path: str) -> Dict[str, Any]:
-    """Get video/audio file information using ffprobe."""
+    """Get video/audio file information using ffprobe (memoized)."""
     try:
-        result = subprocess.run([
-            FFPROBE, '-v', 'quiet',
-            '-show_format', '-show_streams',
-            '-of', 'json',
-            video_path
-        ], capture_output=True, text=True)
-        
-        return json.loads(result.stdout)
+        return media_probe.probe(video_path, timeout=120) or {}
     except Exception as e:
         print(f"[AUDIO] Error getting video info: {e}")
         return {}
@@ -220,69 +209,199 @@ def extract_audio_for_whisper(
         return {'success': False, 'error': str(e)}
 
 
+def _normalize_wav_for_slicing(audio_path: str, output_dir: Path) -> Optional[str]:
+    """
+    Return a path to a 16kHz mono pcm_s16le WAV for the PCM slicer.
+    If the source already matches, it is used as-is; otherwise it is decoded
+    once with ffmpeg into output_dir.
+    """
+    try:
+        with wave.open(audio_path, 'rb') as wav:
+            if (wav.getframerate() == WHISPER_SAMPLE_RATE and
+                    wav.getnchannels() == WHISPER_CHANNELS and
+                    wav.getsampwidth() == 2):
+                return audio_path
+    except (wave.Error, EOFError, OSError):
+        pass
+    
+    normalized_path = output_dir / '_source_16k_mono.wav'
+    cmd = [
+        FFMPEG, '-y', '-i', audio_path,
+        '-vn',
+        '-acodec', 'pcm_s16le',
+        '-ar', str(WHISPER_SAMPLE_RATE),
+        '-ac', str(WHISPER_CHANNELS),
+        str(normalized_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"[AUDIO] Warning: Failed to normalize audio for slicing: {result.stderr[-300:]}")
+        return None
+    return str(normalized_path)
+
+
+def _segment_pcm_single_pass(
+    audio_path: str,
+    output_dir: Path,
+    segment_duration: int,
+    overlap: int
+) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Slice a 16kHz mono WAV into overlapping segments reading the PCM data once.
+    Each segment is a direct frame copy (no re-decode), so the total cost is
+    linear in the audio length.
+    
+    Returns: (segments, total_duration)
+    """
+    source_path = _normalize_wav_for_slicing(audio_path, output_dir)
+    if not source_path:
+        return [], 0.0
+    
+    segments = []
+    try:
+        with wave.open(source_path, 'rb') as src:
+            sample_rate = src.getframerate()
+            total_frames = src.getnframes()
+            total_duration = total_frames / float(sample_rate)
+            
+            segment_frames = int(segment_duration * sample_rate)
+            step_frames = int((segment_duration - overlap) * sample_rate)
+            expected = int(total_duration / (segment_duration - overlap)) + 1
+            
+            start_frame = 0
+            segment_index = 0
+            while start_frame < total_frames:
+                end_frame = min(start_frame + segment_frames, total_frames)
+                segment_filename = f'segment_{segment_index:04d}.wav'
+                segment_path = output_dir / segment_filename
+                
+                src.setpos(start_frame)
+                pcm = src.readframes(end_frame - start_frame)
+                
+                with wave.open(str(segment_path), 'wb') as dst:
+                    dst.setnchannels(WHISPER_CHANNELS)
+                    dst.setsampwidth(2)
+                    dst.setframerate(sample_rate)
+                    dst.writeframes(pcm)
+                
+                start_time = start_frame / float(sample_rate)
+                end_time = end_frame / float(sample_rate)
+                segments.append({
+                    'index': segment_index,
+                    'filename': segment_filename,
+                    'path': str(segment_path),
+                    'startMs': int(start_time * 1000),
+                    'endMs': int(end_time * 1000),
+                    'durationMs': int((end_time - start_time) * 1000)
+                })
+                
+                start_frame += step_frames
+                segment_index += 1
+                
+                if segment_index % 20 == 0:
+                    print(f"[AUDIO] Segmented {segment_index}/{expected}")
+    finally:
+        if source_path != audio_path and os.path.exists(source_path):
+            os.remove(source_path)
+    
+    print(f"[AUDIO] Segmented {len(segments)} segments (single pass)")
+    return segments, total_duration
+
+
+def _segment_ffmpeg_per_segment(
+    audio_path: str,
+    output_dir: Path,
+    total_duration: float,
+    segment_duration: int,
+    overlap: int
+) -> List[Dict[str, Any]]:
+    """Legacy segmentation: one ffmpeg process per segment."""
+    segments = []
+    current_time = 0.0
+    segment_index = 0
+    step = segment_duration - overlap
+    
+    while current_time < total_duration:
+        end_time = min(current_time + segment_duration, total_duration)
+        segment_filename = f'segment_{segment_index:04d}.wav'
+        segment_path = output_dir / segment_filename
+        
+        # Extract segment (input-side seek avoids decoding from the start)
+        cmd = [
+            FFMPEG, '-y',
+            '-ss', str(current_time),
+            '-i', audio_path,
+            '-t', str(end_time - current_time),
+            '-acodec', 'pcm_s16le',
+            '-ar', str(WHISPER_SAMPLE_RATE),
+            '-ac', str(WHISPER_CHANNELS),
+            str(segment_path)
+        ]
+        
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            print(f"[AUDIO] Warning: Failed to extract segment {segment_index}")
+            current_time += step
+            segment_index += 1
+            continue
+        
+        segments.append({
+            'index': segment_index,
+            'filename': segment_filename,
+            'path': str(segment_path),
+            'startMs': int(current_time * 1000),
+            'endMs': int(end_time * 1000),
+            'durationMs': int((end_time - current_time) * 1000)
+        })
+        
+        current_time += step
+        segment_index += 1
+        
+        # Progress
+        print(f"[AUDIO] Segmented {segment_index}/{int(total_duration / step) + 1}")
+    
+    return segments
+
+
 def segment_audio_for_whisper(
     audio_path: str,
     output_dir: str,
     segment_duration: int = SEGMENT_DURATION,
-    overlap: int = SEGMENT_OVERLAP
+    overlap: int = SEGMENT_OVERLAP,
+    mode: str = SEGMENT_MODE
 ) -> Dict[str, Any]:
     """
     Segment audio into smaller chunks for Whisper transcription.
     Uses overlap to avoid cutting words.
     
+    Modes:
+    - 'single_pass': decode once and slice the PCM frames (linear cost)
+    - 'ffmpeg': one ffmpeg process per segment (legacy)
+    
     Returns manifest with segment information.
     """
     try:
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        total_duration = get_audio_duration(audio_path)
-        if total_duration <= 0:
-            return {'success': False, 'error': 'Não foi possível obter duração do áudio'}
-        
         segments = []
-        current_time = 0.0
-        segment_index = 0
-        step = segment_duration - overlap
-        
-        while current_time < total_duration:
-            end_time = min(current_time + segment_duration, total_duration)
-            segment_filename = f'segment_{segment_index:04d}.wav'
-            segment_path = output_dir / segment_filename
-            
-            # Extract segment
-            cmd = [
-                FFMPEG, '-y',
-                '-i', audio_path,
-                '-ss', str(current_time),
-                '-t', str(end_time - current_time),
-                '-acodec', 'pcm_s16le',
-                '-ar', str(WHISPER_SAMPLE_RATE),
-                '-ac', str(WHISPER_CHANNELS),
-                str(segment_path)
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                print(f"[AUDIO] Warning: Failed to extract segment {segment_index}")
-                continue
-            
-            segment_info = {
-                'index': segment_index,
-                'filename': segment_filename,
-                'path': str(segment_path),
-                'startMs': int(current_time * 1000),
-                'endMs': int(end_time * 1000),
-                'durationMs': int((end_time - current_time) * 1000)
-            }
-            segments.append(segment_info)
-            
-            current_time += step
-            segment_index += 1
-            
-            # Progress
-            print(f"[AUDIO] Segmented {segment_index}/{int(total_duration / step) + 1}")
+        total_duration = 0.0
+        
+        if mode == 'single_pass':
+            segments, total_duration = _segment_pcm_single_pass(
+                audio_path, output_dir, segment_duration, overlap
+            )
+            if not segments:
+                print("[AUDIO] Single-pass segmentation failed, falling back to ffmpeg per segment")
+        
+        if not segments:
+            total_duration = get_audio_duration(audio_path)
+            if total_duration <= 0:
+                return {'success': False, 'error': 'Não foi possível obter duração do áudio'}
+            segments = _segment_ffmpeg_per_segment(
+                audio_path, output_dir, total_duration, segment_duration, overlap
+            )
         
         # Save manifest
         manifest = {
@@ -533,33 +652,49 @@ def process_upload_media(upload_id: str) -> Dict[str, Any]:
         
         add_event(f'Áudio extraído ({result.get("duration", 0):.0f}s)')
         
-        # Step 3: Segment audio
-        update_job({'status': 'segmenting', 'stage': 'segmenting_audio', 'current_step': 'Fatiando áudio...'})
-        add_event('Fatiando áudio em segmentos de 45s')
+        # Step 3: Reuse a cached transcription of this exact audio, if any
+        import ai_services
+        from transcription_cache import get_cached_transcription, store_transcription
         
+        whisper_model = ai_services.LOCAL_WHISPER_MODEL or 'base'
+        transcription_result = get_cached_transcription(audio_wav, 'local_whisper', whisper_model)
         segments_dir = str(dirs['audio'] / 'segments')
-        result = segment_audio_for_whisper(audio_wav, segments_dir)
+        manifest_path = None
+        total_segments = 0
         
-        if not result.get('success'):
-            update_job({'status': 'error', 'error_message': result.get('error')})
-            return result
-        
-        total_segments = result.get('totalSegments', 0)
-        add_event(f'Áudio fatiado em {total_segments} segmentos')
-        
-        # Step 4: Start transcription automatically
-        update_job({
-            'status': 'transcribing',
-            'stage': 'transcribing_segments',
-            'transcription_segment_total': total_segments,
-            'transcription_segment_current': 0,
-            'progress': 80,
-            'current_step': 'Iniciando transcrição com Whisper Local...'
-        })
-        add_event('Iniciando transcrição com Whisper Local...')
-        
-        manifest_path = result.get('manifestPath')
-        transcription_result = complete_transcription(upload_id, manifest_path, dirs, update_job, add_event)
+        if transcription_result:
+            add_event('Transcrição reaproveitada do cache')
+        else:
+            # Step 4: Segment audio
+            update_job({'status': 'segmenting', 'stage': 'segmenting_audio', 'current_step': 'Fatiando áudio...'})
+            add_event('Fatiando áudio em segmentos de 45s')
+            
+            result = segment_audio_for_whisper(audio_wav, segments_dir)
+            
+            if not result.get('success'):
+                update_job({'status': 'error', 'error_message': result.get('error')})
+                return result
+            
+            total_segments = result.get('totalSegments', 0)
+            add_event(f'Áudio fatiado em {total_segments} segmentos')
+            
+            # Step 5: Start transcription automatically
+            update_job({
+                'status': 'transcribing',
+                'stage': 'transcribing_segments',
+                'transcription_segment_total': total_segments,
+                'transcription_segment_current': 0,
+                'progress': 80,
+                'current_step': 'Iniciando transcrição com Whisper Local...'
+            })
+            add_event('Iniciando transcrição com Whisper Local...')
+            
+            manifest_path = result.get('manifestPath')
+            transcription_result = complete_transcription(upload_id, manifest_path, dirs, update_job, add_event)
+            
+            # Cache only complete transcriptions (no failed segments)
+            if transcription_result.get('success') and not transcription_result.get('errors'):
+                store_transcription(audio_wav, transcription_result, 'local_whisper', whisper_model)
         
         if transcription_result.get('success'):
             add_event(f'Transcrição completa: {len(transcription_result.get("text", ""))} caracteres')
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pré-filtro de eventos (event_detector.find_all_candidates).
+
+Uso:
+  python benchmark_event_detector.py                    # 0.5h, 1h, 2h, 4h sintéticas
+  python benchmark_event_detector.py --hours 1,3,6 --runs 5
+  python benchmark_event_detector.py --seed 7
+
+Gera transcrições sintéticas de narração (~20 linhas por minuto, ~8% das
+linhas com lances) e mede o tempo de find_all_candidates. A coluna µs/LINHA
+deve ficar aproximadamente constante: o custo cresce linearmente com o
+tamanho da transcrição.
+"""
+
+import time
+import random
+import argparse
+
+from event_detector import find_all_candidates
+
+LINES_PER_MINUTE = 20
+
+FILLER_WORDS = (
+    "a bola rola no meio campo passe pela direita cruzamento área toque de "
+    "lado volta para a defesa lateral avança marcação pressão torcida canta"
+).split()
+
+EVENT_LINES = [
+    "é gol do Flamengo, que golaço",
+    "cartão amarelo para o zagueiro",
+    "o juiz marca o pênalti",
+    "escanteio para o Vasco",
+    "foi expulso, cartão vermelho direto",
+    "bola na rede, tá lá",
+    "impedimento marcado pelo assistente",
+    "falta dura no meio campo",
+    "chutou pro gol, defesa do goleiro",
+]
+
+
+def synthetic_transcript(hours: float, rng: random.Random) -> str:
+    """Transcrição sintética com a densidade típica de uma narração."""
+    lines = []
+    for _ in range(int(hours * 60 * LINES_PER_MINUTE)):
+        if rng.random() < 0.08:
+            lines.append(rng.choice(EVENT_LINES))
+        else:
+            lines.append(' '.join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(5, 12))))
+    return '\n'.join(lines)
+
+
+def run_size(hours: float, runs: int, seed: int) -> dict:
+    """Mede o melhor tempo de `runs` execuções para uma duração."""
+    transcript = synthetic_transcript(hours, random.Random(seed))
+    lines = transcript.count('\n') + 1
+
+    best = None
+    candidates = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = find_all_candidates(transcript, 'Flamengo', 'Vasco')
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        candidates = sum(len(v) for v in result.values())
+
+    return {
+        'hours': hours,
+        'lines': lines,
+        'elapsed': best,
+        'us_per_line': best / lines * 1e6 if lines else 0,
+        'candidates': candidates
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pré-filtro de eventos (escalabilidade)')
+    parser.add_argument('--hours', default='0.5,1,2,4', help='Durações em horas separadas por vírgula')
+    parser.add_argument('--runs', type=int, default=3, help='Execuções por tamanho (usa o melhor tempo)')
+    parser.add_argument('--seed', type=int, default=42, help='Semente da transcrição sintética')
+    args = parser.parse_args()
+
+    sizes = [float(h) for h in args.hours.split(',') if h.strip()]
+    results = [run_size(h, args.runs, args.seed) for h in sizes]
+
+    print("\n" + "=" * 72)
+    print(f"find_all_candidates | {LINES_PER_MINUTE} linhas/min | melhor de {args.runs}")
+    print("=" * 72)
+    print(f"{'HORAS':>6} {'LINHAS':>9} {'TEMPO (s)':>10} {'µs/LINHA':>10} {'CANDIDATOS':>11}")
+    for r in results:
+        print(f"{r['hours']:>6.1f} {r['lines']:>9} {r['elapsed']:>10.3f} {r['us_per_line']:>10.1f} {r['candidates']:>11}")
+    print("=" * 72 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos modos de transcrição do Whisper Local.
+
+Uso:
+  python benchmark_whisper.py audio.wav                       # chunked vs batched
+  python benchmark_whisper.py audio.wav --modes batched --batch-size 8
+  python benchmark_whisper.py audio.wav --model small
+
+Cada modo é executado do zero (sem checkpoint) e o resultado mostra tempo
+total, RTF (tempo / duração do áudio) e número de segmentos. O carregamento
+do modelo é contabilizado no primeiro modo da lista.
+"""
+
+import sys
+import time
+import argparse
+
+import ai_services
+
+
+def run_mode(audio_path: str, mode: str, duration: float) -> dict:
+    """Transcreve o áudio em um modo e retorna as métricas."""
+    started = time.time()
+    result = ai_services._transcribe_with_local_whisper(audio_path, force_restart=True, mode=mode)
+    elapsed = time.time() - started
+    
+    return {
+        'mode': mode,
+        'success': result.get('success', False),
+        'error': result.get('error'),
+        'elapsed': elapsed,
+        'rtf': elapsed / duration if duration else 0,
+        'segments': len(result.get('segments', [])),
+        'chars': len(result.get('text', ''))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Whisper Local (chunked vs batched)')
+    parser.add_argument('audio', help='Arquivo de áudio (WAV/MP3)')
+    parser.add_argument('--modes', default='chunked,batched', help='Modos separados por vírgula')
+    parser.add_argument('--model', default=None, help='Modelo Whisper (default: LOCAL_WHISPER_MODEL)')
+    parser.add_argument('--batch-size', type=int, default=None, help='batch_size do modo batched')
+    args = parser.parse_args()
+    
+    if not ai_services._FASTER_WHISPER_AVAILABLE:
+        print("❌ faster-whisper não instalado")
+        sys.exit(1)
+    
+    ai_services.set_api_keys(local_whisper_model=args.model, local_whisper_batch_size=args.batch_size)
+    duration = ai_services._get_audio_duration(args.audio) or 0
+    
+    results = [run_mode(args.audio, mode.strip(), duration) for mode in args.modes.split(',') if mode.strip()]
+    
+    print("\n" + "=" * 72)
+    print(f"Áudio: {args.audio} ({duration:.0f}s) | Modelo: {ai_services.LOCAL_WHISPER_MODEL}")
+    print("=" * 72)
+    print(f"{'MODO':<10} {'TEMPO (s)':>10} {'RTF':>8} {'SEGMENTOS':>10} {'CARACTERES':>11}")
+    for r in results:
+        if not r['success']:
+            print(f"{r['mode']:<10} ❌ {r['error']}")
+            continue
+        print(f"{r['mode']:<10} {r['elapsed']:>10.1f} {r['rtf']:>8.3f} {r['segments']:>10} {r['chars']:>11}")
+    print("=" * 72 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,643 @@
+"""
+Clip cutter - FFmpeg clip extraction for event clips.
+
+Cutting each event with its own `ffmpeg -ss ... -i video` re-opens and
+re-seeks the full-match file every time. cut_clips() sorts the clips of a
+video by start time and groups nearby ones; each group is cut by a single
+FFmpeg process that seeks once, decodes the span once and writes one output
+per clip through a split/trim filter graph:
+
+    [0:v]split=2[s0][s1];
+    [s0]trim=start=3:duration=30,setpts=PTS-STARTPTS[v0];
+    [s1]trim=start=95:duration=25,setpts=PTS-STARTPTS[v1]
+    (same with asplit/atrim for audio)
+
+- A group closes when the next clip starts more than CLIP_BATCH_MAX_GAP
+  seconds later, the span exceeds CLIP_BATCH_MAX_SPAN or it has
+  CLIP_BATCH_MAX_OUTPUTS clips (decoding long gaps would cost more than a seek)
+- If a group's FFmpeg fails, its clips are re-encoded one by one
+- Encoding settings are the same as the single-clip path (libx264 fast/23,
+  aac, faststart), so batch and single clips are interchangeable
+
+Smart cut (opt-in with CLIP_SMART_CUT_ENABLED=true, H.264 sources only): instead of
+re-encoding the whole clip, smart_cut() stream-copies the GOP-aligned middle
+[first keyframe >= start, last keyframe <= end) and re-encodes only the
+partial GOPs at each edge, matching the source profile/pixel format. The
+pieces are joined as MPEG-TS (in-band SPS/PPS) and remuxed to a faststart
+MP4 with the audio re-encoded once over the exact clip range, so the clip
+stays frame-accurate. Anything unexpected falls back to the full re-encode.
+Smart cut only pays off when the clip is not re-encoded afterwards: callers
+that burn an overlay on every clip (extract_event_clips_auto) pass
+smart=False and keep the batched cut.
+
+Compatibility limit: the MP4 carries one avc1 sample entry whose avcC holds
+the first piece's SPS/PPS, while the x264 edges and the copied middle keep
+their own SPS/PPS in-band. FFmpeg-based players and Chromium/Firefox (which
+honour in-band parameter sets) play it; decoders that only read avcC
+(Safari/QuickTime, many hardware decoders) show artifacts at the piece
+boundaries. That is why smart cut is off by default: enable it only when the
+clips are played by in-band-aware players.
+Stream info and keyframes come from the per-video media_index when one can
+be built, so planning many clips of one match costs no extra ffprobe runs.
+
+Smart cuts, FFmpeg groups and the per-clip post-processing (finish_clip:
+validation, subtitle burn-in, thumbnail) run on media_pool worker processes;
+job functions here only touch files, callers write the DB.
+"""
+
+import os
+import shutil
+import tempfile
+import subprocess
+from typing import List, Dict, Any, Optional
+
+import media_index
+import media_probe
+import media_pool
+
+BATCH_ENABLED = os.environ.get('CLIP_BATCH_ENABLED', 'true').lower() == 'true'
+BATCH_MAX_OUTPUTS = int(os.environ.get('CLIP_BATCH_MAX_OUTPUTS', '8') or 8)
+BATCH_MAX_GAP = float(os.environ.get('CLIP_BATCH_MAX_GAP', '90') or 90)
+BATCH_MAX_SPAN = float(os.environ.get('CLIP_BATCH_MAX_SPAN', '900') or 900)
+SMART_CUT_ENABLED = os.environ.get('CLIP_SMART_CUT_ENABLED', 'false').lower() == 'true'
+SMART_CUT_MIN_COPY = float(os.environ.get('CLIP_SMART_CUT_MIN_COPY', '4') or 4)  # seconds of copyable middle
+
+# ffprobe profile names -> libx264 -profile:v
+X264_PROFILES = {
+    'constrained baseline': 'baseline',
+    'baseline': 'baseline',
+    'main': 'main',
+    'high': 'high',
+}
+SMART_CUT_PIX_FMTS = ('yuv420p', 'yuvj420p')
+
+ENCODE_ARGS = ['-c:v', 'libx264', '-c:a', 'aac', '-preset', 'fast', '-crf', '23', '-movflags', '+faststart']
+
+
+def has_audio_stream(video_path: str) -> bool:
+    """True if the file has at least one audio stream (True when unsure)."""
+    try:
+        has_audio = media_probe.has_audio(video_path)
+        if has_audio is not None:
+            return has_audio
+    except Exception as e:
+        print(f"[ClipCutter] ⚠ Erro ao verificar áudio: {e}")
+    return True
+
+
+def _encode_clip(video_path: str, output_path: str, start_seconds: float, duration: float, timeout: int = 120) -> bool:
+    """Cut one clip with a full re-encode (input seek + libx264)."""
+    cmd = [
+        'ffmpeg', '-y',
+        '-ss', str(start_seconds),
+        '-i', video_path,
+        '-t', str(duration),
+        *ENCODE_ARGS,
+        *media_pool.ffmpeg_thread_args(),
+        output_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            print(f"[ClipCutter] ✗ FFmpeg falhou ({os.path.basename(output_path)}): {result.stderr[-200:] if result.stderr else 'Unknown error'}")
+        return result.returncode == 0 and os.path.exists(output_path)
+    except subprocess.TimeoutExpired:
+        print(f"[ClipCutter] ⚠ Timeout ao extrair {os.path.basename(output_path)}")
+        return False
+
+
+def _parse_rate(rate: str) -> float:
+    try:
+        num, _, den = (rate or '0/1').partition('/')
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def probe_video_stream(video_path: str) -> Optional[Dict[str, Any]]:
+    """Codec/profile/pix_fmt/fps of the first video stream + container start time."""
+    index = media_index.get_index(video_path)
+    if index is not None and index.stream.get('codec_name'):
+        return dict(index.stream)
+    try:
+        data = media_probe.probe(video_path)
+        stream = media_probe.first_stream(data, 'video')
+        if not stream:
+            return None
+        return {
+            'codec_name': stream.get('codec_name'),
+            'profile': (stream.get('profile') or '').lower(),
+            'pix_fmt': stream.get('pix_fmt'),
+            'fps': _parse_rate(stream.get('avg_frame_rate')) or _parse_rate(stream.get('r_frame_rate')),
+            'start_time': float((data.get('format') or {}).get('start_time') or 0),
+        }
+    except Exception as e:
+        print(f"[ClipCutter] ⚠ Erro ao inspecionar vídeo: {e}")
+        return None
+
+
+def can_smart_cut(stream: Optional[Dict[str, Any]]) -> bool:
+    """Smart cut needs an H.264 source that libx264 can match for the edge GOPs."""
+    return bool(
+        stream
+        and stream.get('codec_name') == 'h264'
+        and stream.get('profile') in X264_PROFILES
+        and stream.get('pix_fmt') in SMART_CUT_PIX_FMTS
+        and stream.get('fps', 0) > 0
+    )
+
+
+def probe_keyframes(video_path: str, start_seconds: float, end_seconds: float, origin: float = None) -> List[float]:
+    """Keyframe times (seconds, same origin as -ss) in [start, end], from packet flags (no decoding)."""
+    index = media_index.get_index(video_path)
+    if index is not None:
+        return index.keyframes_between(start_seconds, end_seconds)
+    if origin is None:
+        origin = (probe_video_stream(video_path) or {}).get('start_time', 0.0)
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+             '-read_intervals', f"{origin + start_seconds:.3f}%{origin + end_seconds + 1:.3f}",
+             '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', video_path],
+            capture_output=True, text=True, timeout=60
+        )
+    except subprocess.TimeoutExpired:
+        return []
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' not in flags:
+            continue
+        try:
+            t = float(pts_time) - origin
+        except ValueError:
+            continue
+        if start_seconds <= t <= end_seconds:
+            keyframes.append(t)
+    return sorted(keyframes)
+
+
+def _run(cmd: List[str], timeout: int, what: str) -> bool:
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        print(f"[ClipCutter] ⚠ Timeout ({what})")
+        return False
+    if result.returncode != 0:
+        print(f"[ClipCutter] ⚠ Smart cut: {what} falhou: {result.stderr[-200:] if result.stderr else 'Unknown error'}")
+        return False
+    return True
+
+
+def _piece_duration(path: str) -> float:
+    """Duration of a temporary piece (plain ffprobe: temp files stay out of the media_probe cache)."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+            capture_output=True, text=True, timeout=30
+        )
+        return float(result.stdout.strip() or 0)
+    except (subprocess.TimeoutExpired, ValueError):
+        return 0.0
+
+
+def _encode_edge(video_path: str, output_ts: str, start: float, duration: float, stream: Dict[str, Any], timeout: int) -> bool:
+    """Re-encode a partial GOP (video only) with the source's profile and pixel format."""
+    return _run([
+        'ffmpeg', '-y', '-ss', f"{start:.6f}", '-i', video_path, '-t', f"{duration:.6f}",
+        '-an', '-c:v', 'libx264', '-preset', 'fast', '-crf', '23',
+        '-profile:v', X264_PROFILES[stream['profile']], '-pix_fmt', stream['pix_fmt'],
+        *media_pool.ffmpeg_thread_args(),
+        '-f', 'mpegts', output_ts
+    ], timeout, 'borda')
+
+
+def smart_cut(
+    video_path: str,
+    output_path: str,
+    start_seconds: float,
+    duration: float,
+    stream: Optional[Dict[str, Any]] = None,
+    keyframes: Optional[List[float]] = None,
+    timeout: int = 120
+) -> bool:
+    """
+    Frame-accurate clip with stream copy of the GOP-aligned middle.
+
+    Args:
+        video_path: Source video (H.264)
+        output_path: Output MP4 (faststart)
+        start_seconds / duration: Clip range
+        stream: probe_video_stream() result (probed if None)
+        keyframes: Keyframe times in the clip range (probed if None)
+
+    Returns:
+        False when smart cut does not apply, fails or the copied middle /
+        assembled clip does not have the expected duration (caller re-encodes)
+    """
+    stream = stream or probe_video_stream(video_path)
+    if not can_smart_cut(stream):
+        return False
+
+    end_seconds = start_seconds + duration
+    if keyframes is None:
+        keyframes = probe_keyframes(video_path, start_seconds, end_seconds, origin=stream['start_time'])
+    frame = 1.0 / stream['fps']
+    half_frame = frame / 2
+    inside = [k for k in keyframes if start_seconds - half_frame <= k <= end_seconds - half_frame]
+    if len(inside) < 2 or inside[-1] - inside[0] < SMART_CUT_MIN_COPY:
+        return False
+    copy_start, copy_end = inside[0], inside[-1]
+
+    workdir = tempfile.mkdtemp(prefix='.smartcut_', dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        pieces = []
+        if copy_start - start_seconds >= half_frame:
+            head = os.path.join(workdir, 'head.ts')
+            if not _encode_edge(video_path, head, start_seconds, copy_start - start_seconds, stream, timeout):
+                return False
+            pieces.append(head)
+
+        # Middle: copy whole GOPs; the segment muxer splits on the first keyframe
+        # after -segment_times. The copy starts at the copy_start keyframe, which
+        # sits half a frame before the -ss point, so copy_end lands at
+        # (copy_end - copy_start - half_frame): split a further half frame
+        # earlier so timebase rounding cannot push the split to the next GOP
+        middle_pattern = os.path.join(workdir, 'middle_%03d.ts')
+        if not _run([
+            'ffmpeg', '-y', '-ss', f"{copy_start + half_frame:.6f}", '-i', video_path,
+            '-t', f"{copy_end - copy_start + 1:.6f}",
+            '-an', '-c:v', 'copy', '-bsf:v', 'h264_mp4toannexb',
+            '-f', 'segment', '-segment_format', 'mpegts',
+            '-segment_times', f"{copy_end - copy_start - frame:.6f}",
+            middle_pattern
+        ], timeout, 'cópia do meio'):
+            return False
+        middle = middle_pattern % 0
+        if not os.path.exists(middle):
+            return False
+        # A split on the wrong keyframe would overlap (or drop) a GOP at the tail
+        middle_duration = _piece_duration(middle)
+        if abs(middle_duration - (copy_end - copy_start)) > 1.5 * frame:
+            print(f"[ClipCutter] ⚠ Smart cut: meio com {middle_duration:.3f}s (esperado {copy_end - copy_start:.3f}s), re-encode")
+            return False
+        pieces.append(middle)
+
+        if end_seconds - copy_end >= half_frame:
+            tail = os.path.join(workdir, 'tail.ts')
+            if not _encode_edge(video_path, tail, copy_end, end_seconds - copy_end, stream, timeout):
+                return False
+            pieces.append(tail)
+
+        concat_list = os.path.join(workdir, 'concat.txt')
+        with open(concat_list, 'w') as f:
+            for piece in pieces:
+                f.write(f"file '{piece}'\n")
+
+        # Join video pieces (copy) + audio re-encoded once over the exact range
+        if not _run([
+            'ffmpeg', '-y',
+            '-f', 'concat', '-safe', '0', '-i', concat_list,
+            '-ss', f"{start_seconds:.6f}", '-i', video_path,
+            '-map', '0:v:0', '-map', '1:a:0?',
+            '-t', f"{duration:.6f}",
+            '-c:v', 'copy', '-c:a', 'aac',
+            '-movflags', '+faststart',
+            output_path
+        ], timeout, 'montagem'):
+            return False
+        if not os.path.exists(output_path):
+            return False
+        assembled = media_probe.get_duration(output_path)
+        if abs(assembled - duration) > max(2 * frame, 0.1):
+            print(f"[ClipCutter] ⚠ Smart cut: clip com {assembled:.3f}s (esperado {duration:.3f}s), re-encode")
+            os.remove(output_path)
+            return False
+        return True
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def cut_clip(
+    video_path: str,
+    output_path: str,
+    start_seconds: float,
+    duration: float,
+    timeout: int = 120,
+    smart: bool = None,
+    stream: Optional[Dict[str, Any]] = None
+) -> bool:
+    """Cut one clip: smart cut when enabled and possible, else a full re-encode."""
+    smart = SMART_CUT_ENABLED if smart is None else smart
+    if smart and smart_cut(video_path, output_path, start_seconds, duration, stream=stream, timeout=timeout):
+        return True
+    return _encode_clip(video_path, output_path, start_seconds, duration, timeout=timeout)
+
+
+def plan_batches(clips: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Group clips ({'start', 'duration', 'output'}) sorted by start into batches."""
+    groups: List[List[Dict[str, Any]]] = []
+    group_start = group_end = 0.0
+    for clip in sorted(clips, key=lambda c: c['start']):
+        clip_end = clip['start'] + clip['duration']
+        if (
+            groups
+            and len(groups[-1]) < BATCH_MAX_OUTPUTS
+            and clip['start'] - group_end <= BATCH_MAX_GAP
+            and max(group_end, clip_end) - group_start <= BATCH_MAX_SPAN
+        ):
+            groups[-1].append(clip)
+            group_end = max(group_end, clip_end)
+        else:
+            groups.append([clip])
+            group_start, group_end = clip['start'], clip_end
+    return groups
+
+
+def _cut_group(video_path: str, group: List[Dict[str, Any]], with_audio: bool) -> bool:
+    """Cut every clip of a group with one FFmpeg process (one seek, one decode)."""
+    seek = group[0]['start']
+    count = len(group)
+    graph = [f"[0:v]split={count}" + ''.join(f"[s{i}]" for i in range(count))]
+    if with_audio:
+        graph.append(f"[0:a]asplit={count}" + ''.join(f"[as{i}]" for i in range(count)))
+    for i, clip in enumerate(group):
+        offset = clip['start'] - seek
+        graph.append(f"[s{i}]trim=start={offset:.3f}:duration={clip['duration']:.3f},setpts=PTS-STARTPTS[v{i}]")
+        if with_audio:
+            graph.append(f"[as{i}]atrim=start={offset:.3f}:duration={clip['duration']:.3f},asetpts=PTS-STARTPTS[a{i}]")
+
+    cmd = ['ffmpeg', '-y', '-ss', f"{seek:.3f}", '-i', video_path, '-filter_complex', ';'.join(graph)]
+    for i, clip in enumerate(group):
+        cmd += ['-map', f'[v{i}]']
+        if with_audio:
+            cmd += ['-map', f'[a{i}]']
+        cmd += [*ENCODE_ARGS, *media_pool.ffmpeg_thread_args(), clip['output']]
+
+    span = max(c['start'] + c['duration'] for c in group) - seek
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=int(60 + span + 30 * count))
+    except subprocess.TimeoutExpired:
+        print(f"[ClipCutter] ⚠ Timeout no lote de {count} clips")
+        return False
+    if result.returncode != 0:
+        print(f"[ClipCutter] ⚠ Lote de {count} clips falhou: {result.stderr[-300:] if result.stderr else 'Unknown error'}")
+        return False
+    return all(os.path.exists(clip['output']) for clip in group)
+
+
+def _smart_cut_job(job) -> bool:
+    """Pool job: (video_path, clip, stream) -> smart_cut ok."""
+    video_path, clip, stream = job
+    return smart_cut(video_path, clip['output'], clip['start'], clip['duration'], stream=stream, timeout=60)
+
+
+def _cut_group_job(job) -> Dict[str, Dict[str, Any]]:
+    """Pool job: (video_path, group, with_audio) -> results of the group's clips."""
+    video_path, group, with_audio = job
+    if len(group) > 1 and _cut_group(video_path, group, with_audio):
+        return {clip['output']: {'ok': True, 'batched': True, 'smart': False} for clip in group}
+    if len(group) > 1:
+        print(f"[ClipCutter] ↩️ Cortando {len(group)} clips individualmente")
+    return {
+        clip['output']: {'ok': _encode_clip(video_path, clip['output'], clip['start'], clip['duration'], timeout=60), 'batched': False, 'smart': False}
+        for clip in group
+    }
+
+
+def cut_clips(
+    video_path: str,
+    clips: List[Dict[str, Any]],
+    batch: bool = None,
+    smart: bool = None,
+    pool: Optional[media_pool.MediaPool] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Cut several clips from one video.
+
+    Smart cut (when enabled and the source is H.264) is tried first for every
+    clip; clips it cannot handle go through the batch/re-encode path. Smart
+    cuts and FFmpeg groups run in parallel on the media pool. Pass
+    smart=False when the clips are re-encoded afterwards (overlay burn-in):
+    smart cut costs 3-4 FFmpeg runs per clip and would only save work for
+    clips that are kept as cut.
+
+    Args:
+        video_path: Source video
+        clips: [{'start': seconds, 'duration': seconds, 'output': path}, ...]
+        batch: Group clips into shared FFmpeg runs (default: CLIP_BATCH_ENABLED)
+        smart: Try smart cut first (default: CLIP_SMART_CUT_ENABLED)
+        pool: MediaPool to run on (default: a pool sized for these clips)
+
+    Returns:
+        {output_path: {'ok': bool, 'batched': bool, 'smart': bool}}
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    if not clips:
+        return results
+    if pool is None:
+        with media_pool.MediaPool(len(clips)) as own_pool:
+            return cut_clips(video_path, clips, batch=batch, smart=smart, pool=own_pool)
+
+    smart = SMART_CUT_ENABLED if smart is None else smart
+    stream = probe_video_stream(video_path) if smart else None
+    if can_smart_cut(stream):
+        oks = pool.map(_smart_cut_job, [(video_path, clip, stream) for clip in clips], label='smart cut')
+        remaining = []
+        for clip, ok in zip(clips, oks):
+            if ok:
+                results[clip['output']] = {'ok': True, 'batched': False, 'smart': True}
+            else:
+                remaining.append(clip)
+        print(f"[ClipCutter] ⚡ Smart cut: {len(clips) - len(remaining)}/{len(clips)} clips sem re-encode completo")
+        clips = remaining
+        if not clips:
+            return results
+
+    batch = BATCH_ENABLED if batch is None else batch
+    if batch:
+        with_audio = has_audio_stream(video_path)
+        groups = plan_batches(clips)
+        print(f"[ClipCutter] ✂️ {len(clips)} clips em {len(groups)} execuções do FFmpeg")
+    else:
+        with_audio = True
+        groups = [[clip] for clip in clips]
+
+    for group_results in pool.map(_cut_group_job, [(video_path, group, with_audio) for group in groups], label='corte'):
+        results.update(group_results or {})
+    for clip in clips:
+        results.setdefault(clip['output'], {'ok': False, 'batched': False, 'smart': False})
+
+    return results
+
+
+# ============================================================================
+# POST-PROCESSING (legenda + thumbnail), executado nos workers do media_pool
+# ============================================================================
+
+def add_event_overlay(input_path: str, output_path: str, header_text: str, description: str, timeout: int = 120) -> bool:
+    """Burn the event bar (header on top, description at the bottom) with drawtext."""
+    # Escapar caracteres especiais para FFmpeg
+    description_safe = description.replace("'", "\\'").replace(":", "\\:")[:80]
+    filter_str = (
+        f"drawtext=text='{header_text}':"
+        f"fontsize=28:fontcolor=white:"
+        f"x=(w-text_w)/2:y=30:"
+        f"box=1:boxcolor=black@0.7:boxborderw=10,"
+        f"drawtext=text='{description_safe}':"
+        f"fontsize=20:fontcolor=white:"
+        f"x=(w-text_w)/2:y=h-50:"
+        f"box=1:boxcolor=black@0.7:boxborderw=8"
+    )
+    cmd = [
+        'ffmpeg', '-y', '-i', input_path,
+        '-vf', filter_str,
+        '-c:v', 'libx264', '-c:a', 'copy',
+        '-preset', 'fast', '-crf', '23',
+        *media_pool.ffmpeg_thread_args(),
+        output_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        print(f"[SUBTITLE] ⚠ Timeout: {os.path.basename(output_path)}")
+        return False
+    if result.returncode == 0:
+        print(f"[SUBTITLE] ✓ Legendas adicionadas: {output_path}")
+        return True
+    print(f"[SUBTITLE] ✗ Erro FFmpeg: {result.stderr[:200]}")
+    return False
+
+
+def find_overlay_font() -> Optional[str]:
+    """Bold font for thumbnail badges (None = FFmpeg default)."""
+    font_paths = [
+        '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',  # Linux
+        '/usr/share/fonts/truetype/freefont/FreeSansBold.ttf',   # Linux fallback
+        '/System/Library/Fonts/Supplemental/Arial Bold.ttf',     # macOS
+        '/Library/Fonts/Arial Bold.ttf',                          # macOS alt
+        'C:\\Windows\\Fonts\\arialbd.ttf',                        # Windows
+        '/usr/share/fonts/TTF/DejaVuSans-Bold.ttf',              # Arch Linux
+    ]
+    for path in font_paths:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def render_thumbnail(
+    clip_path: str,
+    thumb_path: str,
+    label: str,
+    badge_color: str,
+    minute: int,
+    frame_time: float
+) -> bool:
+    """
+    Extract the frame at frame_time with the styled overlay (gradient bar,
+    event badge bottom-left, minute badge bottom-right); plain frame if the
+    overlay fails. True when a usable (> 1KB) JPEG was written.
+    """
+    font_path = find_overlay_font()
+    font_param = f":fontfile={font_path}" if font_path else ""
+    escaped_label = label.replace("'", "\\'").replace(":", "\\:")
+    filters = [
+        # 1. Bottom gradient overlay
+        "drawbox=x=0:y=ih-120:w=iw:h=120:color=black@0.5:t=fill",
+        # 2. Event type badge (bottom-left)
+        f"drawbox=x=20:y=ih-70:w=text_w+30:h=50:color=0x{badge_color}:t=fill",
+        f"drawtext=text='{escaped_label}':fontsize=28:fontcolor=white:x=35:y=ih-55{font_param}",
+        # 3. Minute badge (bottom-right), black with green accent
+        "drawbox=x=iw-100:y=ih-70:w=80:h=50:color=black@0.9:t=fill",
+        "drawbox=x=iw-100:y=ih-65:w=4:h=40:color=0x10b981:t=fill",
+        f"drawtext=text='{minute}'':fontsize=32:fontcolor=white:x=iw-80:y=ih-55{font_param}",
+    ]
+    base = ['ffmpeg', '-y', '-ss', str(frame_time), '-i', clip_path, '-vframes', '1', '-q:v', '2']
+    try:
+        result = subprocess.run(
+            [*base, '-vf', f"scale=1280:-1,{','.join(filters)}", thumb_path],
+            capture_output=True, text=True, timeout=30
+        )
+        if result.returncode != 0 or not os.path.exists(thumb_path):
+            print(f"[THUMBNAIL] ⚠ Overlay falhou, tentando extração simples...")
+            result = subprocess.run([*base, '-vf', 'scale=1280:-1', thumb_path], capture_output=True, text=True, timeout=30)
+    except subprocess.TimeoutExpired:
+        print(f"[THUMBNAIL] ⚠ Timeout ao gerar thumbnail")
+        return False
+
+    if result.returncode != 0 or not os.path.exists(thumb_path):
+        print(f"[THUMBNAIL] ⚠ FFmpeg falhou (code {result.returncode}): {result.stderr[:300] if result.stderr else 'Unknown error'}")
+        return False
+    thumb_size = os.path.getsize(thumb_path)
+    if thumb_size <= 1000:
+        print(f"[THUMBNAIL] ⚠ Thumbnail muito pequena ({thumb_size} bytes), removendo")
+        os.remove(thumb_path)
+        return False
+    return True
+
+
+def render_thumbnail_job(job: Dict[str, Any]) -> bool:
+    """Pool job: {'clip', 'path', 'label', 'color', 'minute'} -> render_thumbnail at mid-clip."""
+    duration = media_probe.get_duration(job['clip'])
+    frame_time = (duration if duration > 0 else 5.0) / 2
+    return render_thumbnail(job['clip'], job['path'], job['label'], job['color'], job['minute'], frame_time)
+
+
+def finish_clip(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pool job: validate a freshly cut clip, burn its event bar and render its thumbnail.
+
+    Args:
+        job: {'output': clip path, 'duration': expected seconds,
+              'subtitle': {'header', 'description'} or None,
+              'thumbnail': {'path', 'label', 'color', 'minute'} or None}
+
+    Returns:
+        {'ok', 'reason', 'size', 'duration', 'subtitled', 'thumbnail'}
+        ('thumbnail' is the written path or None). Files only - no DB access.
+    """
+    clip_path = job['output']
+    filename = os.path.basename(clip_path)
+    expected = job['duration']
+    result = {'ok': False, 'reason': None, 'size': 0, 'duration': 0.0, 'subtitled': False, 'thumbnail': None}
+
+    # Clips < 50KB provavelmente corrompidos
+    size = os.path.getsize(clip_path) if os.path.exists(clip_path) else 0
+    result['size'] = size
+    if size < 50000:
+        print(f"[CLIP] ⚠ Clip muito pequeno ({size/1024:.1f}KB), removendo: {filename}")
+        if os.path.exists(clip_path):
+            os.remove(clip_path)
+        result['reason'] = 'too_small'
+        return result
+
+    # Probed for every clip (batch and smart cuts included); memoized, so the
+    # thumbnail/regeneration paths reuse it
+    duration = media_probe.get_duration(clip_path)
+    if duration > 0:
+        if duration < expected * 0.7:  # Tolerância de 30%
+            print(f"[CLIP] ⚠ Duração incorreta ({duration:.1f}s vs {expected:.1f}s esperado), regenerando")
+            os.remove(clip_path)
+            result['reason'] = 'bad_duration'
+            return result
+        print(f"[CLIP] ✓ Duração verificada: {duration:.1f}s (esperado: {expected:.1f}s)")
+    result['duration'] = duration
+
+    subtitle = job.get('subtitle')
+    if subtitle:
+        subtitled_path = clip_path.replace('.mp4', '_sub.mp4')
+        if add_event_overlay(clip_path, subtitled_path, subtitle['header'], subtitle['description']):
+            os.replace(subtitled_path, clip_path)
+            result['subtitled'] = True
+            print(f"[CLIP] ✓ Legendas aplicadas: {filename}")
+        else:
+            print(f"[CLIP] ⚠ Legendas falharam, mantendo clip original: {filename}")
+
+    thumb = job.get('thumbnail')
+    if thumb:
+        frame_time = (duration if duration > 0 else 5.0) / 2
+        if render_thumbnail(clip_path, thumb['path'], thumb['label'], thumb['color'], thumb['minute'], frame_time):
+            result['thumbnail'] = thumb['path']
+
+    result['ok'] = True
+    return result
@@ -0,0 +1,116 @@
+"""
+Event deduplication - single sweep-line engine.
+
+Events are sorted once by time and swept left to right. Each bucket
+(e.g. (event_type, team)) remembers only its last kept event: kept events in
+a bucket are always >= threshold apart, so an incoming event can only
+collide with that one. The whole pass is O(n log n) for the sort + O(n).
+
+Used by deduplicate_events / deduplicate_goal_events (ai_services) and by the
+clip filter in extract_event_clips_auto (server).
+"""
+
+from typing import Optional, List, Dict, Any, Tuple, Callable, Hashable
+
+# Priority by event type for policy='priority' (higher = more important)
+DEFAULT_PRIORITIES = {
+    'goal': 10, 'penalty': 9, 'red_card': 8, 'yellow_card': 7,
+    'save': 6, 'shot': 5, 'foul': 4,
+}
+
+
+def event_time_seconds(event: Dict[str, Any]) -> float:
+    """videoSecond when set, otherwise minute*60 + second."""
+    return event.get('videoSecond') or ((event.get('minute') or 0) * 60 + (event.get('second') or 0))
+
+
+def game_time_seconds(event: Dict[str, Any]) -> float:
+    """minute*60 + second (ignores videoSecond)."""
+    return (event.get('minute') or 0) * 60 + (event.get('second') or 0)
+
+
+def type_team_bucket(event: Dict[str, Any]) -> Hashable:
+    return (event.get('event_type'), event.get('team', 'unknown'))
+
+
+def sweep_deduplicate(
+    events: List[Dict[str, Any]],
+    threshold_seconds: float = 60,
+    bucket_key: Callable[[Dict[str, Any]], Hashable] = type_team_bucket,
+    time_key: Callable[[Dict[str, Any]], float] = event_time_seconds,
+    policy: str = 'confidence',
+    thresholds_by_type: Optional[Dict[str, float]] = None,
+    priorities: Optional[Dict[str, int]] = None,
+    protected_types: Optional[set] = None,
+    log_prefix: Optional[str] = '[DEDUP]'
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Remove events that fall within the threshold of the last kept event
+    of the same bucket.
+
+    Args:
+        events: Events to deduplicate (not modified)
+        threshold_seconds: Minimum gap between kept events of a bucket
+        bucket_key: Groups events that can duplicate each other
+        time_key: Event time in seconds (also the sort key)
+        policy: On collision - 'confidence' (keep higher confidence),
+            'priority' (keep higher type priority) or 'first' (keep existing)
+        thresholds_by_type: Per event_type override of threshold_seconds
+        priorities: Type priorities for policy='priority'
+        protected_types: Types that are never suppressed; a non-protected
+            event colliding with a protected one is always dropped
+        log_prefix: Prefix for per-collision logs (None = silent)
+
+    Returns:
+        (kept, suppressed) - kept in time order (a replacement takes the slot
+        of the event it replaced)
+    """
+    if not events:
+        return [], []
+
+    thresholds_by_type = thresholds_by_type or {}
+    priorities = priorities if priorities is not None else DEFAULT_PRIORITIES
+    protected_types = protected_types or set()
+
+    kept: List[Dict[str, Any]] = []
+    suppressed: List[Dict[str, Any]] = []
+    last_slot: Dict[Hashable, int] = {}
+
+    for event in sorted(events, key=time_key):
+        bucket = bucket_key(event)
+        event_type = event.get('event_type', '')
+        slot = last_slot.get(bucket)
+
+        if slot is None or event_type in protected_types:
+            last_slot[bucket] = len(kept)
+            kept.append(event)
+            continue
+
+        existing = kept[slot]
+        gap = time_key(event) - time_key(existing)
+        if gap >= thresholds_by_type.get(event_type, threshold_seconds):
+            last_slot[bucket] = len(kept)
+            kept.append(event)
+            continue
+
+        existing_type = existing.get('event_type', '')
+        if existing_type in protected_types:
+            replace = False
+        elif policy == 'confidence':
+            replace = (event.get('confidence') or 0) > (existing.get('confidence') or 0)
+        elif policy == 'priority':
+            replace = priorities.get(event_type, 0) > priorities.get(existing_type, 0)
+        else:
+            replace = False
+
+        if replace:
+            kept[slot] = event
+            suppressed.append(existing)
+            if log_prefix:
+                print(f"{log_prefix} ♻️ Substituindo {existing_type} por {event_type} @ {time_key(event):.0f}s (Δ{gap:.0f}s)")
+        else:
+            suppressed.append(event)
+            if log_prefix:
+                print(f"{log_prefix} ⚠️ Ignorando duplicata: {event_type} {event.get('team', '')} @ {time_key(event):.0f}s (Δ{gap:.0f}s de {existing_type})")
+
+    return kept, suppressed
@@ -8,10 +8,17 @@ expandido para suportar múltiplos tipos de eventos além de gols.
 
 import re
 import json
+import threading
 import requests
-from typing import Optional, List, Dict, Any, Tuple
+import numpy as np
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple, Union
 from dataclasses import dataclass, field
 
+from transcript import Transcript
+import llm_cache
+import http_pool
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # STOP PLAYERS - Palavras comuns que NÃO são nomes de jogadores
@@ -273,12 +280,14 @@ def normalize(s: str) -> str:
     return (s or "").strip().lower()
 
 
-def detect_team(chunk: List[str], home: str, away: str) -> str:
+def detect_team(chunk: List[str], home: str, away: str, joined: Optional[str] = None) -> str:
     """
     Detecta qual time é mencionado no chunk.
     Retorna 'home', 'away' ou 'unknown'.
+    joined: chunk já unido e normalizado (ex.: fatia de Transcript.lower).
     """
-    joined = normalize(" ".join(chunk))
+    if joined is None:
+        joined = normalize(" ".join(chunk))
     home_ok = normalize(home) in joined if home else False
     away_ok = normalize(away) in joined if away else False
     if home_ok and not away_ok:
@@ -318,70 +327,163 @@ def detect_player(chunk: List[str], apply_stopwords: bool = True) -> Optional[st
 # FIND EVENT CANDIDATES - Pré-filtro local por janela deslizante
 # ═══════════════════════════════════════════════════════════════════════════
 
+def _recipe_pattern_key(recipe: EventRecipe) -> Tuple:
+    """Chave de conteúdo da receita para o scanner: só os padrões definem as colunas."""
+    return (tuple(recipe.primary_patterns), tuple(recipe.secondary_patterns))
+
+
+class PatternScanner:
+    """
+    Scanner multi-padrão compilado uma única vez para um conjunto de receitas.
+
+    Os padrões de todas as receitas são deduplicados e recebem uma coluna cada.
+    scan() percorre a transcrição UMA vez e devolve a matriz booleana
+    linhas × padrões. Uma alternação combinada descarta rapidamente as linhas
+    sem nenhum padrão (a grande maioria da narração).
+    Cada padrão ainda é testado individualmente nas linhas que passam no
+    pré-filtro, pois padrões sobrepostos na mesma linha contam separadamente.
+    """
+
+    def __init__(self, recipes: List[EventRecipe]):
+        self.patterns: List[str] = []
+        col_of: Dict[str, int] = {}
+        for recipe in recipes:
+            for p in list(recipe.primary_patterns) + list(recipe.secondary_patterns):
+                if p not in col_of:
+                    col_of[p] = len(self.patterns)
+                    self.patterns.append(p)
+
+        self.compiled = [re.compile(p, re.IGNORECASE) for p in self.patterns]
+        self.prefilter = re.compile('|'.join(f'(?:{p})' for p in self.patterns), re.IGNORECASE) if self.patterns else None
+
+        # Por receita: colunas primárias/secundárias e colunas de evidência
+        self.recipe_columns: Dict[Tuple, Dict[str, Any]] = {}
+        for recipe in recipes:
+            primary = [col_of[p] for p in recipe.primary_patterns]
+            secondary = [col_of[p] for p in recipe.secondary_patterns]
+            self.recipe_columns[_recipe_pattern_key(recipe)] = {
+                'primary': primary,
+                'secondary': secondary,
+                'evidence': np.array(sorted(set(primary + secondary)), dtype=np.intp),
+            }
+
+    def scan(self, lines: List[str]) -> np.ndarray:
+        """Matriz booleana (linhas × padrões) dos padrões casados em cada linha."""
+        hits = np.zeros((len(lines), len(self.patterns)), dtype=bool)
+        if self.prefilter is None:
+            return hits
+        for i, line in enumerate(lines):
+            if self.prefilter.search(line):
+                for col, p in enumerate(self.compiled):
+                    if p.search(line):
+                        hits[i, col] = True
+        return hits
+
+
+# LRU de scanners, chaveado pelo conteúdo das receitas (não pelo id, que é
+# reaproveitado quando uma receita temporária é coletada)
+SCANNER_CACHE_SIZE = 32
+_scanner_cache: "OrderedDict[Tuple, PatternScanner]" = OrderedDict()
+_scanner_lock = threading.Lock()
+
+
+def get_pattern_scanner(recipes: Optional[List[EventRecipe]] = None) -> PatternScanner:
+    """Scanner compilado (cacheado) para as receitas dadas (padrão: todo o RECIPES)."""
+    recipes = list(RECIPES.values()) if recipes is None else list(recipes)
+    key = tuple(_recipe_pattern_key(r) for r in recipes)
+    with _scanner_lock:
+        scanner = _scanner_cache.get(key)
+        if scanner is not None:
+            _scanner_cache.move_to_end(key)
+            return scanner
+    scanner = PatternScanner(recipes)
+    with _scanner_lock:
+        _scanner_cache[key] = scanner
+        while len(_scanner_cache) > SCANNER_CACHE_SIZE:
+            _scanner_cache.popitem(last=False)
+    return scanner
+
+
 def find_event_candidates(
     transcript_lines: List[str],
     recipe: EventRecipe,
     home_team: str,
     away_team: str,
+    scanner: Optional[PatternScanner] = None,
+    line_hits: Optional[np.ndarray] = None,
+    transcript: Optional[Transcript] = None,
 ) -> List[Dict[str, Any]]:
     """
     Retorna lista de candidatos para um tipo de evento usando a receita.
     Cada candidato tem: start_line, end_line, evidence_count, team_hint, player_hint, snippet.
+
+    scanner/line_hits permitem reaproveitar uma varredura já feita
+    (find_all_candidates varre as linhas uma vez para todas as receitas).
+    A evidência de cada janela vem de somas prefixadas: O(1) por posição.
+    transcript: Transcript cujas linhas são transcript_lines - o texto de
+    cada janela sai da view minúscula por offsets, sem unir as linhas.
     """
     if not transcript_lines or len(transcript_lines) < recipe.window_size:
         return []
 
-    # Compilar todos os patterns
-    all_primary = [re.compile(p, re.IGNORECASE) for p in recipe.primary_patterns]
-    all_secondary = [re.compile(p, re.IGNORECASE) for p in recipe.secondary_patterns]
-    all_patterns = all_primary + all_secondary
-
-    candidates: List[Dict[str, Any]] = []
-
-    for i in range(len(transcript_lines)):
-        line = transcript_lines[i]
-
-        # Contar hits: primary vale 2, secondary vale 1
-        hits = 0
-        matched = []
-        for p in all_primary:
-            if p.search(line):
-                hits += 2
-                matched.append(p.pattern)
-        for p in all_secondary:
-            if p.search(line):
-                hits += 1
-                matched.append(p.pattern)
-
-        if hits == 0:
+    recipe_key = _recipe_pattern_key(recipe)
+    if scanner is None or recipe_key not in scanner.recipe_columns:
+        scanner = get_pattern_scanner([recipe])
+        line_hits = None
+    if line_hits is None:
+        line_hits = scanner.scan(transcript_lines)
+
+    columns = scanner.recipe_columns[recipe_key]
+    n = len(transcript_lines)
+    half_w = recipe.window_size // 2
+
+    # Linhas com evidência (qualquer padrão primário/secundário da receita)
+    has_evidence = line_hits[:, columns['evidence']].any(axis=1)
+
+    # Soma prefixada de linhas com evidência → evidence_count de cada janela
+    evidence_prefix = np.concatenate(([0], np.cumsum(has_evidence, dtype=np.int64)))
+    positions = np.arange(n)
+    starts = np.maximum(0, positions - half_w)
+    ends = np.minimum(n, positions + half_w + 1)
+    evidence = evidence_prefix[ends] - evidence_prefix[starts]
+
+    selected = np.flatnonzero(has_evidence & (evidence >= recipe.min_evidence_lines))
+
+    # Compactar candidatos próximos (evitar duplicatas do mesmo evento).
+    # Só depende de evidência e posição, então time/jogador são extraídos
+    # apenas para os candidatos que sobrevivem.
+    order = sorted(selected.tolist(), key=lambda i: (-int(evidence[i]), int(starts[i])))
+    compact_idx: List[int] = []
+    last_end = -999
+    for i in order:
+        if starts[i] <= last_end:
             continue
+        compact_idx.append(i)
+        last_end = int(ends[i]) - 1
 
-        # Extrair janela deslizante centrada na linha
-        half_w = recipe.window_size // 2
-        start = max(0, i - half_w)
-        end = min(len(transcript_lines), i + half_w + 1)
-        chunk = transcript_lines[start:end]
-
-        # Verificar mínimo de linhas com evidência na janela
-        evidence_count = sum(
-            1 for ln in chunk
-            if any(p.search(ln) for p in all_patterns)
-        )
+    # Ordenar por posição no texto e limitar
+    compact_idx = sorted(compact_idx, key=lambda i: int(starts[i]))[:12]
 
-        if evidence_count < recipe.min_evidence_lines:
-            continue
+    compact: List[Dict[str, Any]] = []
+    for i in compact_idx:
+        row = line_hits[i]
+        matched = [scanner.patterns[c] for c in columns['primary'] if row[c]]
+        matched += [scanner.patterns[c] for c in columns['secondary'] if row[c]]
 
-        team_hint = detect_team(chunk, home_team, away_team) if recipe.team_extraction else None
+        start, end = int(starts[i]), int(ends[i])
+        chunk = transcript_lines[start:end]
+        joined = transcript.window_text(start, end, 'lower') if transcript is not None else None
+        team_hint = detect_team(chunk, home_team, away_team, joined) if recipe.team_extraction else None
         player_hint = detect_player(chunk, recipe.apply_stopwords_filter) if recipe.player_extraction else None
 
         window_text = "\n".join(chunk)
 
-        candidates.append({
+        compact.append({
             'event_type': recipe.event_type,
             'start_line': start,
             'end_line': end - 1,
             'line_index': i,
-            'evidence_count': evidence_count,
+            'evidence_count': int(evidence[i]),
             'matched_patterns': matched,
             'team_hint': team_hint or 'unknown',
             'player_hint': player_hint or '',
@@ -389,17 +491,6 @@ def find_event_candidates(
             'snippet': window_text[:200],
         })
 
-    # Compactar candidatos próximos (evitar duplicatas do mesmo evento)
-    compact: List[Dict[str, Any]] = []
-    last_end = -999
-    for c in sorted(candidates, key=lambda x: (-x['evidence_count'], x['start_line'])):
-        if c['start_line'] <= last_end:
-            continue
-        compact.append(c)
-        last_end = c['end_line']
-
-    # Ordenar por posição no texto e limitar
-    compact = sorted(compact, key=lambda x: x['start_line'])[:12]
     return compact
 
 
@@ -408,7 +499,7 @@ def find_event_candidates(
 # ═══════════════════════════════════════════════════════════════════════════
 
 def find_all_candidates(
-    transcript: str,
+    transcript: Union[str, Transcript],
     home_team: str,
     away_team: str,
     event_types: Optional[List[str]] = None,
@@ -417,7 +508,8 @@ def find_all_candidates(
     Executa pré-filtro para TODOS os tipos de evento (ou apenas os especificados).
     
     Args:
-        transcript: Texto da transcrição (pode ter múltiplas linhas)
+        transcript: Texto da transcrição (pode ter múltiplas linhas) ou um
+            Transcript já parseado (usa as linhas dos blocos)
         home_team: Nome do time da casa
         away_team: Nome do time visitante
         event_types: Lista de tipos a detectar (None = todos)
@@ -425,7 +517,11 @@ def find_all_candidates(
     Returns:
         Dict mapeando event_type → lista de candidatos
     """
-    lines = [ln.strip() for ln in (transcript or "").splitlines() if ln.strip()]
+    if isinstance(transcript, Transcript):
+        lines = transcript.lines
+    else:
+        lines = [ln.strip() for ln in (transcript or "").splitlines() if ln.strip()]
+        transcript = None
     
     if not lines:
         return {}
@@ -436,8 +532,12 @@ def find_all_candidates(
     if event_types:
         recipes_to_use = {k: v for k, v in RECIPES.items() if k in event_types}
 
+    # Uma única varredura marca todas as linhas para todas as receitas
+    scanner = get_pattern_scanner()
+    line_hits = scanner.scan(lines)
+
     for event_type, recipe in recipes_to_use.items():
-        candidates = find_event_candidates(lines, recipe, home_team, away_team)
+        candidates = find_event_candidates(lines, recipe, home_team, away_team, scanner, line_hits, transcript)
         if candidates:
             candidates_by_type[event_type] = candidates
             print(f"[EventDetector] {event_type}: {len(candidates)} candidatos encontrados")
@@ -543,10 +643,12 @@ def analyze_multitype_with_ollama(
     ollama_url: str = "http://127.0.0.1:11434",
     model: str = "washingtonlima/kakttus",
     timeout: int = 300,
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
     """
     Chama Ollama/Kakttus com todos os candidatos de todos os tipos.
     Retorna dict com 'events', 'summary', 'tactical'.
+    Respostas idênticas são reaproveitadas do llm_cache (use_cache=False ignora).
     """
     system_prompt, user_prompt = build_multitype_prompt(
         candidates_by_type, home_team, away_team
@@ -555,25 +657,31 @@ def analyze_multitype_with_ollama(
     print(f"[EventDetector] Enviando {sum(len(v) for v in candidates_by_type.values())} candidatos ao Ollama ({model})...")
     print(f"[EventDetector] Prompt size: {len(user_prompt)} chars")
 
-    try:
-        response = requests.post(
+    messages = [
+        {'role': 'system', 'content': system_prompt},
+        {'role': 'user', 'content': user_prompt},
+    ]
+
+    def _request() -> Optional[str]:
+        response = http_pool.session('ollama').post(
             f"{ollama_url}/api/chat",
             json={
                 'model': model,
-                'messages': [
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': user_prompt},
-                ],
+                'messages': messages,
                 'stream': False,
             },
-            timeout=timeout,
+            timeout=http_pool.timeout(timeout, 'ollama'),
         )
-
         if response.status_code != 200:
             print(f"[EventDetector] ❌ Ollama retornou status {response.status_code}")
-            return {"events": [], "summary": "", "tactical": ""}
+            return None
+        return (response.json().get("message") or {}).get("content", "").strip()
 
-        raw = (response.json().get("message") or {}).get("content", "").strip()
+    try:
+        raw = llm_cache.cached_call('ollama', model, messages, _request, use_cache=use_cache)
+
+        if raw is None:
+            return {"events": [], "summary": "", "tactical": ""}
 
         if not raw:
             print(f"[EventDetector] ⚠ Resposta vazia do Ollama")
@@ -588,7 +696,7 @@ def analyze_multitype_with_ollama(
         if result is None:
             # Retry: pedir conversão para JSON
             print(f"[EventDetector] ⚠ JSON não encontrado, tentando retry...")
-            result = _retry_json_extraction(raw, ollama_url, model)
+            result = _retry_json_extraction(raw, ollama_url, model, use_cache=use_cache)
 
         if result:
             events = result.get('events', [])
@@ -641,6 +749,7 @@ def _retry_json_extraction(
     raw_text: str,
     ollama_url: str,
     model: str,
+    use_cache: bool = True,
 ) -> Optional[Dict]:
     """Tenta converter resposta não-JSON em JSON pedindo ao Ollama."""
     system = (
@@ -668,21 +777,28 @@ Conteúdo:
 {raw_text[:3000]}
 """.strip()
 
-    try:
-        response = requests.post(
+    messages = [
+        {'role': 'system', 'content': system},
+        {'role': 'user', 'content': user},
+    ]
+
+    def _request() -> Optional[str]:
+        response = http_pool.session('ollama').post(
             f"{ollama_url}/api/chat",
             json={
                 'model': model,
-                'messages': [
-                    {'role': 'system', 'content': system},
-                    {'role': 'user', 'content': user},
-                ],
+                'messages': messages,
                 'stream': False,
             },
-            timeout=120,
+            timeout=http_pool.timeout(120, 'ollama'),
         )
-        if response.status_code == 200:
-            raw2 = (response.json().get("message") or {}).get("content", "").strip()
+        if response.status_code != 200:
+            return None
+        return (response.json().get("message") or {}).get("content", "").strip()
+
+    try:
+        raw2 = llm_cache.cached_call('ollama', model, messages, _request, use_cache=use_cache)
+        if raw2 is not None:
             return _extract_json(raw2)
     except Exception:
         pass
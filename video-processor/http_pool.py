@@ -0,0 +1,94 @@
+"""
+HTTP pool - one keep-alive requests.Session per AI/TTS provider.
+
+Bare requests.post() opens a new TCP (and TLS) connection per call; a match
+analysis makes dozens of small validation calls to the same host. Sessions
+here are created once per provider and shared by every call site:
+
+- Connection reuse with a per-provider pool size (HTTP_POOL_MAXSIZE)
+- Retry/backoff adapter for connection errors and 502/503/504
+  (read timeouts are never retried: the model may still be generating)
+- Timeout profiles: (connect, read) tuples by kind of call
+
+Usage:
+    response = http_pool.session('openai').post(url, json=..., timeout=http_pool.timeout('chat', 'openai'))
+"""
+
+import os
+import threading
+from typing import Dict, Any, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '16') or 16)
+
+# Read timeouts (seconds) by kind of call
+TIMEOUT_PROFILES = {
+    'validation': 60,       # short prompts, image/vision checks
+    'chat': 120,            # regular chat completions
+    'tts': 180,             # text-to-speech
+    'reasoning': 180,       # GPT-5 / o-series completions
+    'local_chat': 300,      # Ollama generation (CPU can be slow)
+    'transcription': 300,   # audio upload + transcription
+    'download': 300,        # streamed video downloads
+    'video_analysis': 600,  # multimodal analysis of whole videos
+    'long_upload': 900,     # large audio files
+}
+
+# provider -> connect timeout, retries (connect / 5xx status), pool size
+PROVIDERS: Dict[str, Dict[str, Any]] = {
+    'ollama': {'connect_timeout': 5, 'connect_retries': 1, 'status_retries': 1, 'pool_maxsize': 4},
+    'openai': {'connect_timeout': 10, 'connect_retries': 2, 'status_retries': 2},
+    'gemini': {'connect_timeout': 10, 'connect_retries': 2, 'status_retries': 2},
+    'lovable': {'connect_timeout': 10, 'connect_retries': 2, 'status_retries': 2},
+    'elevenlabs': {'connect_timeout': 10, 'connect_retries': 2, 'status_retries': 2},
+    'download': {'connect_timeout': 15, 'connect_retries': 3, 'status_retries': 2},
+}
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def _build_session(provider: str) -> requests.Session:
+    config = PROVIDERS.get(provider, PROVIDERS['download'])
+    retry = Retry(
+        total=config['connect_retries'] + config['status_retries'],
+        connect=config['connect_retries'],
+        read=0,
+        status=config['status_retries'],
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=None,  # LLM POSTs are safe to resend on connect/5xx
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    pool_maxsize = config.get('pool_maxsize', POOL_MAXSIZE)
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_maxsize, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def session(provider: str) -> requests.Session:
+    """Shared keep-alive session for a provider (created on first use)."""
+    s = _sessions.get(provider)
+    if s is not None:
+        return s
+    with _lock:
+        s = _sessions.get(provider)
+        if s is None:
+            s = _build_session(provider)
+            _sessions[provider] = s
+        return s
+
+
+def timeout(profile: Union[str, int, float], provider: str = None) -> Tuple[float, float]:
+    """(connect, read) timeout for a profile name or an explicit read timeout in seconds."""
+    read = TIMEOUT_PROFILES.get(profile, 120) if isinstance(profile, str) else profile
+    connect = PROVIDERS.get(provider, PROVIDERS['download'])['connect_timeout']
+    return (min(connect, read), read)
+
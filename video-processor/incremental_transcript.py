@@ -0,0 +1,211 @@
+"""
+Incremental transcript - streaming SRT + early event detection.
+
+The chunked Whisper paths hand each finished chunk of segments to
+IncrementalTranscript.add_segments(). The session appends the blocks to a
+partial SRT file and runs the keyword detectors (detect_goals_by_sliding_window
+and event_detector.find_all_candidates) only over the new lines plus the
+window context they need, so candidate events are available while Whisper is
+still running instead of after the whole half is transcribed.
+
+A line is only scanned once its detection window is complete (enough lines
+after it have arrived); finalize() scans the remaining tail.
+"""
+
+import os
+import time
+import threading
+from typing import Optional, List, Dict, Any, Callable
+
+# Same parameters used by detect_events_by_keywords for the full-SRT pass
+GOAL_WINDOW_SIZE = 5
+GOAL_MIN_MENTIONS = 3
+GOAL_MIN_BLOCK_GAP = 20
+
+
+class IncrementalTranscript:
+    """
+    Accumulates transcription segments as they are produced and emits
+    early goal/candidate events.
+
+    Args:
+        home_team / away_team: Team names for attribution
+        half: 'first' or 'second'
+        segment_start_minute: Game minute offset (0 or 45)
+        srt_path: Optional partial SRT written as blocks arrive
+        on_events: Optional callback(goals, candidates_by_type) for new events
+    """
+
+    def __init__(
+        self,
+        home_team: str,
+        away_team: str,
+        half: str = 'first',
+        segment_start_minute: int = 0,
+        srt_path: Optional[str] = None,
+        on_events: Optional[Callable[[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]], None]] = None
+    ):
+        from event_detector import RECIPES
+
+        self.home_team = home_team
+        self.away_team = away_team
+        self.half = half
+        self.segment_start_minute = segment_start_minute
+        self.srt_path = srt_path
+        self.on_events = on_events
+
+        # SRT blocks in detect_events_by_keywords format: (index, h, m, s, ms, text)
+        self.blocks: List[tuple] = []
+        self.block_seconds: List[float] = []
+        self.goals: List[Dict[str, Any]] = []
+        self.candidates: Dict[str, List[Dict[str, Any]]] = {}
+
+        self._goal_context = GOAL_WINDOW_SIZE // 2
+        self._candidate_context = max(r.window_size // 2 for r in RECIPES.values())
+        self._goal_scanned = 0
+        self._candidate_scanned = 0
+        self._last_goal_block = {'home': -GOAL_MIN_BLOCK_GAP, 'away': -GOAL_MIN_BLOCK_GAP, 'unknown': -GOAL_MIN_BLOCK_GAP}
+        self._last_candidate_end: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self.first_event_seconds: Optional[float] = None
+
+        if srt_path:
+            os.makedirs(os.path.dirname(srt_path) or '.', exist_ok=True)
+            open(srt_path, 'w', encoding='utf-8').close()
+
+    # ------------------------------------------------------------------
+    def add_segments(self, segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Append finished segments ({'start','end','text'}, seconds) and scan
+        the newly completed windows. Returns the new events found.
+        """
+        with self._lock:
+            new_blocks = []
+            for seg in segments:
+                text = (seg.get('text') or '').replace('\n', ' ').strip()
+                if not text:
+                    continue
+                start = float(seg.get('start', 0))
+                total = int(start)
+                block = (
+                    len(self.blocks) + 1,
+                    total // 3600,
+                    (total % 3600) // 60,
+                    total % 60,
+                    int((start % 1) * 1000),
+                    text
+                )
+                self.blocks.append(block)
+                self.block_seconds.append(start)
+                new_blocks.append((block, start, float(seg.get('end', start))))
+
+            if self.srt_path and new_blocks:
+                from ai_services import _format_srt_time
+                with open(self.srt_path, 'a', encoding='utf-8') as f:
+                    for block, start, end in new_blocks:
+                        f.write(f"{block[0]}\n{_format_srt_time(start)} --> {_format_srt_time(end)}\n{block[5]}\n\n")
+                    f.flush()
+
+            return self._scan(final=False)
+
+    def finalize(self) -> Dict[str, Any]:
+        """Scan the tail (lines without full right-hand context) and return a summary."""
+        with self._lock:
+            self._scan(final=True)
+            return {
+                'goals': list(self.goals),
+                'candidates': {k: list(v) for k, v in self.candidates.items()},
+                'blocks': len(self.blocks),
+                'first_event_seconds': self.first_event_seconds,
+                'srt_path': self.srt_path
+            }
+
+    # ------------------------------------------------------------------
+    def _scan(self, final: bool) -> Dict[str, Any]:
+        new_goals = self._scan_goals(final)
+        new_candidates = self._scan_candidates(final)
+
+        if (new_goals or new_candidates) and self.first_event_seconds is None:
+            self.first_event_seconds = round(time.time() - self._started, 2)
+            print(f"[Incremental] ⚡ Primeiro evento disponível após {self.first_event_seconds:.1f}s de transcrição")
+
+        if (new_goals or new_candidates) and self.on_events:
+            try:
+                self.on_events(new_goals, new_candidates)
+            except Exception as e:
+                print(f"[Incremental] ⚠ Erro no callback de eventos: {e}")
+
+        return {'goals': new_goals, 'candidates': new_candidates}
+
+    def _scan_goals(self, final: bool) -> List[Dict[str, Any]]:
+        from ai_services import detect_goals_by_sliding_window
+
+        horizon = len(self.blocks) if final else len(self.blocks) - self._goal_context
+        if horizon <= self._goal_scanned:
+            return []
+
+        lo = max(0, self._goal_scanned - self._goal_context)
+        window_blocks = self.blocks[lo:min(len(self.blocks), horizon + self._goal_context)]
+
+        # Gap between goals is enforced here across calls (min_block_gap=0 inside)
+        found = detect_goals_by_sliding_window(
+            srt_blocks=window_blocks,
+            home_team=self.home_team,
+            away_team=self.away_team,
+            segment_start_minute=self.segment_start_minute,
+            half=self.half,
+            window_size=GOAL_WINDOW_SIZE,
+            min_goal_mentions=GOAL_MIN_MENTIONS,
+            min_block_gap=0
+        )
+
+        new_goals = []
+        for goal in found:
+            index = lo + goal['block_index']
+            if index < self._goal_scanned or index >= horizon:
+                continue
+            team = goal.get('team', 'unknown')
+            if index - self._last_goal_block.get(team, -GOAL_MIN_BLOCK_GAP) < GOAL_MIN_BLOCK_GAP:
+                continue
+            goal['block_index'] = index
+            goal['detection_method'] = 'sliding_window_incremental'
+            self._last_goal_block[team] = index
+            new_goals.append(goal)
+
+        self._goal_scanned = horizon
+        self.goals.extend(new_goals)
+        return new_goals
+
+    def _scan_candidates(self, final: bool) -> Dict[str, List[Dict[str, Any]]]:
+        from event_detector import find_all_candidates
+
+        horizon = len(self.blocks) if final else len(self.blocks) - self._candidate_context
+        if horizon <= self._candidate_scanned:
+            return {}
+
+        lo = max(0, self._candidate_scanned - self._candidate_context)
+        hi = min(len(self.blocks), horizon + self._candidate_context)
+        transcript = '\n'.join(block[5] for block in self.blocks[lo:hi])
+
+        new_candidates: Dict[str, List[Dict[str, Any]]] = {}
+        for event_type, candidates in find_all_candidates(transcript, self.home_team, self.away_team).items():
+            for cand in candidates:
+                index = lo + cand['line_index']
+                if index < self._candidate_scanned or index >= horizon:
+                    continue
+                start_line = lo + cand['start_line']
+                if start_line <= self._last_candidate_end.get(event_type, -1):
+                    continue
+                cand['line_index'] = index
+                cand['start_line'] = start_line
+                cand['end_line'] = lo + cand['end_line']
+                cand['videoSecond'] = self.block_seconds[index]
+                cand['match_half'] = 'first_half' if self.half == 'first' else 'second_half'
+                self._last_candidate_end[event_type] = cand['end_line']
+                new_candidates.setdefault(event_type, []).append(cand)
+
+        self._candidate_scanned = horizon
+        for event_type, cands in new_candidates.items():
+            self.candidates.setdefault(event_type, []).extend(cands)
+        return new_candidates
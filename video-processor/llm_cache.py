@@ -0,0 +1,309 @@
+"""
+LLM response cache - persistent (SQLite) cache for chat completions.
+
+Entries are keyed by sha256 of (provider, model, temperature, max_tokens,
+format, messages) and stored in storage/_cache/llm/responses.sqlite.
+Re-running analysis on unchanged input (validate_goal_with_ollama,
+analyze_multitype_with_ollama, generate_tactical_summary, ...) returns the
+stored response instead of paying the model latency again.
+
+- TTL: entries older than LLM_CACHE_TTL_HOURS are ignored on read and
+  purged by a sweep that runs at most every SWEEP_INTERVAL_SECONDS
+- Size: at most LLM_CACHE_MAX_MB of stored responses (least recently used
+  evicted); writes keep a running byte total instead of counting rows
+- Caching never changes sampling: the temperature is part of the key and
+  is sent as the caller chose it. By default (use_cache=None) only calls at
+  or below LLM_CACHE_MAX_TEMPERATURE are cached; a caller that is fine with
+  reusing a sampled answer opts in with use_cache=True (chatbot, live
+  commentary, ... keep the default and always reach the provider)
+- Bypass: call with use_cache=False or wrap code in `with bypass():`
+- Hits: last_call_was_hit() tells the caller (same thread) whether its
+  last cached_call() was answered from the cache, so provider health
+  tracking can ignore those ~0s "calls"
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List
+
+from storage import get_cache_dir
+
+CACHE_VERSION = 1
+CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+TTL_HOURS = float(os.environ.get('LLM_CACHE_TTL_HOURS', '168') or 168)
+MAX_MB = float(os.environ.get('LLM_CACHE_MAX_MB', '200') or 200)
+MAX_TEMPERATURE = float(os.environ.get('LLM_CACHE_MAX_TEMPERATURE', '0.2') or 0.2)
+
+SWEEP_INTERVAL_SECONDS = 600
+
+_lock = threading.Lock()
+_local = threading.local()
+_conn: Optional[sqlite3.Connection] = None
+_counters = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'bypassed': 0}
+# Bytes of stored responses (caller holds _lock), summed once on first use
+_size_bytes: Optional[int] = None
+_last_sweep = 0.0
+
+_RESPONSE_BYTES = 'LENGTH(CAST(response AS BLOB))'
+
+
+def set_cache_config(enabled: bool = None, ttl_hours: float = None, max_mb: float = None):
+    """Update cache settings at runtime (from settings)."""
+    global CACHE_ENABLED, TTL_HOURS, MAX_MB
+    if enabled is not None:
+        CACHE_ENABLED = enabled
+    if ttl_hours is not None and ttl_hours > 0:
+        TTL_HOURS = ttl_hours
+    if max_mb is not None and max_mb > 0:
+        MAX_MB = max_mb
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Shared connection (caller holds _lock)."""
+    global _conn
+    if _conn is None:
+        path = get_cache_dir('llm') / 'responses.sqlite'
+        _conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        _conn.execute('PRAGMA journal_mode=WAL')
+        _conn.execute('PRAGMA synchronous=NORMAL')
+        _conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        _conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_last_access ON llm_responses(last_access)')
+        _conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_created_at ON llm_responses(created_at)')
+        _conn.commit()
+    return _conn
+
+
+@contextmanager
+def bypass():
+    """Skip the cache (no reads, no writes) for calls made in this block/thread."""
+    previous = getattr(_local, 'bypass', False)
+    _local.bypass = True
+    try:
+        yield
+    finally:
+        _local.bypass = previous
+
+
+def is_active(use_cache: bool = True) -> bool:
+    return CACHE_ENABLED and use_cache and not getattr(_local, 'bypass', False)
+
+
+def last_call_was_hit() -> bool:
+    """Whether this thread's last cached_call() returned a stored response."""
+    return getattr(_local, 'last_hit', False)
+
+
+def make_key(
+    provider: str,
+    model: Optional[str],
+    messages: List[Dict[str, Any]],
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    format: Optional[str] = None
+) -> str:
+    payload = json.dumps({
+        'v': CACHE_VERSION,
+        'provider': provider,
+        'model': model,
+        'temperature': temperature,
+        'max_tokens': max_tokens,
+        'format': format,
+        'messages': messages,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get(key: str) -> Optional[str]:
+    """Cached response or None (counts a hit/miss)."""
+    now = time.time()
+    try:
+        with _lock:
+            conn = _get_conn()
+            row = conn.execute(
+                'SELECT response, created_at FROM llm_responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row and now - row[1] <= TTL_HOURS * 3600:
+                conn.execute(
+                    'UPDATE llm_responses SET last_access = ?, hits = hits + 1 WHERE key = ?', (now, key)
+                )
+                conn.commit()
+                _counters['hits'] += 1
+                return row[0]
+            if row:
+                _delete_keys(conn, [key])
+                conn.commit()
+            _counters['misses'] += 1
+    except sqlite3.Error as e:
+        print(f"[LLMCache] ⚠ Erro ao ler cache: {e}")
+    return None
+
+
+def _stored_bytes(conn: sqlite3.Connection) -> int:
+    """Running byte total of stored responses (caller holds _lock)."""
+    global _size_bytes
+    if _size_bytes is None:
+        _size_bytes = conn.execute(
+            f'SELECT COALESCE(SUM({_RESPONSE_BYTES}), 0) FROM llm_responses'
+        ).fetchone()[0]
+    return _size_bytes
+
+
+def _delete_keys(conn: sqlite3.Connection, keys: List[str]) -> int:
+    """Delete rows by key keeping the byte total in step (caller holds _lock)."""
+    global _size_bytes
+    removed = 0
+    for key in keys:
+        row = conn.execute(f'SELECT {_RESPONSE_BYTES} FROM llm_responses WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            continue
+        conn.execute('DELETE FROM llm_responses WHERE key = ?', (key,))
+        if _size_bytes is not None:
+            _size_bytes -= row[0]
+        removed += 1
+    return removed
+
+
+def _sweep_expired(conn: sqlite3.Connection, now: float) -> int:
+    """Purge entries past the TTL (caller holds _lock)."""
+    global _size_bytes, _last_sweep
+    _last_sweep = now
+    cutoff = now - TTL_HOURS * 3600
+    freed = conn.execute(
+        f'SELECT COALESCE(SUM({_RESPONSE_BYTES}), 0) FROM llm_responses WHERE created_at < ?', (cutoff,)
+    ).fetchone()[0]
+    removed = conn.execute('DELETE FROM llm_responses WHERE created_at < ?', (cutoff,)).rowcount
+    _size_bytes = _stored_bytes(conn) - freed
+    return max(removed, 0)
+
+
+def _evict_to_budget(conn: sqlite3.Connection) -> int:
+    """Drop least recently used rows until the stored bytes fit MAX_MB (caller holds _lock)."""
+    global _size_bytes
+    excess = _stored_bytes(conn) - int(MAX_MB * 1024 * 1024)
+    if excess <= 0:
+        return 0
+    victims = []
+    freed = 0
+    for key, size in conn.execute(
+        f'SELECT key, {_RESPONSE_BYTES} FROM llm_responses ORDER BY last_access ASC'
+    ):
+        if freed >= excess:
+            break
+        victims.append((key,))
+        freed += size
+    conn.executemany('DELETE FROM llm_responses WHERE key = ?', victims)
+    _size_bytes -= freed
+    return len(victims)
+
+
+def put(key: str, provider: str, model: Optional[str], response: str):
+    """Store a response, evicting least recently used rows past the byte budget."""
+    global _size_bytes
+    if not response:
+        return
+    now = time.time()
+    try:
+        with _lock:
+            conn = _get_conn()
+            _stored_bytes(conn)
+            _delete_keys(conn, [key])  # replaced entry: its bytes leave the total
+            conn.execute(
+                'INSERT INTO llm_responses (key, provider, model, response, created_at, last_access, hits) '
+                'VALUES (?, ?, ?, ?, ?, ?, 0)',
+                (key, provider, model, response, now, now)
+            )
+            _size_bytes += len(response.encode('utf-8'))
+            _counters['stores'] += 1
+
+            evicted = 0
+            if now - _last_sweep >= SWEEP_INTERVAL_SECONDS:
+                evicted += _sweep_expired(conn, now)
+            evicted += _evict_to_budget(conn)
+            _counters['evictions'] += evicted
+            conn.commit()
+    except sqlite3.Error as e:
+        # The transaction may be half applied: recount on next use
+        _size_bytes = None
+        print(f"[LLMCache] ⚠ Erro ao gravar cache: {e}")
+
+
+def cached_call(
+    provider: str,
+    model: Optional[str],
+    messages: List[Dict[str, Any]],
+    call_fn,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    format: Optional[str] = None,
+    use_cache: Optional[bool] = None
+) -> Optional[str]:
+    """
+    Return the cached response or run call_fn() and store its (non-empty) result.
+
+    use_cache: None caches only low-temperature calls (no temperature means
+    provider default sampling), True opts in at any temperature, False skips.
+    """
+    _local.last_hit = False
+    if use_cache is None:
+        # Sampled output: callers expect a fresh answer unless they opt in
+        use_cache = temperature is not None and temperature <= MAX_TEMPERATURE
+    if not is_active(use_cache):
+        _counters['bypassed'] += 1
+        return call_fn()
+
+    key = make_key(provider, model, messages, temperature, max_tokens, format)
+    cached = get(key)
+    if cached is not None:
+        print(f"[LLMCache] ♻️ Resposta reaproveitada ({provider}/{model}, {len(cached)} chars)")
+        _local.last_hit = True
+        return cached
+
+    response = call_fn()
+    if response:
+        put(key, provider, model, response)
+    return response
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Counters since start + entries/size on disk."""
+    stats: Dict[str, Any] = dict(_counters)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+    stats['enabled'] = CACHE_ENABLED
+    stats['ttl_hours'] = TTL_HOURS
+    stats['max_mb'] = MAX_MB
+    try:
+        with _lock:
+            conn = _get_conn()
+            stats['entries'] = conn.execute('SELECT COUNT(*) FROM llm_responses').fetchone()[0]
+            stats['size_bytes'] = _stored_bytes(conn)
+    except sqlite3.Error as e:
+        stats['error'] = str(e)
+    return stats
+
+
+def clear_llm_cache() -> int:
+    """Remove all cached responses. Returns number of rows removed."""
+    global _size_bytes
+    with _lock:
+        conn = _get_conn()
+        removed = conn.execute('DELETE FROM llm_responses').rowcount
+        conn.commit()
+        _size_bytes = 0
+    print(f"[LLMCache] 🧹 {removed} respostas removidas do cache")
+    return removed
@@ -14,6 +14,9 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple, Callable
 
+import media_index
+import media_probe
+
 # Default chunk duration in seconds
 CHUNK_DURATION_DEFAULT = 10
 
@@ -69,23 +72,12 @@ def get_video_duration(video_path: str) -> float:
         Duration in seconds (float), or 0.0 on error
     """
     try:
-        cmd = [
-            'ffprobe', '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_format',
-            video_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        data = media_probe.probe(video_path)
         
-        if result.returncode == 0:
-            data = json.loads(result.stdout)
+        if data is not None:
             duration = float(data.get('format', {}).get('duration', 0))
             print(f"[MediaChunker] Video duration: {duration:.2f}s ({duration/60:.1f}min)")
             return duration
-    except subprocess.TimeoutExpired:
-        print(f"[MediaChunker] Timeout getting video duration")
-    except json.JSONDecodeError as e:
-        print(f"[MediaChunker] Error parsing ffprobe output: {e}")
     except Exception as e:
         print(f"[MediaChunker] Error getting video duration: {e}")
     
@@ -155,30 +147,35 @@ def split_video_to_chunks(
     chunks_dir = get_chunks_dir(job_id)
     chunks = []
     
-    # Get video duration
-    total_duration = get_video_duration(video_path)
+    # Get video duration (keyframe index when available)
+    index = media_index.get_index(video_path)
+    total_duration = index.duration if index and index.duration > 0 else get_video_duration(video_path)
     if total_duration <= 0:
         print(f"[MediaChunker] Could not determine video duration")
         return [], 0
     
-    total_duration_ms = int(total_duration * 1000)
-    chunk_duration_ms = chunk_duration * 1000
-    
     # Calculate total chunks needed
     total_chunks = int(total_duration // chunk_duration)
     if total_duration % chunk_duration > 0:
         total_chunks += 1
     
+    # Stream copy starts at the keyframe before -ss: align chunk starts to keyframes
+    # so start_ms/end_ms match the chunk contents
+    boundaries = [float(i * chunk_duration) for i in range(total_chunks)]
+    if index and len(index):
+        boundaries = index.aligned_boundaries(boundaries, max_shift=chunk_duration / 2)
+        total_chunks = len(boundaries)
+    boundaries.append(total_duration)
+    
     print(f"[MediaChunker] Splitting video into {total_chunks} chunks of {chunk_duration}s each")
     
     for i in range(total_chunks):
         chunk_index = i + 1
-        start_seconds = i * chunk_duration
-        start_ms = start_seconds * 1000
+        start_seconds = boundaries[i]
+        start_ms = int(round(start_seconds * 1000))
         
         # Calculate end time (may be shorter for last chunk)
-        remaining = total_duration - start_seconds
-        actual_duration = min(chunk_duration, remaining)
+        actual_duration = boundaries[i + 1] - start_seconds
         end_ms = start_ms + int(actual_duration * 1000)
         
         # File names with zero-padding
@@ -210,9 +207,11 @@ def split_video_to_chunks(
             if on_progress:
                 on_progress(chunk_index, total_chunks, f"Dividindo vídeo {chunk_index}/{total_chunks}...")
             
+            # Seek half a frame past the keyframe so rounding cannot start at the previous GOP
+            seek_seconds = index.copy_seek(start_seconds) if index and len(index) else start_seconds
             cmd = [
                 'ffmpeg', '-y',
-                '-ss', str(start_seconds),
+                '-ss', f"{seek_seconds:.6f}",
                 '-i', video_path,
                 '-t', str(actual_duration),
                 '-c', 'copy',
@@ -551,17 +550,10 @@ def get_video_info(video_path: str) -> Dict:
         if os.path.exists(video_path):
             info['size_bytes'] = os.path.getsize(video_path)
         
-        # Get video info via ffprobe
-        cmd = [
-            'ffprobe', '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_format', '-show_streams',
-            video_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        # Get video info via ffprobe (memoized)
+        data = media_probe.probe(video_path)
         
-        if result.returncode == 0:
-            data = json.loads(result.stdout)
+        if data is not None:
             
             # Format info
             fmt = data.get('format', {})
@@ -669,7 +661,8 @@ def create_video_proxy(
     # Check if proxy already exists and is valid
     if os.path.exists(output_path):
         proxy_info = get_video_info(output_path)
-        if proxy_info['duration'] > 0 and abs(proxy_info['duration'] - original_info['duration']) < 2:
+        if is_proxy_valid(original_path, output_path, original_duration=original_info['duration'],
+                          proxy_duration=proxy_info['duration']):
             print(f"[ProxyGen] ✓ Valid proxy already exists: {output_path}")
             result['status'] = 'ready'
             result['proxy_size_bytes'] = proxy_info['size_bytes']
@@ -762,6 +755,25 @@ def create_video_proxy(
     return result
 
 
+def is_proxy_valid(
+    original_path: str,
+    proxy_path: str,
+    original_duration: float = None,
+    proxy_duration: float = None
+) -> bool:
+    """
+    Check that a proxy covers the whole original (durations within 2 seconds).
+    
+    Durations come from existing media indexes when available, so a
+    re-validation does not probe both files again.
+    """
+    if original_duration is None:
+        original_duration = media_index.get_duration(original_path) or get_video_info(original_path)['duration']
+    if proxy_duration is None:
+        proxy_duration = media_index.get_duration(proxy_path) or get_video_info(proxy_path)['duration']
+    return proxy_duration > 0 and abs(proxy_duration - original_duration) < 2
+
+
 def get_or_create_proxy(
     video_path: str,
     match_id: str,
@@ -791,11 +803,8 @@ def get_or_create_proxy(
     
     # Check if valid proxy exists
     if proxy_path.exists():
-        proxy_info = get_video_info(str(proxy_path))
-        original_info = get_video_info(video_path)
-        
         # Validate proxy has similar duration (within 2 seconds)
-        if proxy_info['duration'] > 0 and abs(proxy_info['duration'] - original_info['duration']) < 2:
+        if is_proxy_valid(video_path, str(proxy_path)):
             print(f"[ProxyGen] ✓ Using existing proxy: {proxy_path}")
             return str(proxy_path)
     
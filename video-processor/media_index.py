@@ -0,0 +1,277 @@
+"""
+Media index - one-time keyframe/packet index per video.
+
+A single `ffprobe -show_packets` pass (packet headers only, no decoding)
+records the video stream's keyframe times and byte offsets, the container
+duration and the stream info. The result is kept as NumPy arrays in a
+compact .npz sidecar under storage/_cache/media_index/, keyed by the
+video's real path and validated against its size and mtime, so:
+
+- Smart-cut planning (clip_cutter) reads keyframes without ffprobe runs
+- split_video / split_video_to_chunks pick keyframe-aligned boundaries
+- Proxy validation compares durations without probing both files
+
+All lookups are binary searches (np.searchsorted) on the sorted keyframe
+array. Times share the origin of FFmpeg's input -ss (container start
+time subtracted).
+"""
+
+import os
+import json
+import hashlib
+import threading
+import subprocess
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+from storage import get_cache_dir
+
+INDEX_VERSION = 1
+INDEX_ENABLED = os.environ.get('MEDIA_INDEX_ENABLED', 'true').lower() == 'true'
+# Half a frame at 25 fps, for copy_seek when the stream has no frame rate
+DEFAULT_HALF_FRAME = 0.02
+
+# In-process memo: (realpath, size, mtime_ns) -> MediaIndex
+_memo: Dict[Tuple[str, int, int], 'MediaIndex'] = {}
+_memo_lock = threading.Lock()
+# One build per file at a time
+_build_locks: Dict[str, threading.Lock] = {}
+
+
+def _parse_rate(rate: str) -> float:
+    try:
+        num, _, den = (rate or '0/1').partition('/')
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+class MediaIndex:
+    """Keyframe times/offsets + duration + stream info of one video."""
+
+    def __init__(self, keyframe_times: np.ndarray, keyframe_offsets: np.ndarray, duration: float,
+                 stream: Dict[str, Any], packet_count: int = 0):
+        order = np.argsort(keyframe_times, kind='stable')
+        self.keyframe_times = np.asarray(keyframe_times, dtype=np.float64)[order]
+        self.keyframe_offsets = np.asarray(keyframe_offsets, dtype=np.int64)[order]
+        self.duration = float(duration)
+        self.stream = stream
+        self.packet_count = int(packet_count)
+
+    def __len__(self) -> int:
+        return len(self.keyframe_times)
+
+    def keyframe_at_or_before(self, t: float) -> Optional[float]:
+        """Last keyframe <= t (where a stream-copy seek to t actually starts)."""
+        i = int(np.searchsorted(self.keyframe_times, t, side='right')) - 1
+        return float(self.keyframe_times[i]) if i >= 0 else None
+
+    def keyframe_at_or_after(self, t: float) -> Optional[float]:
+        """First keyframe >= t."""
+        i = int(np.searchsorted(self.keyframe_times, t, side='left'))
+        return float(self.keyframe_times[i]) if i < len(self.keyframe_times) else None
+
+    def keyframes_between(self, start: float, end: float) -> List[float]:
+        """Keyframes in [start, end]."""
+        lo = int(np.searchsorted(self.keyframe_times, start, side='left'))
+        hi = int(np.searchsorted(self.keyframe_times, end, side='right'))
+        return self.keyframe_times[lo:hi].tolist()
+
+    def byte_offset(self, t: float) -> Optional[int]:
+        """File offset of the keyframe at or before t (-1 when the container has none)."""
+        i = int(np.searchsorted(self.keyframe_times, t, side='right')) - 1
+        return int(self.keyframe_offsets[i]) if i >= 0 else None
+
+    def copy_seek(self, t: float) -> float:
+        """
+        -ss value for a stream-copy cut starting at keyframe t: half a frame
+        past it, so a printed time rounded just below the keyframe pts cannot
+        make FFmpeg start at the previous keyframe (a whole GOP early).
+        """
+        fps = (self.stream or {}).get('fps') or 0
+        return t + (0.5 / fps if fps > 0 else DEFAULT_HALF_FRAME)
+
+    def aligned_boundaries(self, nominal: List[float], max_shift: float) -> List[float]:
+        """
+        Snap boundary times to the keyframe at or before each one.
+
+        A boundary moves only when that keyframe is within max_shift seconds
+        (otherwise the nominal time is kept); duplicates are dropped so no
+        part collapses to zero length.
+        """
+        if not len(self.keyframe_times):
+            return list(nominal)
+        times = np.asarray(nominal, dtype=np.float64)
+        idx = np.searchsorted(self.keyframe_times, times, side='right') - 1
+        snapped = np.where(idx >= 0, self.keyframe_times[np.maximum(idx, 0)], times)
+        snapped = np.where(times - snapped <= max_shift, snapped, times)
+        result: List[float] = []
+        for t in snapped.tolist():
+            if not result or t > result[-1] + 1e-6:
+                result.append(t)
+        return result
+
+
+def _cache_path(real_path: str) -> Path:
+    key = hashlib.sha256(real_path.encode('utf-8')).hexdigest()[:40]
+    return get_cache_dir('media_index') / key[:2] / f"{key}.npz"
+
+
+def _stat_key(video_path: str) -> Optional[Tuple[str, int, int]]:
+    try:
+        real_path = os.path.realpath(video_path)
+        st = os.stat(real_path)
+    except OSError:
+        return None
+    return real_path, st.st_size, st.st_mtime_ns
+
+
+def _load_sidecar(path: Path, size: int, mtime_ns: int) -> Optional[MediaIndex]:
+    if not path.exists():
+        return None
+    try:
+        with np.load(str(path), allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if (meta.get('version') != INDEX_VERSION or meta.get('size') != size
+                    or meta.get('mtime_ns') != mtime_ns):
+                return None
+            return MediaIndex(data['keyframe_times'], data['keyframe_offsets'],
+                              meta.get('duration', 0.0), meta.get('stream') or {}, meta.get('packet_count', 0))
+    except Exception as e:
+        print(f"[MediaIndex] ⚠ Índice inválido {path.name}: {e}")
+        return None
+
+
+def _save_sidecar(path: Path, index: MediaIndex, size: int, mtime_ns: int):
+    meta = {
+        'version': INDEX_VERSION,
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'duration': index.duration,
+        'stream': index.stream,
+        'packet_count': index.packet_count,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npz")
+        np.savez(str(tmp_path), keyframe_times=index.keyframe_times,
+                 keyframe_offsets=index.keyframe_offsets, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"[MediaIndex] ⚠ Não foi possível salvar índice: {e}")
+
+
+def build_index(video_path: str, timeout: int = 600) -> Optional[MediaIndex]:
+    """Run the single ffprobe packet pass and build the index (no caching)."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries',
+             'packet=pts_time,dts_time,pos,flags'
+             ':stream=codec_name,profile,pix_fmt,width,height,avg_frame_rate,r_frame_rate'
+             ':format=duration,start_time',
+             '-of', 'json', video_path],
+            capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        print(f"[MediaIndex] ⚠ Timeout indexando {os.path.basename(video_path)}")
+        return None
+    except Exception as e:
+        print(f"[MediaIndex] ⚠ Erro ao indexar vídeo: {e}")
+        return None
+    if result.returncode != 0:
+        return None
+
+    try:
+        data = json.loads(result.stdout or '{}')
+    except json.JSONDecodeError as e:
+        print(f"[MediaIndex] ⚠ Saída do ffprobe inválida: {e}")
+        return None
+
+    fmt = data.get('format') or {}
+    origin = float(fmt.get('start_time') or 0)
+    streams = data.get('streams') or []
+    stream = streams[0] if streams else {}
+    packets = data.get('packets') or []
+
+    times, offsets = [], []
+    for packet in packets:
+        if 'K' not in (packet.get('flags') or ''):
+            continue
+        t = packet.get('pts_time', packet.get('dts_time'))
+        try:
+            t = float(t) - origin
+        except (TypeError, ValueError):
+            continue
+        try:
+            pos = int(packet.get('pos', -1))
+        except (TypeError, ValueError):
+            pos = -1
+        times.append(t)
+        offsets.append(pos)
+
+    stream_info = {
+        'codec_name': stream.get('codec_name'),
+        'profile': (stream.get('profile') or '').lower(),
+        'pix_fmt': stream.get('pix_fmt'),
+        'width': stream.get('width', 0),
+        'height': stream.get('height', 0),
+        'fps': _parse_rate(stream.get('avg_frame_rate')) or _parse_rate(stream.get('r_frame_rate')),
+        'start_time': origin,
+    }
+    return MediaIndex(np.array(times, dtype=np.float64), np.array(offsets, dtype=np.int64),
+                      float(fmt.get('duration') or 0), stream_info, len(packets))
+
+
+def get_index(video_path: str, build: bool = True) -> Optional[MediaIndex]:
+    """
+    Index for this video: in-process memo, then sidecar, then (if build) ffprobe.
+
+    Args:
+        video_path: Source video
+        build: Run the ffprobe pass on a miss (False = only reuse existing indexes)
+
+    Returns:
+        MediaIndex, or None when disabled, missing (build=False) or not indexable
+    """
+    if not INDEX_ENABLED:
+        return None
+    stat_key = _stat_key(video_path)
+    if stat_key is None:
+        return None
+    real_path, size, mtime_ns = stat_key
+
+    with _memo_lock:
+        if stat_key in _memo:
+            return _memo[stat_key]
+        build_lock = _build_locks.setdefault(real_path, threading.Lock())
+
+    sidecar = _cache_path(real_path)
+    index = _load_sidecar(sidecar, size, mtime_ns)
+    if index is None and build:
+        with build_lock:
+            with _memo_lock:
+                if stat_key in _memo:
+                    return _memo[stat_key]
+            index = _load_sidecar(sidecar, size, mtime_ns)
+            if index is None:
+                index = build_index(real_path)
+                if index is None:
+                    return None
+                _save_sidecar(sidecar, index, size, mtime_ns)
+                print(f"[MediaIndex] ✓ {os.path.basename(real_path)}: {len(index)} keyframes, "
+                      f"{index.duration:.1f}s ({index.packet_count} pacotes)")
+    if index is None:
+        return None
+
+    with _memo_lock:
+        _memo[stat_key] = index
+    return index
+
+
+def get_duration(video_path: str, build: bool = False) -> float:
+    """Container duration from the index (0.0 when there is none)."""
+    index = get_index(video_path, build=build)
+    return index.duration if index else 0.0
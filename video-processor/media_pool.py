@@ -0,0 +1,203 @@
+"""
+Media pool - CPU-aware process pool for per-clip FFmpeg work.
+
+Clip cutting, subtitle burn-in and thumbnail rendering used to run one
+FFmpeg at a time inside the request/pipeline thread. MediaPool runs those
+jobs on worker processes instead:
+
+- Size: usable cores // MEDIA_FFMPEG_THREADS workers (capped by
+  MEDIA_POOL_MAX_WORKERS); inside a worker every FFmpeg gets
+  `-threads MEDIA_FFMPEG_THREADS` (ffmpeg_thread_args), so N workers x T
+  threads fill the machine without oversubscribing it
+- One long-lived executor is shared by every MediaPool/map_jobs caller:
+  two matches processed at once queue on the same N workers instead of
+  starting N processes each (and workers are spawned once, not per call)
+- Results come back in input order (None for jobs that raised)
+- on_result(index, result) and on_progress(done, total) are called on the
+  coordinator as jobs finish; job functions only touch files - callers do
+  the DB writes there (or afterwards), batched, on the coordinator
+- spawn context (like the local Whisper pool): the server process has
+  ctranslate2/torch threads that are not fork-safe
+- If the pool cannot start or a worker dies, the remaining jobs run inline
+  (a dead executor is replaced on the next call)
+
+Job functions must be module-level (picklable) and take one argument.
+
+Usage:
+    with media_pool.MediaPool(len(jobs)) as pool:
+        results = pool.map(clip_cutter.finish_clip, jobs, label='clips')
+"""
+
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, List, Optional, Any
+
+FFMPEG_THREADS = int(os.environ.get('MEDIA_FFMPEG_THREADS', '2') or 2)
+MAX_WORKERS = int(os.environ.get('MEDIA_POOL_MAX_WORKERS', '0') or 0)  # 0 = from cores
+POOL_ENABLED = os.environ.get('MEDIA_POOL_ENABLED', 'true').lower() == 'true'
+
+# Set by the worker initializer: FFmpeg thread cap applies only inside the pool
+_in_worker = False
+
+# Shared executor (created on first use)
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def available_cores() -> int:
+    """Cores this process may run on (affinity-aware where supported)."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def get_worker_count(max_jobs: int = None) -> int:
+    workers = max(1, available_cores() // max(1, FFMPEG_THREADS))
+    if MAX_WORKERS > 0:
+        workers = min(workers, MAX_WORKERS)
+    if max_jobs is not None:
+        workers = min(workers, max(1, max_jobs))
+    return workers if POOL_ENABLED else 1
+
+
+def ffmpeg_thread_args() -> List[str]:
+    """['-threads', N] inside pool workers, [] elsewhere (FFmpeg picks its own)."""
+    return ['-threads', str(FFMPEG_THREADS)] if _in_worker and FFMPEG_THREADS > 0 else []
+
+
+def _worker_init():
+    global _in_worker
+    _in_worker = True
+
+
+def _get_shared_executor() -> Optional[ProcessPoolExecutor]:
+    """The process-wide executor (None when it cannot be started)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = get_worker_count()
+            try:
+                _executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_worker_init
+                )
+                print(f"[MediaPool] 🚀 {workers} processos x {FFMPEG_THREADS} threads FFmpeg ({available_cores()} núcleos)")
+            except Exception as e:
+                print(f"[MediaPool] ⚠ Pool indisponível, executando em série: {e}")
+                return None
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor):
+    """Drop a broken executor so the next call starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class MediaPool:
+    """Submits jobs to the shared worker processes (serial when one worker is enough)."""
+
+    def __init__(self, max_jobs: int = None):
+        self.workers = get_worker_count(max_jobs)
+        self._broken = False
+
+    def __enter__(self) -> 'MediaPool':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Nothing to release: the worker processes are shared and long-lived."""
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self._broken or self.workers <= 1:
+            return None
+        return _get_shared_executor()
+
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        label: str = 'mídia',
+        on_result: Optional[Callable[[int, Any], None]] = None
+    ) -> List[Any]:
+        """
+        Run fn(item) for every item on the pool.
+
+        Args:
+            fn: Module-level job function (exceptions are logged, result becomes None)
+            items: Jobs, in the order results should be returned
+            on_progress: Optional callback(done, total), called on this thread
+            on_result: Optional callback(index, result) as each job finishes
+                (completion order), called on this thread before on_progress
+            label: Name used in log messages
+
+        Returns:
+            List with one result per item, in input order
+        """
+        items = list(items)
+        results: List[Any] = [None] * len(items)
+        if not items:
+            return results
+
+        done = 0
+        pending = list(range(len(items)))
+        executor = self._get_executor() if len(items) > 1 else None
+
+        if executor is not None:
+            futures = {executor.submit(fn, items[i]): i for i in pending}
+            try:
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        results[i] = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        print(f"[MediaPool] ⚠ Job de {label} falhou: {e}")
+                    pending.remove(i)
+                    done += 1
+                    if on_result:
+                        on_result(i, results[i])
+                    if on_progress:
+                        on_progress(done, len(items))
+            except BrokenProcessPool as e:
+                # Worker died (OOM, crash): finish the rest inline
+                print(f"[MediaPool] ⚠ Pool falhou ({e}), {len(pending)} jobs de {label} em série")
+                self._broken = True
+                _discard_executor(executor)
+
+        for i in list(pending):
+            try:
+                results[i] = fn(items[i])
+            except Exception as e:
+                print(f"[MediaPool] ⚠ Job de {label} falhou: {e}")
+            done += 1
+            if on_result:
+                on_result(i, results[i])
+            if on_progress:
+                on_progress(done, len(items))
+
+        return results
+
+
+def map_jobs(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    label: str = 'mídia'
+) -> List[Any]:
+    """MediaPool.map() for one batch of items."""
+    items = list(items)
+    with MediaPool(len(items)) as pool:
+        return pool.map(fn, items, on_progress=on_progress, label=label)
@@ -0,0 +1,206 @@
+"""
+Media probe - memoized ffprobe (format + streams) for every module.
+
+get_video_info (server, media_chunker, audio_processor), the duration
+helpers and the per-file probes in the upload/sync/link endpoints used to
+start their own ffprobe each time; _sync_videos_for_match re-probed every
+file on every sync. They all go through probe() now:
+
+- Key: (realpath, size, mtime_ns) - a rewritten file is probed again
+- In-process LRU (MEDIA_PROBE_LRU_SIZE entries) in front of
+- A persistent SQLite table (storage/_cache/media_probe/probes.sqlite),
+  so restarts and other worker processes reuse earlier probes
+- Failed probes are not cached (the file may still be being written)
+
+probe() returns the parsed `ffprobe -show_format -show_streams -of json`
+output; callers keep their own field extraction.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import subprocess
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+from storage import get_cache_dir
+
+CACHE_VERSION = 1
+CACHE_ENABLED = os.environ.get('MEDIA_PROBE_CACHE_ENABLED', 'true').lower() == 'true'
+LRU_SIZE = int(os.environ.get('MEDIA_PROBE_LRU_SIZE', '512') or 512)
+
+_lock = threading.Lock()
+_lru: 'OrderedDict[Tuple[str, int, int], Dict[str, Any]]' = OrderedDict()
+_conn: Optional[sqlite3.Connection] = None
+_counters = {'memory_hits': 0, 'disk_hits': 0, 'probes': 0, 'failures': 0}
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Shared connection (caller holds _lock)."""
+    global _conn
+    if _conn is None:
+        path = get_cache_dir('media_probe') / 'probes.sqlite'
+        _conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        _conn.execute('PRAGMA journal_mode=WAL')
+        _conn.execute('PRAGMA synchronous=NORMAL')
+        _conn.execute('''
+            CREATE TABLE IF NOT EXISTS media_probes (
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                probed_at REAL NOT NULL,
+                PRIMARY KEY (path, size, mtime_ns)
+            )
+        ''')
+        _conn.commit()
+    return _conn
+
+
+def _stat_key(path: str) -> Optional[Tuple[str, int, int]]:
+    try:
+        real_path = os.path.realpath(path)
+        st = os.stat(real_path)
+    except OSError:
+        return None
+    return real_path, st.st_size, st.st_mtime_ns
+
+
+def _remember(key: Tuple[str, int, int], data: Dict[str, Any]):
+    """Put in the LRU (caller holds _lock)."""
+    _lru[key] = data
+    _lru.move_to_end(key)
+    while len(_lru) > LRU_SIZE:
+        _lru.popitem(last=False)
+
+
+def _run_ffprobe(path: str, timeout: int) -> Optional[Dict[str, Any]]:
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', path],
+            capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        print(f"[MediaProbe] ⚠ Timeout: {os.path.basename(path)}")
+        return None
+    except Exception as e:
+        print(f"[MediaProbe] ⚠ Erro ao executar ffprobe: {e}")
+        return None
+    if result.returncode != 0:
+        return None
+    try:
+        data = json.loads(result.stdout or '{}')
+    except json.JSONDecodeError as e:
+        print(f"[MediaProbe] ⚠ Saída do ffprobe inválida: {e}")
+        return None
+    return data if data.get('format') or data.get('streams') else None
+
+
+def probe(path: str, timeout: int = 30, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Parsed ffprobe format/streams for a media file.
+
+    Args:
+        path: Video or audio file
+        timeout: ffprobe timeout on a cache miss
+        use_cache: False forces a fresh probe (the result is still stored)
+
+    Returns:
+        {'format': {...}, 'streams': [...]}, or None if the file is missing
+        or ffprobe fails. Callers must not mutate the returned dict.
+    """
+    key = _stat_key(path)
+    if key is None:
+        return None
+    use_cache = use_cache and CACHE_ENABLED
+
+    if use_cache:
+        with _lock:
+            data = _lru.get(key)
+            if data is not None:
+                _lru.move_to_end(key)
+                _counters['memory_hits'] += 1
+                return data
+            try:
+                row = _get_conn().execute(
+                    'SELECT data FROM media_probes WHERE path = ? AND size = ? AND mtime_ns = ? AND version = ?',
+                    (*key, CACHE_VERSION)
+                ).fetchone()
+                if row:
+                    data = json.loads(row[0])
+                    _remember(key, data)
+                    _counters['disk_hits'] += 1
+                    return data
+            except (sqlite3.Error, json.JSONDecodeError) as e:
+                print(f"[MediaProbe] ⚠ Erro ao ler cache: {e}")
+
+    data = _run_ffprobe(key[0], timeout)
+    with _lock:
+        if data is None:
+            _counters['failures'] += 1
+            return None
+        _counters['probes'] += 1
+        if not CACHE_ENABLED:
+            return data
+        _remember(key, data)
+        try:
+            conn = _get_conn()
+            # Older versions of the same file are dead rows
+            conn.execute('DELETE FROM media_probes WHERE path = ?', (key[0],))
+            conn.execute(
+                'INSERT OR REPLACE INTO media_probes (path, size, mtime_ns, version, data, probed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (*key, CACHE_VERSION, json.dumps(data), time.time())
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"[MediaProbe] ⚠ Erro ao gravar cache: {e}")
+    return data
+
+
+def first_stream(data: Optional[Dict[str, Any]], codec_type: str) -> Optional[Dict[str, Any]]:
+    """First stream of a type ('video' / 'audio') in a probe() result."""
+    for stream in (data or {}).get('streams') or []:
+        if stream.get('codec_type') == codec_type:
+            return stream
+    return None
+
+
+def get_duration(path: str, timeout: int = 30) -> float:
+    """Container duration in seconds (first stream's duration as fallback), 0.0 on error."""
+    data = probe(path, timeout=timeout)
+    if not data:
+        return 0.0
+    duration = (data.get('format') or {}).get('duration')
+    if not duration:
+        streams = data.get('streams') or []
+        duration = streams[0].get('duration') if streams else None
+    try:
+        return float(duration or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def has_audio(path: str) -> Optional[bool]:
+    """Whether the file has an audio stream (None when it cannot be probed)."""
+    data = probe(path)
+    if data is None:
+        return None
+    return first_stream(data, 'audio') is not None
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Counters since start + rows on disk."""
+    stats: Dict[str, Any] = dict(_counters)
+    stats['enabled'] = CACHE_ENABLED
+    stats['lru_entries'] = len(_lru)
+    stats['lru_size'] = LRU_SIZE
+    try:
+        with _lock:
+            stats['entries'] = _get_conn().execute('SELECT COUNT(*) FROM media_probes').fetchone()[0]
+    except sqlite3.Error:
+        stats['entries'] = None
+    return stats
@@ -0,0 +1,214 @@
+"""
+Prompt context - relevance windows instead of whole-half transcriptions.
+
+analyze_with_kakttus, detect_events_with_gpt and _analyze_events_with_ollama
+used to paste the whole transcription of a half (or its first N chars) into
+the prompt. build_relevance_context() keeps only the lines around the local
+keyword candidates (event_detector.find_all_candidates) and the sliding-window
+goal detections, with their SRT timestamps, inside a token budget:
+
+1. Each candidate / goal becomes a window of lines (+ padding)
+2. Windows are ranked (goals first, then by evidence) and added until the
+   budget is spent; overlapping/adjacent windows are merged
+3. The kept windows are rendered in time order as SRT blocks (same format
+   the prompts already explain), separated by "[...]"
+
+Token counts are estimated (~4 chars per token). Prompt size and response
+time per call are kept in a small in-process history (get_prompt_stats).
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from typing import Optional, List, Dict, Any
+
+from transcript import Transcript, get_transcript
+
+CHARS_PER_TOKEN = 4
+ENABLED = os.environ.get('PROMPT_COMPRESSION_ENABLED', 'true').lower() == 'true'
+WINDOW_PADDING = 4  # lines before/after each candidate window
+GOAL_PADDING = 8    # goals get more context (attribution, replays)
+
+# Token budgets per target (local 7B models have small context windows)
+TOKEN_BUDGETS = {
+    'ollama': int(os.environ.get('PROMPT_TOKEN_BUDGET_OLLAMA', '6000') or 6000),
+    'kakttus': int(os.environ.get('PROMPT_TOKEN_BUDGET_KAKTTUS', '12000') or 12000),
+    'cloud': int(os.environ.get('PROMPT_TOKEN_BUDGET_CLOUD', '16000') or 16000),
+}
+
+_stats = deque(maxlen=50)
+_stats_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text or '') + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _render_line(transcript: Transcript, index: int) -> str:
+    if transcript.is_srt:
+        from ai_services import _format_srt_time
+        block = transcript.blocks[index]
+        return f"{block[0]}\n{_format_srt_time(transcript.starts[index])} --> {_format_srt_time(transcript.ends[index])}\n{block[5]}\n"
+    return transcript.lines[index]
+
+
+def _collect_windows(transcript: Transcript, home_team: str, away_team: str, half: str, segment_start_minute: int) -> List[Dict[str, Any]]:
+    """Candidate windows: {'start', 'end', 'rank'} in line indices (end inclusive)."""
+    from event_detector import find_all_candidates
+
+    last = len(transcript.lines) - 1
+    windows = []
+
+    for event_type, candidates in find_all_candidates(transcript, home_team, away_team).items():
+        for cand in candidates:
+            windows.append({
+                'start': max(0, cand['start_line'] - WINDOW_PADDING),
+                'end': min(last, cand['end_line'] + WINDOW_PADDING),
+                'rank': (1 if event_type == 'goal' else 0, cand.get('evidence_count', 0))
+            })
+
+    if transcript.is_srt and transcript.blocks:
+        from ai_services import detect_goals_by_sliding_window
+        goals = detect_goals_by_sliding_window(
+            srt_blocks=transcript.blocks,
+            home_team=home_team,
+            away_team=away_team,
+            segment_start_minute=segment_start_minute,
+            half=half,
+            transcript=transcript
+        )
+        for goal in goals:
+            index = goal.get('block_index', 0)
+            windows.append({
+                'start': max(0, index - GOAL_PADDING),
+                'end': min(last, index + GOAL_PADDING),
+                'rank': (2, goal.get('goal_mentions', 0) or 0)
+            })
+
+    return windows
+
+
+def build_relevance_context(
+    transcription: str,
+    home_team: str,
+    away_team: str,
+    token_budget: int,
+    half: str = 'first',
+    segment_start_minute: int = 0,
+    transcript: Optional[Transcript] = None
+) -> Dict[str, Any]:
+    """
+    Compress a half's transcription to the windows around likely events.
+
+    Args:
+        transcription: SRT (preferred, timestamps are kept) or plain text
+        home_team / away_team: Team names (candidate team hints)
+        token_budget: Max estimated tokens of the returned text
+        half: 'first' or 'second' (goal detector attribution)
+        segment_start_minute: Game minute offset for the goal detector
+        transcript: Already parsed Transcript (optional)
+
+    Returns:
+        Dict with 'text' (what to put in the prompt), 'compressed',
+        'original_tokens', 'prompt_tokens', 'windows', 'lines_kept', 'lines_total'
+    """
+    transcription = transcription or ''
+    original_tokens = estimate_tokens(transcription)
+    result = {
+        'text': transcription,
+        'compressed': False,
+        'original_tokens': original_tokens,
+        'prompt_tokens': original_tokens,
+        'windows': 0,
+        'lines_kept': 0,
+        'lines_total': 0,
+    }
+    if not ENABLED or original_tokens <= token_budget:
+        return result
+
+    transcript = transcript or get_transcript(transcription)
+    lines_total = len(transcript.lines)
+    result['lines_total'] = lines_total
+    if lines_total == 0:
+        return result
+
+    try:
+        windows = _collect_windows(transcript, home_team, away_team, half, segment_start_minute)
+    except Exception as e:
+        print(f"[PromptContext] ⚠ Erro ao buscar candidatos: {e}")
+        windows = []
+    if not windows:
+        print("[PromptContext] ⚠ Nenhum candidato local, usando transcrição sem compressão")
+        return result
+
+    line_tokens = [estimate_tokens(_render_line(transcript, i)) + 1 for i in range(lines_total)]
+    keep = [False] * lines_total
+    spent = 0
+    used_windows = 0
+    for window in sorted(windows, key=lambda w: w['rank'], reverse=True):
+        new_lines = [i for i in range(window['start'], window['end'] + 1) if not keep[i]]
+        cost = sum(line_tokens[i] for i in new_lines)
+        if spent + cost > token_budget:
+            continue
+        for i in new_lines:
+            keep[i] = True
+        spent += cost
+        used_windows += 1
+
+    if not used_windows:
+        return result
+
+    parts = []
+    previous = -2
+    merged = 0
+    for i in range(lines_total):
+        if not keep[i]:
+            continue
+        if i != previous + 1:
+            if parts:
+                parts.append('[...]\n' if transcript.is_srt else '[...]')
+            merged += 1
+        parts.append(_render_line(transcript, i))
+        previous = i
+    text = '\n'.join(parts)
+
+    result.update({
+        'text': text,
+        'compressed': True,
+        'prompt_tokens': estimate_tokens(text),
+        'windows': merged,
+        'lines_kept': sum(keep),
+    })
+    print(
+        f"[PromptContext] ✂️ {result['original_tokens']} → {result['prompt_tokens']} tokens "
+        f"({merged} janelas, {result['lines_kept']}/{lines_total} linhas, orçamento {token_budget})"
+    )
+    return result
+
+
+def record_prompt_stats(label: str, half: str, context: Dict[str, Any], started: float, success: bool = True) -> Dict[str, Any]:
+    """Store prompt size + response time of one call (and return the entry)."""
+    entry = {
+        'label': label,
+        'half': half,
+        'compressed': context.get('compressed', False),
+        'original_tokens': context.get('original_tokens'),
+        'prompt_tokens': context.get('prompt_tokens'),
+        'response_seconds': round(time.time() - started, 2),
+        'success': success,
+        'at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with _stats_lock:
+        _stats.append(entry)
+    print(
+        f"[PromptContext] 📊 {label} ({half}): {entry['prompt_tokens']} tokens de prompt "
+        f"(original {entry['original_tokens']}), resposta em {entry['response_seconds']}s"
+    )
+    return entry
+
+
+def get_prompt_stats() -> List[Dict[str, Any]]:
+    """Recent prompt size / response time entries (newest last)."""
+    with _stats_lock:
+        return list(_stats)
@@ -0,0 +1,213 @@
+"""
+Provider health - circuit breakers and latency stats for AI providers.
+
+call_ai used to try every provider in priority order on every request, so a
+dead provider cost its full timeout (300s for Ollama) each time before the
+fallback ran. Each provider now has a breaker:
+
+- closed:    calls go through; outcomes are recorded
+- open:      provider is skipped immediately until the cooldown expires
+- half_open: after the cooldown a single probe call is let through;
+             success closes the breaker, failure re-opens it with a
+             doubled cooldown (up to BREAKER_MAX_OPEN_SECONDS)
+
+A breaker opens after BREAKER_FAILURE_THRESHOLD consecutive failures, or when
+at least half of the last BREAKER_WINDOW calls failed or were slow (slower
+than the provider's slow-call threshold). Latency percentiles of successful
+calls are kept for /api/ai/priorities and for hedged requests.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from typing import Optional, Dict, Any
+
+FAILURE_THRESHOLD = int(os.environ.get('BREAKER_FAILURE_THRESHOLD', '3') or 3)
+WINDOW = int(os.environ.get('BREAKER_WINDOW', '20') or 20)
+MIN_CALLS_FOR_RATE = 5
+FAILURE_RATE_THRESHOLD = 0.5
+OPEN_SECONDS = float(os.environ.get('BREAKER_OPEN_SECONDS', '30') or 30)
+MAX_OPEN_SECONDS = float(os.environ.get('BREAKER_MAX_OPEN_SECONDS', '600') or 600)
+LATENCY_WINDOW = 50
+
+# Successful calls slower than this count as "slow" towards the failure rate
+SLOW_CALL_SECONDS = {
+    'ollama': 240.0,
+    'lovable': 90.0,
+    'gemini': 90.0,
+    'openai': 90.0,
+}
+
+
+def _percentile(sorted_values, q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class CircuitBreaker:
+    """Breaker state + recent outcomes/latencies for one provider."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.outcomes = deque(maxlen=WINDOW)          # True = ok, False = failed/slow
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # seconds, successful calls
+        self.open_seconds = OPEN_SECONDS
+        self.opened_until = 0.0
+        self.probe_in_flight = False
+        self.total_calls = 0
+        self.total_failures = 0
+        self.times_opened = 0
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a call may be made now (may move open -> half_open)."""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                if time.time() < self.opened_until:
+                    return False
+                self.state = 'half_open'
+                self.probe_in_flight = False
+                print(f"[Breaker] 🟡 {self.provider}: half-open, enviando chamada de teste")
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+            return True
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.total_calls += 1
+            self.latencies.append(latency)
+            slow = latency > SLOW_CALL_SECONDS.get(self.provider, 120.0)
+            self.outcomes.append(not slow)
+            self.consecutive_failures = 0
+            if self.state == 'half_open':
+                print(f"[Breaker] 🟢 {self.provider}: chamada de teste OK ({latency:.1f}s), circuito fechado")
+                self._close()
+            elif slow:
+                self._maybe_open(f"chamadas lentas ({latency:.1f}s)")
+
+    def record_failure(self, latency: float, error: Any = None):
+        with self._lock:
+            self.total_calls += 1
+            self.total_failures += 1
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            self.last_error = str(error)[:200] if error else None
+            self.last_failure_at = time.time()
+            if self.state == 'half_open':
+                self._open(min(self.open_seconds * 2, MAX_OPEN_SECONDS), 'chamada de teste falhou')
+            else:
+                self._maybe_open(self.last_error or 'falha')
+
+    def release(self):
+        """End a call without an outcome (e.g. abandoned stream): frees the half-open probe."""
+        with self._lock:
+            if self.state == 'half_open':
+                self.probe_in_flight = False
+
+    # -- caller holds _lock ------------------------------------------------
+    def _failure_rate(self) -> float:
+        if len(self.outcomes) < MIN_CALLS_FOR_RATE:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def _maybe_open(self, reason: str):
+        if self.state != 'closed':
+            return
+        if self.consecutive_failures >= FAILURE_THRESHOLD or self._failure_rate() >= FAILURE_RATE_THRESHOLD:
+            self._open(OPEN_SECONDS, reason)
+
+    def _open(self, seconds: float, reason: str):
+        self.state = 'open'
+        self.open_seconds = seconds
+        self.opened_until = time.time() + seconds
+        self.probe_in_flight = False
+        self.times_opened += 1
+        print(f"[Breaker] 🔴 {self.provider}: circuito aberto por {seconds:.0f}s ({reason})")
+
+    def _close(self):
+        self.state = 'closed'
+        self.open_seconds = OPEN_SECONDS
+        self.probe_in_flight = False
+        self.consecutive_failures = 0
+        self.outcomes.clear()
+
+    # ----------------------------------------------------------------------
+    def latency_percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            return _percentile(sorted(self.latencies), q)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            p50 = _percentile(latencies, 0.5)
+            p95 = _percentile(latencies, 0.95)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'failure_rate': round(self._failure_rate(), 3),
+                'recent_calls': len(self.outcomes),
+                'total_calls': self.total_calls,
+                'total_failures': self.total_failures,
+                'times_opened': self.times_opened,
+                'retry_in_seconds': round(max(0.0, self.opened_until - time.time()), 1) if self.state == 'open' else 0,
+                'latency_p50': round(p50, 3) if p50 is not None else None,
+                'latency_p95': round(p95, 3) if p95 is not None else None,
+                'latency_samples': len(latencies),
+                'last_error': self.last_error,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(provider, CircuitBreaker(provider))
+    return breaker
+
+
+def allow(provider: str) -> bool:
+    return get_breaker(provider).allow()
+
+
+def record_success(provider: str, latency: float):
+    get_breaker(provider).record_success(latency)
+
+
+def record_failure(provider: str, latency: float, error: Any = None):
+    get_breaker(provider).record_failure(latency, error)
+
+
+def release(provider: str):
+    get_breaker(provider).release()
+
+
+def latency_percentile(provider: str, q: float) -> Optional[float]:
+    return get_breaker(provider).latency_percentile(q)
+
+
+def get_health_snapshot() -> Dict[str, Dict[str, Any]]:
+    """State and latency stats of every provider seen so far."""
+    return {name: breaker.snapshot() for name, breaker in list(_breakers.items())}
+
+
+def reset_breakers(provider: str = None):
+    """Close one (or every) breaker, e.g. after fixing a provider's settings."""
+    with _breakers_lock:
+        if provider:
+            _breakers.pop(provider, None)
+        else:
+            _breakers.clear()
@@ -11,7 +11,7 @@ load_dotenv()
 SERVER_VERSION = "2.1.1"
 SERVER_BUILD_DATE = "2026-01-13"
 
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, request, jsonify, send_file, send_from_directory, Response
 from flask_cors import CORS
 import subprocess
 import os
@@ -54,10 +54,16 @@ def parse_iso_datetime(date_string: str) -> Optional[datetime]:
 # ============================================================================
 # All data is stored in SQLite, all AI is local (Whisper + Ollama)
 
+# Worker processes started with spawn (media_pool, parallel Whisper) re-import
+# this file as __mp_main__: they only need the functions, not the server
+# initialization below (database, migrations, API keys)
+IS_WORKER_PROCESS = __name__ == '__mp_main__'
+
 # Log de verificação de configuração na inicialização
-print(f"[STARTUP] Arena Play Server v{SERVER_VERSION} ({SERVER_BUILD_DATE})")
-print(f"[STARTUP] 🏠 Modo 100% LOCAL ativado - Sem dependências de nuvem")
-print(f"[STARTUP] Arquivo .env existe: {'✓' if os.path.exists('.env') else '✗'}")
+if not IS_WORKER_PROCESS:
+    print(f"[STARTUP] Arena Play Server v{SERVER_VERSION} ({SERVER_BUILD_DATE})")
+    print(f"[STARTUP] 🏠 Modo 100% LOCAL ativado - Sem dependências de nuvem")
+    print(f"[STARTUP] Arquivo .env existe: {'✓' if os.path.exists('.env') else '✗'}")
 
 # Import local modules
 from database import init_db, get_session, get_db_session, Session
@@ -77,6 +83,17 @@ from storage import (
     get_video_subfolder_path, save_optimized_video, get_match_storage_path
 )
 import ai_services
+import whisper_pool
+import llm_cache
+import provider_health
+import prompt_context
+import validation_pool
+import clip_cutter
+import media_index
+import media_probe
+import media_pool
+from incremental_transcript import IncrementalTranscript
+from event_dedup import sweep_deduplicate, game_time_seconds
 import threading
 import json as json_module
 import re
@@ -85,6 +102,20 @@ import re
 download_jobs = {}  # Para jobs de download por URL
 conversion_jobs = {}
 
+# Cancelamento de análises em andamento, por partida (acionado por cancel_async_job)
+analysis_cancel_events = {}
+analysis_cancel_lock = threading.Lock()
+
+
+def get_analysis_cancel_event(match_id: str) -> threading.Event:
+    """Shared cancel flag for the analyses running on a match (a flag already set is replaced)."""
+    with analysis_cancel_lock:
+        event = analysis_cancel_events.get(match_id)
+        if event is None or event.is_set():
+            event = threading.Event()
+            analysis_cancel_events[match_id] = event
+        return event
+
 app = Flask(__name__)
 CORS(app)
 
@@ -223,6 +254,36 @@ def health_check():
     return jsonify(response_data)
 
 
+@app.route('/api/whisper/models', methods=['GET'])
+def get_whisper_models():
+    """Return loaded local Whisper models (load time, resident size) and warm-up status."""
+    return jsonify({
+        'success': True,
+        **ai_services.get_whisper_model_stats()
+    })
+
+
+@app.route('/api/ai/llm-cache', methods=['GET', 'DELETE'])
+def llm_cache_endpoint():
+    """GET: LLM response cache hit/miss counters and size. DELETE: clear the cache."""
+    if request.method == 'DELETE':
+        removed = llm_cache.clear_llm_cache()
+        return jsonify({'success': True, 'removed': removed})
+    return jsonify({'success': True, **llm_cache.get_cache_stats()})
+
+
+@app.route('/api/media/probe-cache', methods=['GET'])
+def media_probe_cache_endpoint():
+    """Media probe cache counters (memory/disk hits, ffprobe runs) and size."""
+    return jsonify({'success': True, **media_probe.get_cache_stats()})
+
+
+@app.route('/api/ai/prompt-stats', methods=['GET'])
+def get_prompt_stats():
+    """Recent analysis prompts: original vs sent tokens and response time per half."""
+    return jsonify({'success': True, 'calls': prompt_context.get_prompt_stats()})
+
+
 @app.route('/api/ai/priorities', methods=['GET', 'OPTIONS'])
 def get_ai_priorities():
     """Return configured AI provider priorities for debugging."""
@@ -255,7 +316,9 @@ def get_ai_priorities():
             'gemini': bool(ai_services.GOOGLE_API_KEY) and ai_services.GEMINI_ENABLED,
             'openai': bool(ai_services.OPENAI_API_KEY) and ai_services.OPENAI_ENABLED,
             'ollama': ai_services.OLLAMA_ENABLED
-        }
+        },
+        # Circuit breaker state + latency percentiles per provider (call_ai routing)
+        'health': provider_health.get_health_snapshot()
     })
 
 
@@ -268,6 +331,8 @@ def reload_ai_settings():
     
     # Re-load API keys from local database
     load_api_keys_from_db()
+    # New keys/URLs: give every provider a fresh circuit breaker
+    provider_health.reset_breakers()
     
     local_settings = get_local_settings()
     priority_order = ai_services.get_ai_priority_order(local_settings)
@@ -295,12 +360,13 @@ def handle_options(path=''):
     return response
 
 
-# Initialize database
-init_db()
+if not IS_WORKER_PROCESS:
+    # Initialize database
+    init_db()
 
-# Run automatic migrations
-from migrate_db import run_migrations
-run_migrations()
+    # Run automatic migrations
+    from migrate_db import run_migrations
+    run_migrations()
 
 
 def _normalize_setting_key(key: str) -> str:
@@ -333,6 +399,15 @@ def _bool_from_setting(value: str, default: bool = False) -> bool:
     return default
 
 
+def _int_from_setting(value: str, default: int = 0) -> int:
+    if value is None or str(value).strip() == '':
+        return default
+    try:
+        return int(str(value).strip())
+    except (ValueError, TypeError):
+        return default
+
+
 def get_local_settings() -> Dict[str, str]:
     """Get settings from local SQLite database (100% local mode)."""
     session = get_session()
@@ -372,6 +447,10 @@ def load_api_keys_from_db():
         # Local Whisper settings (FREE transcription)
         local_whisper_enabled = _bool_from_setting(values.get('local_whisper_enabled'), True)  # FREE by default!
         local_whisper_model = values.get('local_whisper_model') or 'base'
+        local_whisper_workers = _int_from_setting(values.get('local_whisper_workers'), ai_services.LOCAL_WHISPER_WORKERS)
+        local_whisper_cpu_threads = _int_from_setting(values.get('local_whisper_cpu_threads'), ai_services.LOCAL_WHISPER_CPU_THREADS)
+        local_whisper_mode = values.get('local_whisper_mode') or ai_services.LOCAL_WHISPER_MODE
+        local_whisper_batch_size = _int_from_setting(values.get('local_whisper_batch_size'), ai_services.LOCAL_WHISPER_BATCH_SIZE)
 
         # Prefer DB values, fallback to environment variables if DB is missing
         # CRITICAL: Treat empty strings as None to ensure proper fallback
@@ -424,12 +503,28 @@ def load_api_keys_from_db():
             openai_enabled=openai_enabled,
             elevenlabs_enabled=elevenlabs_enabled,
             local_whisper_enabled=local_whisper_enabled,
-            local_whisper_model=local_whisper_model
+            local_whisper_model=local_whisper_model,
+            local_whisper_workers=local_whisper_workers,
+            local_whisper_cpu_threads=local_whisper_cpu_threads,
+            local_whisper_mode=local_whisper_mode,
+            local_whisper_batch_size=local_whisper_batch_size
+        )
+        whisper_pool.set_pool_limits(
+            max_models=_int_from_setting(values.get('local_whisper_max_models'), whisper_pool.MAX_MODELS),
+            memory_budget_mb=_int_from_setting(values.get('local_whisper_memory_budget_mb'), whisper_pool.MEMORY_BUDGET_MB)
+        )
+        llm_cache.set_cache_config(
+            enabled=_bool_from_setting(values.get('llm_cache_enabled'), llm_cache.CACHE_ENABLED),
+            ttl_hours=_int_from_setting(values.get('llm_cache_ttl_hours'), llm_cache.TTL_HOURS),
+            max_mb=_int_from_setting(values.get('llm_cache_max_mb'), llm_cache.MAX_MB)
         )
         
         # Log Local Whisper status
         if local_whisper_enabled:
-            keys_loaded.append(f'LOCAL_WHISPER ({local_whisper_model})')
+            if local_whisper_workers > 1:
+                keys_loaded.append(f'LOCAL_WHISPER ({local_whisper_model}, {local_whisper_workers} workers)')
+            else:
+                keys_loaded.append(f'LOCAL_WHISPER ({local_whisper_model})')
         
         # Log AI priority order
         priority_order = ai_services.get_ai_priority_order(values)
@@ -458,7 +553,8 @@ def load_api_keys_from_db():
 
 
 # Load API keys from database
-load_api_keys_from_db()
+if not IS_WORKER_PROCESS:
+    load_api_keys_from_db()
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -604,24 +700,14 @@ def download_video(url: str, output_path: str) -> bool:
         return False
 
 
-def extract_clip(input_path: str, output_path: str, start_seconds: float, duration: float) -> bool:
-    """Extrai um clip do vídeo usando FFmpeg."""
+def extract_clip(input_path: str, output_path: str, start_seconds: float, duration: float,
+                 smart: bool = None) -> bool:
+    """
+    Extrai um clip do vídeo usando FFmpeg (smart cut quando habilitado).
+    smart=False quando o clip é re-codificado depois (vinhetas via normalize_video).
+    """
     try:
-        cmd = [
-            'ffmpeg', '-y',
-            '-ss', str(start_seconds),
-            '-i', input_path,
-            '-t', str(duration),
-            '-c:v', 'libx264',
-            '-c:a', 'aac',
-            '-preset', 'fast',
-            '-crf', '23',
-            '-movflags', '+faststart',
-            output_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        return result.returncode == 0 and os.path.exists(output_path)
+        return clip_cutter.cut_clip(input_path, output_path, start_seconds, duration, timeout=120, smart=smart)
     except Exception as e:
         print(f"Erro ao extrair clip: {e}")
         return False
@@ -668,20 +754,14 @@ def split_video(input_path: str, num_parts: int, output_dir: str) -> list:
         [{'path': str, 'start': float, 'end': float, 'duration': float, 'part': int}]
     """
     try:
-        import json as json_lib
-        
-        # Get video duration
-        probe_cmd = [
-            'ffprobe', '-v', 'quiet', '-print_format', 'json',
-            '-show_format', input_path
-        ]
-        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=30)
-        if probe_result.returncode != 0:
-            print(f"[SPLIT] Erro ao obter duração do vídeo")
-            return []
-        
-        probe_data = json_lib.loads(probe_result.stdout)
-        total_duration = float(probe_data.get('format', {}).get('duration', 0))
+        # Get video duration (índice de keyframes; ffprobe direto se não houver)
+        index = media_index.get_index(input_path)
+        total_duration = index.duration if index else 0.0
+        if total_duration <= 0:
+            if media_probe.probe(input_path) is None:
+                print(f"[SPLIT] Erro ao obter duração do vídeo")
+                return []
+            total_duration = media_probe.get_duration(input_path)
         
         if total_duration <= 0:
             print(f"[SPLIT] Duração inválida: {total_duration}")
@@ -690,20 +770,31 @@ def split_video(input_path: str, num_parts: int, output_dir: str) -> list:
         part_duration = total_duration / num_parts
         parts = []
         
+        # Stream copy começa no keyframe anterior ao -ss: alinhar os cortes aos keyframes
+        # para que 'start' de cada parte seja o tempo real e as partes não se sobreponham
+        boundaries = [i * part_duration for i in range(num_parts)]
+        if index and len(index):
+            boundaries = index.aligned_boundaries(boundaries, max_shift=part_duration / 2)
+        num_parts = len(boundaries)
+        boundaries.append(total_duration)
+        
         print(f"[SPLIT] Dividindo vídeo de {total_duration:.1f}s em {num_parts} partes de ~{part_duration:.1f}s (stream copy)")
         
         for i in range(num_parts):
-            start_time = i * part_duration
-            end_time = min((i + 1) * part_duration, total_duration)
+            start_time = boundaries[i]
+            end_time = min(boundaries[i + 1], total_duration)
+            part_duration = end_time - start_time
             part_filename = f"part_{i+1}_of_{num_parts}.mp4"
             part_path = os.path.join(output_dir, part_filename)
+            # Seek half a frame past the keyframe so rounding cannot start at the previous GOP
+            seek_time = index.copy_seek(start_time) if index and len(index) else start_time
             
             # Use stream copy (MUITO mais rápido - sem re-codificação)
             # -c copy copia os streams sem processar
             # -avoid_negative_ts make_zero corrige timestamps negativos
             cmd = [
                 'ffmpeg', '-y',
-                '-ss', str(start_time),
+                '-ss', f"{seek_time:.6f}",
                 '-i', input_path,
                 '-t', str(part_duration),
                 '-c', 'copy',  # Stream copy - sem re-codificação!
@@ -786,31 +877,17 @@ def get_video_info(file_path: str) -> dict:
     """
     Retorna metadados completos de um vídeo via ffprobe.
     """
-    import json as json_lib
-    
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
     
     try:
-        cmd = [
-            'ffprobe', '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_format', '-show_streams',
-            file_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        
-        if result.returncode != 0:
-            raise Exception(f"ffprobe falhou: {result.stderr}")
+        data = media_probe.probe(file_path)
         
-        data = json_lib.loads(result.stdout)
+        if data is None:
+            raise Exception("ffprobe falhou")
         
         # Find video stream
-        video_stream = None
-        for stream in data.get('streams', []):
-            if stream.get('codec_type') == 'video':
-                video_stream = stream
-                break
+        video_stream = media_probe.first_stream(data, 'video')
         
         if not video_stream:
             raise Exception("Nenhum stream de vídeo encontrado")
@@ -935,15 +1012,7 @@ def convert_to_480p(input_path: str, output_path: str, job_id: str = None, crf:
             }
         
         # Get video duration for progress calculation
-        duration_cmd = [
-            'ffprobe', '-v', 'quiet', '-print_format', 'json',
-            '-show_format', input_path
-        ]
-        duration_result = subprocess.run(duration_cmd, capture_output=True, text=True, timeout=30)
-        total_duration = 0
-        if duration_result.returncode == 0:
-            probe_data = json_module.loads(duration_result.stdout)
-            total_duration = float(probe_data.get('format', {}).get('duration', 0))
+        total_duration = media_probe.get_duration(input_path)
         
         # FFmpeg command for 480p conversion
         cmd = [
@@ -1258,13 +1327,7 @@ def upload_to_match(match_id: str, subfolder: str):
                     file_path = get_match_storage_path(match_id) / subfolder / result['filename']
                     duration_seconds = None
                     try:
-                        probe = subprocess.run([
-                            'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                            '-show_format', str(file_path)
-                        ], capture_output=True, text=True, timeout=30)
-                        if probe.returncode == 0:
-                            probe_data = json_module.loads(probe.stdout)
-                            duration_seconds = int(float(probe_data.get('format', {}).get('duration', 0)))
+                        duration_seconds = int(media_probe.get_duration(str(file_path))) or None
                     except Exception as e:
                         print(f"[upload] Aviso ao detectar duração: {e}")
                     
@@ -1348,13 +1411,7 @@ def _sync_videos_for_match(match_id: str) -> dict:
                     # Detectar duração via ffprobe
                     duration_seconds = None
                     try:
-                        probe = subprocess.run([
-                            'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                            '-show_format', str(file_path)
-                        ], capture_output=True, text=True, timeout=30)
-                        if probe.returncode == 0:
-                            probe_data = json_module.loads(probe.stdout)
-                            duration_seconds = int(float(probe_data.get('format', {}).get('duration', 0)))
+                        duration_seconds = int(media_probe.get_duration(str(file_path))) or None
                     except Exception:
                         pass
                     
@@ -1423,13 +1480,7 @@ def sync_videos_from_storage(match_id: str):
                     # Detectar duração
                     duration_seconds = None
                     try:
-                        probe = subprocess.run([
-                            'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                            '-show_format', str(file_path)
-                        ], capture_output=True, text=True, timeout=30)
-                        if probe.returncode == 0:
-                            probe_data = json_module.loads(probe.stdout)
-                            duration_seconds = int(float(probe_data.get('format', {}).get('duration', 0)))
+                        duration_seconds = int(media_probe.get_duration(str(file_path))) or None
                     except Exception:
                         pass
                     
@@ -1519,15 +1570,7 @@ def link_local_file():
     # Detect video duration using ffprobe
     duration_seconds = None
     try:
-        result = subprocess.run([
-            'ffprobe', '-v', 'quiet', '-print_format', 'json',
-            '-show_format', str(file_path)
-        ], capture_output=True, text=True, timeout=10)
-        
-        if result.returncode == 0:
-            import json
-            probe_data = json.loads(result.stdout)
-            duration_seconds = int(float(probe_data.get('format', {}).get('duration', 0)))
+        duration_seconds = int(media_probe.get_duration(str(file_path), timeout=10)) or None
     except Exception as e:
         print(f"[link-local] Não foi possível detectar duração: {e}")
     
@@ -3199,6 +3242,7 @@ def regenerate_match_thumbnails(match_id):
         generated = 0
         errors = 0
         results = []
+        jobs = []
         
         for event in events:
             try:
@@ -3215,32 +3259,13 @@ def regenerate_match_thumbnails(match_id):
                         clip_path = get_file_path(local_match_id, subfolder, filename)
                         
                         if clip_path and os.path.exists(clip_path):
-                            thumb_url = generate_thumbnail_from_clip(
-                                clip_path=clip_path,
-                                match_id=match_id,
-                                event_id=event.id,
-                                event_type=event.event_type,
-                                minute=event.minute or 0
-                            )
-                            
-                            if thumb_url:
-                                generated += 1
-                                results.append({
-                                    'event_id': event.id,
-                                    'event_type': event.event_type,
-                                    'minute': event.minute,
-                                    'thumbnail_url': thumb_url,
-                                    'status': 'success'
-                                })
-                            else:
-                                errors += 1
-                                results.append({
-                                    'event_id': event.id,
-                                    'event_type': event.event_type,
-                                    'minute': event.minute,
-                                    'status': 'failed',
-                                    'error': 'FFmpeg failed to extract frame'
-                                })
+                            # Renderizado depois, em paralelo (media_pool)
+                            spec = _thumbnail_spec(match_id, event.id, event.event_type, event.minute or 0)
+                            jobs.append((event, spec, len(results), {
+                                'clip': str(clip_path),
+                                **{key: spec[key] for key in ('path', 'label', 'color', 'minute')}
+                            }))
+                            results.append(None)
                         else:
                             errors += 1
                             results.append({
@@ -3273,6 +3298,35 @@ def regenerate_match_thumbnails(match_id):
                     'error': str(e)
                 })
         
+        rendered = media_pool.map_jobs(clip_cutter.render_thumbnail_job, [job for *_, job in jobs], label='thumbnails')
+        records = []
+        for (event, spec, slot, _), ok in zip(jobs, rendered):
+            if ok:
+                generated += 1
+                records.append({
+                    'event_id': event.id,
+                    'event_type': event.event_type,
+                    'image_url': spec['url'],
+                    'title': spec['title']
+                })
+                results[slot] = {
+                    'event_id': event.id,
+                    'event_type': event.event_type,
+                    'minute': event.minute,
+                    'thumbnail_url': spec['url'],
+                    'status': 'success'
+                }
+            else:
+                errors += 1
+                results[slot] = {
+                    'event_id': event.id,
+                    'event_type': event.event_type,
+                    'minute': event.minute,
+                    'status': 'failed',
+                    'error': 'FFmpeg failed to extract frame'
+                }
+        save_thumbnail_records(match_id, records)
+        
         print(f"[REGEN-THUMBNAILS] Concluído: {generated} geradas, {errors} erros")
         
         return jsonify({
@@ -3366,6 +3420,35 @@ def upsert_api_setting():
         elif key_lower == 'local_whisper_model':
             ai_services.set_api_keys(local_whisper_model=value)
             print(f"[Settings] 🆓 Local Whisper model: {value}")
+            # Warm up the new model now instead of on the next transcription
+            ai_services.preload_whisper_model_async(value)
+        elif key_lower == 'local_whisper_max_models':
+            whisper_pool.set_pool_limits(max_models=_int_from_setting(value, 1))
+            print(f"[Settings] 🆓 Local Whisper max_models: {value}")
+        elif key_lower == 'local_whisper_memory_budget_mb':
+            whisper_pool.set_pool_limits(memory_budget_mb=_int_from_setting(value, 1500))
+            print(f"[Settings] 🆓 Local Whisper memory_budget_mb: {value}")
+        elif key_lower == 'llm_cache_enabled':
+            llm_cache.set_cache_config(enabled=_bool_from_setting(value, True))
+            print(f"[Settings] ♻️ LLM cache enabled: {value}")
+        elif key_lower == 'llm_cache_ttl_hours':
+            llm_cache.set_cache_config(ttl_hours=_int_from_setting(value, 0))
+            print(f"[Settings] ♻️ LLM cache TTL (h): {value}")
+        elif key_lower == 'llm_cache_max_mb':
+            llm_cache.set_cache_config(max_mb=_int_from_setting(value, 0))
+            print(f"[Settings] ♻️ LLM cache max_mb: {value}")
+        elif key_lower == 'local_whisper_workers':
+            ai_services.set_api_keys(local_whisper_workers=_int_from_setting(value, 0))
+            print(f"[Settings] 🆓 Local Whisper workers: {value}")
+        elif key_lower == 'local_whisper_cpu_threads':
+            ai_services.set_api_keys(local_whisper_cpu_threads=_int_from_setting(value, 0))
+            print(f"[Settings] 🆓 Local Whisper cpu_threads: {value}")
+        elif key_lower == 'local_whisper_mode':
+            ai_services.set_api_keys(local_whisper_mode=value)
+            print(f"[Settings] 🆓 Local Whisper mode: {value}")
+        elif key_lower == 'local_whisper_batch_size':
+            ai_services.set_api_keys(local_whisper_batch_size=_int_from_setting(value, 16))
+            print(f"[Settings] 🆓 Local Whisper batch_size: {value}")
         
         session.commit()
         
@@ -3553,6 +3636,7 @@ def ai_status():
         'elevenlabs': elevenlabs_configured,
         'ollama': ollama_configured,
         'localWhisper': local_whisper_enabled,
+        'llmCache': llm_cache.get_cache_stats(),
         'anyConfigured': any_analysis,
         'anyTranscription': any_transcription,
         'anyAnalysis': any_analysis,
@@ -3587,6 +3671,8 @@ def ai_status():
                 'configured': local_whisper_enabled,
                 'enabled': local_whisper_enabled,
                 'model': local_whisper_model if local_whisper_enabled else None,
+                'workers': ai_services.LOCAL_WHISPER_WORKERS,
+                'mode': ai_services.LOCAL_WHISPER_MODE,
                 'gpuAvailable': gpu_available,
                 'free': True,
                 'installCommand': 'pip install faster-whisper==1.1.0' if not local_whisper_installed else None
@@ -3750,7 +3836,8 @@ def analyze_match():
                         home_team=home_team,
                         away_team=away_team,
                         scan_interval_seconds=30,
-                        frames_per_window=6
+                        frames_per_window=6,
+                        cancel_event=get_analysis_cancel_event(match_id)
                     )
                     
                     if vision_result['success']:
@@ -3767,7 +3854,7 @@ def analyze_match():
                         print(f"[ANALYZE-MATCH] ⚠ Análise visual falhou: {vision_result.get('error')}")
                         return jsonify({
                             'error': f"Análise visual falhou: {vision_result.get('error')}",
-                            'validation': 'vision_failed'
+                            'validation': 'cancelled' if vision_result.get('cancelled') else 'vision_failed'
                         }), 400
                 else:
                     print(f"[ANALYZE-MATCH] ⚠ Nenhum vídeo encontrado para análise visual")
@@ -4407,6 +4494,7 @@ def refine_event_clips(match_id: str):
         
         refinements = []
         events_refined = 0
+        jobs = []
         
         for event in events:
             # Find appropriate video
@@ -4450,20 +4538,39 @@ def refine_event_clips(match_id: str):
                 print(f"[REFINE] Video file not found: {video_url[:60]}...")
                 continue
             
-            # Get current videoSecond from metadata
-            metadata = event.event_metadata or {}
-            original_second = metadata.get('videoSecond', 0)
-            
-            print(f"[REFINE] Analyzing event {event.id}: {event.event_type} at ~{original_second}s")
-            
-            # Perform visual analysis
-            vision_result = ai_services.detect_goal_visual_cues(
-                video_path=video_path,
-                estimated_second=original_second,
+            jobs.append((event, {
+                'event_id': event.id,
+                'event_type': event.event_type,
+                'video_path': video_path,
+                'original_second': (event.event_metadata or {}).get('videoSecond', 0)
+            }))
+        
+        def analyze_event(job):
+            print(f"[REFINE] Analyzing event {job['event_id']}: {job['event_type']} at ~{job['original_second']}s")
+            return ai_services.detect_goal_visual_cues(
+                video_path=job['video_path'],
+                estimated_second=job['original_second'],
                 window_seconds=window_seconds,
                 home_team=home_team_name,
                 away_team=away_team_name
             )
+        
+        # Visual analysis runs in parallel (bounded per provider); DB updates stay here, in order
+        try:
+            vision_results = validation_pool.map_bounded(
+                analyze_event, [job for _, job in jobs], ai_services.get_vision_provider(),
+                cancel_event=get_analysis_cancel_event(match_id), label='refinamento visual'
+            )
+        except validation_pool.ValidationCancelled:
+            session.close()
+            return jsonify({'success': False, 'error': 'Refinamento cancelado', 'cancelled': True}), 409
+        
+        for (event, _), vision_result in zip(jobs, vision_results):
+            vision_result = vision_result or {'details': 'visual analysis failed'}
+            
+            # Get current videoSecond from metadata
+            metadata = event.event_metadata or {}
+            original_second = metadata.get('videoSecond', 0)
             
             refinement = {
                 'event_id': event.id,
@@ -4528,73 +4635,133 @@ def add_subtitles_to_clip(
     Adiciona tarja informativa com minuto, tipo e descrição usando FFmpeg drawtext.
     """
     try:
-        # Escapar caracteres especiais para FFmpeg
-        description_safe = event_description.replace("'", "\\'").replace(":", "\\:")
-        description_safe = description_safe[:80]  # Limitar tamanho
-        
-        # Texto da tarja superior: "12' | GOL"
-        type_label = event_type.upper().replace('_', ' ')
-        header_text = f"{event_minute}' | {type_label}"
-        if team_name:
-            header_text += f" - {team_name}"
-        
-        # Filtros drawtext para tarja superior e descrição inferior
-        filter_str = (
-            f"drawtext=text='{header_text}':"
-            f"fontsize=28:fontcolor=white:"
-            f"x=(w-text_w)/2:y=30:"
-            f"box=1:boxcolor=black@0.7:boxborderw=10,"
-            f"drawtext=text='{description_safe}':"
-            f"fontsize=20:fontcolor=white:"
-            f"x=(w-text_w)/2:y=h-50:"
-            f"box=1:boxcolor=black@0.7:boxborderw=8"
+        return clip_cutter.add_event_overlay(
+            input_path, output_path,
+            _subtitle_header(event_minute, event_type, team_name),
+            event_description
         )
-        
-        cmd = [
-            'ffmpeg', '-y', '-i', input_path,
-            '-vf', filter_str,
-            '-c:v', 'libx264', '-c:a', 'copy',
-            '-preset', 'fast', '-crf', '23',
-            output_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        
-        if result.returncode == 0:
-            print(f"[SUBTITLE] ✓ Legendas adicionadas: {output_path}")
-            return True
-        else:
-            print(f"[SUBTITLE] ✗ Erro FFmpeg: {result.stderr[:200]}")
-            return False
-            
     except Exception as e:
         print(f"[SUBTITLE] Erro: {e}")
         return False
 
 
+def _subtitle_header(event_minute: int, event_type: str, team_name: str = None) -> str:
+    """Texto da tarja superior: "12' | GOL - Time"."""
+    header_text = f"{event_minute}' | {event_type.upper().replace('_', ' ')}"
+    if team_name:
+        header_text += f" - {team_name}"
+    return header_text
+
+
 def get_video_duration_seconds(video_path: str) -> float:
-    """Get video duration in seconds using FFprobe."""
+    """Get video duration in seconds using FFprobe (memoized)."""
     try:
-        cmd = [
-            'ffprobe', '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            video_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode == 0 and result.stdout.strip():
-            return float(result.stdout.strip())
+        return media_probe.get_duration(video_path)
     except Exception as e:
         print(f"[CLIP] ⚠ Error getting video duration: {e}")
     return 0.0
 
 
+# Event type labels in Portuguese (thumbnail badge)
+THUMBNAIL_EVENT_LABELS = {
+    'goal': 'GOL',
+    'shot': 'CHUTE',
+    'shot_on_target': 'CHUTE NO GOL',
+    'foul': 'FALTA',
+    'corner': 'ESCANTEIO',
+    'offside': 'IMPEDIMENTO',
+    'yellow_card': 'CARTÃO AMARELO',
+    'red_card': 'CARTÃO VERMELHO',
+    'substitution': 'SUBSTITUIÇÃO',
+    'penalty': 'PÊNALTI',
+    'free_kick': 'TIRO LIVRE',
+    'save': 'DEFESA',
+    'clearance': 'CORTE',
+    'tackle': 'DESARME',
+    'pass': 'PASSE',
+    'cross': 'CRUZAMENTO',
+    'interception': 'INTERCEPTAÇÃO',
+}
+
+# Badge colors by event type (hex without #)
+THUMBNAIL_EVENT_COLORS = {
+    'goal': '10b981',        # Green
+    'shot': 'f59e0b',        # Orange
+    'shot_on_target': 'f59e0b',
+    'save': '3b82f6',        # Blue
+    'foul': 'ef4444',        # Red
+    'yellow_card': 'eab308', # Yellow
+    'red_card': 'dc2626',    # Dark red
+    'corner': '8b5cf6',      # Purple
+    'penalty': 'ec4899',     # Pink
+    'offside': '6366f1',     # Indigo
+}
+
+
+def _thumbnail_spec(match_id: str, event_id: str, event_type: str, minute: int) -> dict:
+    """Path, URL, badge label/color and title of an event thumbnail."""
+    thumb_filename = f"thumb_{minute:02d}min-{event_type}"
+    if event_id:
+        thumb_filename += f"-{event_id[:8]}"
+    thumb_filename += ".jpg"
+    event_label = THUMBNAIL_EVENT_LABELS.get(event_type, event_type.upper().replace('_', ' '))
+    return {
+        'path': str(get_subfolder_path(match_id, 'images') / thumb_filename),
+        'url': f"http://localhost:5000/api/storage/{match_id}/images/{thumb_filename}",
+        'label': event_label,
+        'color': THUMBNAIL_EVENT_COLORS.get(event_type, '10b981'),
+        'minute': minute,
+        'title': f"{event_label} - {minute}'",
+    }
+
+
+def save_thumbnail_records(match_id: str, records: list) -> int:
+    """
+    Insert/update Thumbnail rows for [{'event_id', 'event_type', 'image_url', 'title'}]
+    in one session and one commit. Returns the number of rows written.
+    """
+    records = [r for r in records if r.get('event_id')]
+    if not records:
+        return 0
+    session = get_session()
+    try:
+        existing = {
+            t.event_id: t for t in session.query(Thumbnail).filter(
+                Thumbnail.event_id.in_([r['event_id'] for r in records])
+            ).all()
+        }
+        for record in records:
+            thumbnail = existing.get(record['event_id'])
+            if thumbnail:
+                thumbnail.image_url = record['image_url']
+                thumbnail.event_type = record['event_type']
+                thumbnail.title = record['title']
+            else:
+                session.add(Thumbnail(
+                    match_id=match_id,
+                    event_id=record['event_id'],
+                    event_type=record['event_type'],
+                    image_url=record['image_url'],
+                    title=record['title']
+                ))
+        session.commit()
+        print(f"[THUMBNAIL] ✓ {len(records)} thumbnails salvas no banco")
+        return len(records)
+    except Exception as db_err:
+        print(f"[THUMBNAIL] ⚠ Erro ao salvar no banco: {db_err}")
+        session.rollback()
+        return 0
+    finally:
+        session.close()
+
+
 def generate_thumbnail_from_clip(
     clip_path: str,
     match_id: str,
     event_id: str = None,
     event_type: str = 'event',
-    minute: int = 0
+    minute: int = 0,
+    clip_duration: float = None
 ) -> str:
     """
     Extract a frame from a clip to use as thumbnail WITH styled overlay.
@@ -4610,221 +4777,47 @@ def generate_thumbnail_from_clip(
         event_id: Optional event ID
         event_type: Type of event for naming
         minute: Event minute for naming
+        clip_duration: Known clip duration in seconds (skips the FFprobe call)
     
     Returns:
         URL of the generated thumbnail or None
     """
     print(f"[THUMBNAIL] Iniciando geração - clip: {clip_path}, match: {match_id}, event_id: {event_id}, type: {event_type}, min: {minute}")
     
-    # Event type labels in Portuguese
-    EVENT_LABELS = {
-        'goal': 'GOL',
-        'shot': 'CHUTE',
-        'shot_on_target': 'CHUTE NO GOL',
-        'foul': 'FALTA',
-        'corner': 'ESCANTEIO',
-        'offside': 'IMPEDIMENTO',
-        'yellow_card': 'CARTÃO AMARELO',
-        'red_card': 'CARTÃO VERMELHO',
-        'substitution': 'SUBSTITUIÇÃO',
-        'penalty': 'PÊNALTI',
-        'free_kick': 'TIRO LIVRE',
-        'save': 'DEFESA',
-        'clearance': 'CORTE',
-        'tackle': 'DESARME',
-        'pass': 'PASSE',
-        'cross': 'CRUZAMENTO',
-        'interception': 'INTERCEPTAÇÃO',
-    }
-    
-    # Badge colors by event type (hex without #)
-    EVENT_COLORS = {
-        'goal': '10b981',        # Green
-        'shot': 'f59e0b',        # Orange
-        'shot_on_target': 'f59e0b',
-        'save': '3b82f6',        # Blue
-        'foul': 'ef4444',        # Red
-        'yellow_card': 'eab308', # Yellow
-        'red_card': 'dc2626',    # Dark red
-        'corner': '8b5cf6',      # Purple
-        'penalty': 'ec4899',     # Pink
-        'offside': '6366f1',     # Indigo
-    }
-    
     try:
         if not os.path.exists(clip_path):
             print(f"[THUMBNAIL] ⚠ Clip não existe: {clip_path}")
             return None
         
         # Get clip duration
-        clip_duration = get_video_duration_seconds(clip_path)
+        if not clip_duration:
+            clip_duration = get_video_duration_seconds(clip_path)
         if clip_duration <= 0:
             clip_duration = 5.0
             print(f"[THUMBNAIL] Usando duração padrão: {clip_duration}s")
         else:
             print(f"[THUMBNAIL] Duração do clip: {clip_duration}s")
         
-        # Extract frame at the middle of the clip
-        frame_time = clip_duration / 2
+        spec = _thumbnail_spec(match_id, event_id, event_type, minute)
+        print(f"[THUMBNAIL] Salvando em: {spec['path']}")
         
-        # Generate thumbnail filename
-        thumb_filename = f"thumb_{minute:02d}min-{event_type}"
-        if event_id:
-            thumb_filename += f"-{event_id[:8]}"
-        thumb_filename += ".jpg"
-        
-        # Get images folder path
-        images_folder = get_subfolder_path(match_id, 'images')
-        thumb_path = str(images_folder / thumb_filename)
-        temp_frame_path = str(images_folder / f"_temp_frame_{event_id[:8] if event_id else 'x'}.jpg")
-        print(f"[THUMBNAIL] Salvando em: {thumb_path}")
-        
-        # Get event label
-        event_label = EVENT_LABELS.get(event_type, event_type.upper().replace('_', ' '))
-        badge_color = EVENT_COLORS.get(event_type, '10b981')
-        
-        # Find available font - fallback for different systems
-        def get_available_font():
-            font_paths = [
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',  # Linux
-                '/usr/share/fonts/truetype/freefont/FreeSansBold.ttf',   # Linux fallback
-                '/System/Library/Fonts/Supplemental/Arial Bold.ttf',     # macOS
-                '/Library/Fonts/Arial Bold.ttf',                          # macOS alt
-                'C:\\Windows\\Fonts\\arialbd.ttf',                        # Windows
-                '/usr/share/fonts/TTF/DejaVuSans-Bold.ttf',              # Arch Linux
-            ]
-            for path in font_paths:
-                if os.path.exists(path):
-                    print(f"[THUMBNAIL] Usando fonte: {path}")
-                    return path
-            print("[THUMBNAIL] ⚠ Nenhuma fonte encontrada, usando padrão do FFmpeg")
+        # Extract frame at the middle of the clip
+        if not clip_cutter.render_thumbnail(clip_path, spec['path'], spec['label'], spec['color'], minute, clip_duration / 2):
             return None
         
-        font_path = get_available_font()
-        font_param = f":fontfile={font_path}" if font_path else ""
-        
-        # Build FFmpeg filter for styled overlay
-        # This creates: gradient bottom, event type badge (bottom-left), minute badge (bottom-right)
-        filters = []
-        
-        # 1. Bottom gradient overlay
-        filters.append(
-            "drawbox=x=0:y=ih-120:w=iw:h=120:color=black@0.5:t=fill"
-        )
-        
-        # 2. Event type badge (bottom-left)
-        # Background box
-        filters.append(
-            f"drawbox=x=20:y=ih-70:w=text_w+30:h=50:color=0x{badge_color}:t=fill"
-        )
-        
-        # 3. Event type text
-        # Using drawtext with escape
-        escaped_label = event_label.replace("'", "\\'").replace(":", "\\:")
-        filters.append(
-            f"drawtext=text='{escaped_label}':fontsize=28:fontcolor=white:x=35:y=ih-55{font_param}"
-        )
-        
-        # 4. Minute badge (bottom-right) 
-        # Black background with green accent
-        filters.append(
-            "drawbox=x=iw-100:y=ih-70:w=80:h=50:color=black@0.9:t=fill"
-        )
-        filters.append(
-            "drawbox=x=iw-100:y=ih-65:w=4:h=40:color=0x10b981:t=fill"
-        )
-        
-        # 5. Minute text
-        minute_text = f"{minute}'"
-        filters.append(
-            f"drawtext=text='{minute_text}':fontsize=32:fontcolor=white:x=iw-80:y=ih-55{font_param}"
-        )
-        
-        # Combine all filters
-        vf_string = ','.join(filters)
-        
-        # Extract frame with overlay using FFmpeg
-        cmd = [
-            'ffmpeg', '-y',
-            '-ss', str(frame_time),
-            '-i', clip_path,
-            '-vframes', '1',
-            '-q:v', '2',
-            '-vf', f'scale=1280:-1,{vf_string}',
-            thumb_path
-        ]
-        
-        print(f"[THUMBNAIL] Executando FFmpeg com overlay estilizado...")
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        
-        # If styled version fails, try simple extraction
-        if result.returncode != 0 or not os.path.exists(thumb_path):
-            print(f"[THUMBNAIL] ⚠ Overlay falhou, tentando extração simples...")
-            cmd_simple = [
-                'ffmpeg', '-y',
-                '-ss', str(frame_time),
-                '-i', clip_path,
-                '-vframes', '1',
-                '-q:v', '2',
-                '-vf', 'scale=1280:-1',
-                thumb_path
-            ]
-            result = subprocess.run(cmd_simple, capture_output=True, text=True, timeout=30)
-        
-        if result.returncode == 0 and os.path.exists(thumb_path):
-            thumb_size = os.path.getsize(thumb_path)
-            print(f"[THUMBNAIL] Arquivo gerado: {thumb_size/1024:.1f}KB")
-            
-            if thumb_size > 1000:  # At least 1KB
-                thumb_url = f"http://localhost:5000/api/storage/{match_id}/images/{thumb_filename}"
-                
-                # Save to database if event_id is provided
-                if event_id:
-                    try:
-                        session = get_session()
-                        
-                        # Check if thumbnail already exists
-                        existing = session.query(Thumbnail).filter_by(event_id=event_id).first()
-                        if existing:
-                            print(f"[THUMBNAIL] Atualizando thumbnail existente para evento {event_id}")
-                            existing.image_url = thumb_url
-                            existing.event_type = event_type
-                            existing.title = f"{event_label} - {minute}'"
-                        else:
-                            print(f"[THUMBNAIL] Criando novo thumbnail para evento {event_id}")
-                            thumbnail = Thumbnail(
-                                match_id=match_id,
-                                event_id=event_id,
-                                event_type=event_type,
-                                image_url=thumb_url,
-                                title=f"{event_label} - {minute}'"
-                            )
-                            session.add(thumbnail)
-                        
-                        session.commit()
-                        print(f"[THUMBNAIL] ✓ Salvo no banco: {thumb_url}")
-                        session.close()
-                    except Exception as db_err:
-                        print(f"[THUMBNAIL] ⚠ Erro ao salvar no banco: {db_err}")
-                        import traceback
-                        traceback.print_exc()
-                else:
-                    print(f"[THUMBNAIL] ⚠ event_id não fornecido, thumbnail não salvo no banco")
-                
-                print(f"[THUMBNAIL] ✓ Gerada com sucesso: {thumb_url}")
-                return thumb_url
-            else:
-                print(f"[THUMBNAIL] ⚠ Thumbnail muito pequena ({thumb_size} bytes), removendo")
-                os.remove(thumb_path)
+        if event_id:
+            save_thumbnail_records(match_id, [{
+                'event_id': event_id,
+                'event_type': event_type,
+                'image_url': spec['url'],
+                'title': spec['title']
+            }])
         else:
-            stderr_msg = result.stderr[:300] if result.stderr else 'Unknown error'
-            print(f"[THUMBNAIL] ⚠ FFmpeg falhou (code {result.returncode}): {stderr_msg}")
+            print(f"[THUMBNAIL] ⚠ event_id não fornecido, thumbnail não salvo no banco")
         
-        return None
+        print(f"[THUMBNAIL] ✓ Gerada com sucesso: {spec['url']}")
+        return spec['url']
         
-    except subprocess.TimeoutExpired:
-        print(f"[THUMBNAIL] ⚠ Timeout ao gerar thumbnail")
-        return None
     except Exception as e:
         print(f"[THUMBNAIL] Erro: {e}")
         import traceback
@@ -4843,7 +4836,8 @@ def extract_event_clips_auto(
     post_buffer: float = None,  # Agora opcional - usa categoria se None
     include_subtitles: bool = True,
     segment_start_minute: int = 0,
-    use_category_timings: bool = True  # Usar tempos por categoria de evento
+    use_category_timings: bool = True,  # Usar tempos por categoria de evento
+    on_progress: callable = None
 ) -> list:
     """
     Extract clips for all events automatically with category-based timing.
@@ -4860,6 +4854,7 @@ def extract_event_clips_auto(
         include_subtitles: Whether to add subtitles to clips
         segment_start_minute: The match minute where this video segment starts
         use_category_timings: If True, use EVENT_CLIP_CONFIG for each event type
+        on_progress: Optional callback(done, total) as clips finish post-processing
     
     Returns:
         List of extracted clip info dicts
@@ -4883,52 +4878,18 @@ def extract_event_clips_auto(
         if not events_list or len(events_list) < 2:
             return events_list, []
         
-        # Ordenar por timestamp (usar 'or 0' para tratar None)
-        sorted_events = sorted(events_list, key=lambda e: (e.get('minute') or 0) * 60 + (e.get('second') or 0))
-        
-        # Prioridade por tipo de evento (maior = mais importante)
-        priority = {'goal': 10, 'penalty': 9, 'red_card': 8, 'yellow_card': 7, 'save': 6, 'shot': 5, 'foul': 4}
-        
-        filtered = [sorted_events[0]]
-        filtered_out_ids = []
-        
-        for event in sorted_events[1:]:
-            event_type = event.get('event_type', '')
-            
-            # Eventos de alta prioridade SEMPRE passam (nunca são filtrados)
-            if event_type in HIGH_PRIORITY_TYPES:
-                print(f"[CLIP] ★ Evento {event_type} protegido - sempre gera clip (min {event.get('minute')}:{event.get('second', 0)})")
-                filtered.append(event)
-                continue
-            
-            last_event = filtered[-1]
-            last_time = (last_event.get('minute') or 0) * 60 + (last_event.get('second') or 0)
-            current_time = (event.get('minute') or 0) * 60 + (event.get('second') or 0)
-            
-            if current_time - last_time >= min_gap_seconds:
-                filtered.append(event)
-            else:
-                # Se o último evento é de alta prioridade, não substituir - apenas ignorar o atual
-                last_type = last_event.get('event_type', '')
-                if last_type in HIGH_PRIORITY_TYPES:
-                    print(f"[CLIP] Ignorando {event_type} duplicado (< {min_gap_seconds}s de {last_type} protegido)")
-                    if event.get('id'):
-                        filtered_out_ids.append(event.get('id'))
-                    continue
-                
-                # Se for um evento mais importante, substituir
-                event_priority = priority.get(event_type, 0)
-                last_priority = priority.get(last_type, 0)
-                if event_priority > last_priority:
-                    print(f"[CLIP] Substituindo {last_type} por {event_type} (mais relevante)")
-                    old_event = filtered[-1]
-                    if old_event.get('id'):
-                        filtered_out_ids.append(old_event.get('id'))
-                    filtered[-1] = event
-                else:
-                    print(f"[CLIP] Ignorando {event_type} duplicado (< {min_gap_seconds}s de {last_type})")
-                    if event.get('id'):
-                        filtered_out_ids.append(event.get('id'))
+        # Sweep-line global (um único bucket): compara com o último evento mantido,
+        # o mais prioritário vence; alta prioridade nunca é removida
+        filtered, removed = sweep_deduplicate(
+            events_list,
+            threshold_seconds=min_gap_seconds,
+            bucket_key=lambda e: 'all',
+            time_key=game_time_seconds,
+            policy='priority',
+            protected_types=HIGH_PRIORITY_TYPES,
+            log_prefix='[CLIP]'
+        )
+        filtered_out_ids = [e.get('id') for e in removed if e.get('id')]
         
         if len(events_list) != len(filtered):
             print(f"[CLIP] Filtrados {len(events_list) - len(filtered)} eventos duplicados ({len(events_list)} -> {len(filtered)})")
@@ -4973,6 +4934,7 @@ def extract_event_clips_auto(
     
     # Get actual video duration for validation
     video_duration = get_video_duration_seconds(video_path)
+    plans = []
     if video_duration > 0:
         print(f"[CLIP] Video duration: {video_duration:.1f}s ({video_duration/60:.1f}min), segment_start_minute: {segment_start_minute}")
     else:
@@ -5174,137 +5136,150 @@ def extract_event_clips_auto(
             clip_folder = get_clip_subfolder_path(match_id, half_type)
             clip_path = str(clip_folder / filename)
             
-            # Extract clip using FFmpeg
-            cmd = [
-                'ffmpeg', '-y',
-                '-ss', str(start_seconds),
-                '-i', video_path,
-                '-t', str(actual_duration),
-                '-c:v', 'libx264',
-                '-c:a', 'aac',
-                '-preset', 'fast',
-                '-crf', '23',
-                '-movflags', '+faststart',
-                clip_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            
-            if result.returncode == 0 and os.path.exists(clip_path):
-                # ═══════════════════════════════════════════════════════════════
-                # VERIFICAÇÃO DE INTEGRIDADE DO CLIP
-                # ═══════════════════════════════════════════════════════════════
-                file_size = os.path.getsize(clip_path)
-                
-                # Validar tamanho mínimo - clips < 50KB provavelmente corrompidos
-                if file_size < 50000:  # 50KB minimum
-                    print(f"[CLIP] ⚠ Clip muito pequeno ({file_size/1024:.1f}KB), removendo: {filename}")
-                    os.remove(clip_path)
-                    continue
-                
-                # Verificar duração real do clip gerado
-                actual_clip_duration = get_video_duration_seconds(clip_path)
-                if actual_clip_duration > 0:
-                    expected_min = actual_duration * 0.7  # Tolerância de 30%
-                    if actual_clip_duration < expected_min:
-                        print(f"[CLIP] ⚠ Duração incorreta ({actual_clip_duration:.1f}s vs {actual_duration:.1f}s esperado), regenerando")
-                        os.remove(clip_path)
-                        continue
-                    print(f"[CLIP] ✓ Duração verificada: {actual_clip_duration:.1f}s (esperado: {actual_duration:.1f}s)")
-                
-                # Aplicar legendas SEMPRE (garantir que todos os clips tenham legendas)
-                subtitled_path = clip_path.replace('.mp4', '_sub.mp4')
-                
-                # Determinar team name
-                team_name = None
-                if home_team and (home_team.lower() in description.lower() or 
-                                   any(w in description.lower() for w in home_team.lower().split()[:2])):
-                    team_name = home_team
-                elif away_team and (away_team.lower() in description.lower() or
-                                     any(w in description.lower() for w in away_team.lower().split()[:2])):
-                    team_name = away_team
-                
-                # Adicionar legenda com tipo do evento traduzido (fallback se não tiver descrição)
-                EVENT_TYPE_LABELS = {
-                    'goal': 'GOL', 'shot': 'CHUTE', 'shot_on_target': 'CHUTE NO GOL',
-                    'foul': 'FALTA', 'corner': 'ESCANTEIO', 'offside': 'IMPEDIMENTO',
-                    'yellow_card': 'CARTÃO AMARELO', 'red_card': 'CARTÃO VERMELHO',
-                    'substitution': 'SUBSTITUIÇÃO', 'penalty': 'PÊNALTI',
-                    'free_kick': 'TIRO LIVRE', 'save': 'DEFESA', 'clearance': 'CORTE',
-                    'tackle': 'DESARME', 'pass': 'PASSE', 'cross': 'CRUZAMENTO',
-                    'interception': 'INTERCEPTAÇÃO', 'high_press': 'PRESSÃO ALTA',
-                    'transition': 'TRANSIÇÃO', 'buildup': 'CONSTRUÇÃO'
-                }
-                event_label = EVENT_TYPE_LABELS.get(event_type, event_type.upper())
-                subtitle_text = description if description else event_label
-                
-                if add_subtitles_to_clip(
-                    clip_path, subtitled_path,
-                    subtitle_text, minute, event_type, team_name
-                ):
-                    # Substituir original pelo legendado
-                    os.replace(subtitled_path, clip_path)
-                    print(f"[CLIP] ✓ Legendas aplicadas: {filename}")
-                else:
-                    print(f"[CLIP] ⚠ Legendas falharam, mantendo clip original: {filename}")
-                
-                # Normalize half type for URL
-                half_normalized = 'first_half' if half_type == 'first' else 'second_half'
-                clip_url = f"http://localhost:5000/api/storage/{match_id}/clips/{half_normalized}/{filename}"
-                
-                clip_info = {
-                    'event_id': event.get('id'),  # Include event ID for database update
-                    'event_minute': minute,
-                    'event_type': event_type,
-                    'filename': filename,
-                    'path': clip_path,
-                    'url': clip_url,
-                    'half_type': half_normalized,
-                    'description': description
-                }
-                extracted.append(clip_info)
-                print(f"[CLIP] ✓ Extracted: {filename} ({file_size/1024:.1f}KB)")
-                
-                # ═══════════════════════════════════════════════════════════
-                # AUTO-GENERATE THUMBNAIL FROM CLIP
-                # ═══════════════════════════════════════════════════════════
-                thumbnail_url = None
-                try:
-                    thumbnail_url = generate_thumbnail_from_clip(
-                        clip_path=clip_path,
-                        match_id=match_id,
-                        event_id=event.get('id'),
-                        event_type=event_type,
-                        minute=minute
-                    )
-                    if thumbnail_url:
-                        clip_info['thumbnail_url'] = thumbnail_url
-                        print(f"[CLIP] ✓ Thumbnail gerada: {thumbnail_url}")
-                except Exception as thumb_err:
-                    print(f"[CLIP] ⚠ Erro ao gerar thumbnail: {thumb_err}")
-                
-                # Update event clip_url in database if event_id is present
-                event_id = event.get('id')
-                if event_id:
-                    session = get_session()
-                    try:
-                        db_event = session.query(MatchEvent).filter_by(id=event_id).first()
-                        if db_event:
-                            db_event.clip_url = clip_url
-                            db_event.clip_pending = False
-                            session.commit()
-                            print(f"[CLIP] ✓ Updated clip_url for event {event_id}")
-                    except Exception as db_err:
-                        print(f"[CLIP] ⚠ Error updating event: {db_err}")
-                    finally:
-                        session.close()
-            else:
-                print(f"[CLIP] ✗ Failed to extract clip for minute {minute}: {result.stderr[:200] if result.stderr else 'Unknown error'}")
+            # Clip é cortado depois, junto com os vizinhos (clip_cutter agrupa por proximidade)
+            plans.append({
+                'event': event,
+                'minute': minute,
+                'event_type': event_type,
+                'description': description,
+                'filename': filename,
+                'start': start_seconds,
+                'duration': actual_duration,
+                'output': clip_path
+            })
                 
         except Exception as e:
             print(f"[CLIP] Error extracting clip: {e}")
             continue
     
+    # ═══════════════════════════════════════════════════════════════
+    # CORTE + PÓS-PROCESSAMENTO EM PARALELO (media_pool)
+    # Corte em lote, depois legenda + thumbnail de cada clip nos
+    # workers; o clip_url é gravado aqui, em lotes, conforme os clips ficam
+    # prontos (o frontend não espera o tempo inteiro terminar)
+    # ═══════════════════════════════════════════════════════════════
+    # Adicionar legenda com tipo do evento traduzido (fallback se não tiver descrição)
+    EVENT_TYPE_LABELS = {
+        'goal': 'GOL', 'shot': 'CHUTE', 'shot_on_target': 'CHUTE NO GOL',
+        'foul': 'FALTA', 'corner': 'ESCANTEIO', 'offside': 'IMPEDIMENTO',
+        'yellow_card': 'CARTÃO AMARELO', 'red_card': 'CARTÃO VERMELHO',
+        'substitution': 'SUBSTITUIÇÃO', 'penalty': 'PÊNALTI',
+        'free_kick': 'TIRO LIVRE', 'save': 'DEFESA', 'clearance': 'CORTE',
+        'tackle': 'DESARME', 'pass': 'PASSE', 'cross': 'CRUZAMENTO',
+        'interception': 'INTERCEPTAÇÃO', 'high_press': 'PRESSÃO ALTA',
+        'transition': 'TRANSIÇÃO', 'buildup': 'CONSTRUÇÃO'
+    }
+    # Normalize half type for URL
+    half_normalized = 'first_half' if half_type == 'first' else 'second_half'
+    
+    CLIP_URL_FLUSH_EVERY = 5
+    jobs = []
+    thumbnail_records = []
+    finished_clips = {}
+    pending_clip_urls = {}
+    
+    def flush_clip_urls():
+        if not pending_clip_urls:
+            return
+        session = get_session()
+        try:
+            db_events = session.query(MatchEvent).filter(MatchEvent.id.in_(list(pending_clip_urls))).all()
+            for db_event in db_events:
+                db_event.clip_url = pending_clip_urls[db_event.id]
+                db_event.clip_pending = False
+            session.commit()
+            print(f"[CLIP] ✓ Updated clip_url for {len(db_events)} events")
+        except Exception as db_err:
+            print(f"[CLIP] ⚠ Error updating events: {db_err}")
+            session.rollback()
+        finally:
+            session.close()
+            pending_clip_urls.clear()
+    
+    def collect_clip(index: int, done: dict):
+        plan = jobs[index][0]
+        if not done or not done.get('ok'):
+            return
+        event = plan['event']
+        clip_url = f"http://localhost:5000/api/storage/{match_id}/clips/{half_normalized}/{plan['filename']}"
+        clip_info = {
+            'event_id': event.get('id'),  # Include event ID for database update
+            'event_minute': plan['minute'],
+            'event_type': plan['event_type'],
+            'filename': plan['filename'],
+            'path': plan['output'],
+            'url': clip_url,
+            'half_type': half_normalized,
+            'description': plan['description']
+        }
+        if done.get('thumbnail'):
+            clip_info['thumbnail_url'] = plan['thumbnail']['url']
+            thumbnail_records.append({
+                'event_id': event.get('id'),
+                'event_type': plan['event_type'],
+                'image_url': plan['thumbnail']['url'],
+                'title': plan['thumbnail']['title']
+            })
+        finished_clips[index] = clip_info
+        print(f"[CLIP] ✓ Extracted: {plan['filename']} ({done['size']/1024:.1f}KB)")
+        if clip_info['event_id']:
+            pending_clip_urls[clip_info['event_id']] = clip_url
+            if len(pending_clip_urls) >= CLIP_URL_FLUSH_EVERY:
+                flush_clip_urls()
+    
+    def report_progress(done: int, total: int):
+        if done == total or done % 5 == 0:
+            print(f"[CLIP] ⏳ Pós-processamento: {done}/{total} clips")
+        if on_progress:
+            on_progress(done, total)
+    
+    with media_pool.MediaPool(len(plans)) as pool:
+        # Sem smart cut: todo clip recebe a barra do evento (re-encode completo)
+        # em finish_clip, então o corte em lote já é o caminho mais barato
+        cut_results = clip_cutter.cut_clips(video_path, plans, smart=False, pool=pool)
+        
+        for plan in plans:
+            cut = cut_results.get(plan['output'], {})
+            if not cut.get('ok'):
+                print(f"[CLIP] ✗ Failed to extract clip for minute {plan['minute']}")
+                continue
+            
+            description = plan['description']
+            event_type = plan['event_type']
+            
+            # Determinar team name
+            team_name = None
+            if home_team and (home_team.lower() in description.lower() or 
+                               any(w in description.lower() for w in home_team.lower().split()[:2])):
+                team_name = home_team
+            elif away_team and (away_team.lower() in description.lower() or
+                                 any(w in description.lower() for w in away_team.lower().split()[:2])):
+                team_name = away_team
+            
+            plan['thumbnail'] = _thumbnail_spec(match_id, plan['event'].get('id'), event_type, plan['minute'])
+            jobs.append((plan, {
+                'output': plan['output'],
+                'duration': plan['duration'],
+                # Aplicar legendas SEMPRE (garantir que todos os clips tenham legendas)
+                'subtitle': {
+                    'header': _subtitle_header(plan['minute'], event_type, team_name),
+                    'description': description if description else EVENT_TYPE_LABELS.get(event_type, event_type.upper())
+                },
+                'thumbnail': {key: plan['thumbnail'][key] for key in ('path', 'label', 'color', 'minute')}
+            }))
+        
+        pool.map(
+            clip_cutter.finish_clip, [job for _, job in jobs],
+            on_progress=report_progress, label='clips', on_result=collect_clip
+        )
+    flush_clip_urls()
+    extracted.extend(finished_clips[index] for index in sorted(finished_clips))
+    
+    # ═══════════════════════════════════════════════════════════════
+    # GRAVAÇÕES NO BANCO EM LOTE: thumbnails (clip_url já gravado acima)
+    # ═══════════════════════════════════════════════════════════════
+    save_thumbnail_records(match_id, thumbnail_records)
+    
     # ═══════════════════════════════════════════════════════════════
     # SAFETY NET: Marcar eventos que falharam na geração como clip_pending=false
     # Isso evita que o frontend fique em polling infinito
@@ -6459,19 +6434,126 @@ def generate_podcast():
         return jsonify({'error': str(e)}), 500
 
 
+def _wants_stream(data: dict) -> bool:
+    """Client asked for a token stream (body 'stream': true or Accept: text/event-stream)."""
+    return bool(data.get('stream')) or 'text/event-stream' in (request.headers.get('Accept') or '')
+
+
+def _persist_chatbot_turn(match_id: str, team_name: str, team_type: str, user_message: str, reply: str, metrics: dict = None):
+    """Append user message + reply to the match's ChatbotConversation. Returns the conversation id."""
+    if not match_id:
+        return None
+    session = get_session()
+    try:
+        if not session.query(Match).filter_by(id=match_id).first():
+            return None
+        conversation = session.query(ChatbotConversation).filter_by(
+            match_id=match_id, team_name=team_name, team_type=team_type
+        ).first()
+        if not conversation:
+            conversation = ChatbotConversation(match_id=match_id, team_name=team_name, team_type=team_type, messages=[])
+            session.add(conversation)
+        now = datetime.utcnow().isoformat()
+        reply_entry = {'role': 'assistant', 'content': reply, 'timestamp': now}
+        if metrics:
+            reply_entry.update(metrics)
+        conversation.messages = list(conversation.messages or []) + [
+            {'role': 'user', 'content': user_message, 'timestamp': now},
+            reply_entry
+        ]
+        session.commit()
+        return conversation.id
+    except Exception as e:
+        session.rollback()
+        print(f"[Chatbot] ⚠ Erro ao salvar conversa: {e}")
+        return None
+    finally:
+        session.close()
+
+
+def _sse(data: dict, event: str = None) -> str:
+    payload = f"data: {json_module.dumps(data, ensure_ascii=False)}\n\n"
+    return f"event: {event}\n{payload}" if event else payload
+
+
+def _chatbot_sse_response(chunks, fallback_text: str, persist, voice: str = None):
+    """
+    Server-sent events for a chatbot reply: 'data: {"delta": ...}' per chunk,
+    then 'event: done' with the full text, ttftMs/totalMs and conversationId.
+    """
+    started = time_module.time()
+
+    def generate():
+        parts = []
+        ttft_ms = None
+        try:
+            for chunk in chunks:
+                if ttft_ms is None:
+                    ttft_ms = int((time_module.time() - started) * 1000)
+                    print(f"[Chatbot] ⚡ Primeiro token em {ttft_ms}ms")
+                parts.append(chunk)
+                yield _sse({'delta': chunk})
+        except GeneratorExit:
+            # Client disconnected: keep what was generated so far
+            if parts:
+                persist(''.join(parts), {'ttftMs': ttft_ms, 'partial': True})
+            raise
+        except Exception as e:
+            print(f"[Chatbot] ⚠ Erro no streaming: {e}")
+
+        text = ''.join(parts)
+        if not text:
+            text = fallback_text
+            yield _sse({'delta': text})
+        total_ms = int((time_module.time() - started) * 1000)
+        conversation_id = persist(text, {'ttftMs': ttft_ms, 'totalMs': total_ms})
+
+        audio_content = None
+        if voice and parts:
+            audio_bytes = ai_services.text_to_speech(text, voice)
+            if audio_bytes:
+                audio_content = base64.b64encode(audio_bytes).decode('utf-8')
+
+        print(f"[Chatbot] ✓ Resposta completa: {len(text)} chars, TTFT {ttft_ms}ms, total {total_ms}ms")
+        yield _sse({
+            'text': text,
+            'ttftMs': ttft_ms,
+            'totalMs': total_ms,
+            'conversationId': conversation_id,
+            'audioContent': audio_content
+        }, event='done')
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
 @app.route('/api/chatbot', methods=['POST'])
 def chatbot():
-    """Arena chatbot endpoint."""
+    """Arena chatbot endpoint. With 'stream': true responds with server-sent events."""
     data = request.json
     message = data.get('message')
     match_context = data.get('matchContext')
     conversation_history = data.get('conversationHistory', [])
+    match_id = data.get('matchId') or (match_context or {}).get('matchId')
     
     if not message:
         return jsonify({'error': 'Mensagem é obrigatória'}), 400
     
+    def persist(text, metrics=None):
+        return _persist_chatbot_turn(match_id, 'Arena Play', 'assistant', message, text, metrics)
+    
     try:
+        if _wants_stream(data):
+            chunks = ai_services.chatbot_response_stream(message, match_context, conversation_history)
+            return _chatbot_sse_response(
+                chunks, ai_services.CHATBOT_FALLBACK_REPLY, persist,
+                voice='nova' if data.get('withAudio') else None
+            )
+        
         response = ai_services.chatbot_response(message, match_context, conversation_history)
+        conversation_id = persist(response)
         
         # Generate TTS if requested
         audio_content = None
@@ -6482,7 +6564,8 @@ def chatbot():
         
         return jsonify({
             'text': response,
-            'audioContent': audio_content
+            'audioContent': audio_content,
+            'conversationId': conversation_id
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -6490,21 +6573,35 @@ def chatbot():
 
 @app.route('/api/team-chatbot', methods=['POST'])
 def team_chatbot():
-    """Team-specific chatbot endpoint."""
+    """Team-specific chatbot endpoint. With 'stream': true responds with server-sent events."""
     data = request.json
     message = data.get('message')
     team_name = data.get('teamName')
     team_type = data.get('teamType')
     match_context = data.get('matchContext')
     conversation_history = data.get('conversationHistory', [])
+    match_id = data.get('matchId') or (match_context or {}).get('matchId')
     
     if not message or not team_name:
         return jsonify({'error': 'Mensagem e teamName são obrigatórios'}), 400
     
+    def persist(text, metrics=None):
+        return _persist_chatbot_turn(match_id, team_name, team_type or 'home', message, text, metrics)
+    
     try:
+        if _wants_stream(data):
+            chunks = ai_services.team_chatbot_response_stream(
+                message, team_name, team_type, match_context, conversation_history
+            )
+            return _chatbot_sse_response(
+                chunks, ai_services.TEAM_CHATBOT_FALLBACK_REPLY, persist,
+                voice='echo' if data.get('withAudio') else None
+            )
+        
         response = ai_services.team_chatbot_response(
             message, team_name, team_type, match_context, conversation_history
         )
+        conversation_id = persist(response)
         
         audio_content = None
         if data.get('withAudio'):
@@ -6514,7 +6611,8 @@ def team_chatbot():
         
         return jsonify({
             'text': response,
-            'audioContent': audio_content
+            'audioContent': audio_content,
+            'conversationId': conversation_id
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -6756,14 +6854,7 @@ def upload_video_direct(match_id: str):
         # Detectar duração usando ffprobe
         duration_seconds = None
         try:
-            probe_result = subprocess.run([
-                'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                '-show_format', str(file_path)
-            ], capture_output=True, text=True, timeout=30)
-            
-            if probe_result.returncode == 0:
-                probe_data = json_module.loads(probe_result.stdout)
-                duration_seconds = int(float(probe_data.get('format', {}).get('duration', 0)))
+            duration_seconds = int(media_probe.get_duration(str(file_path))) or None
         except Exception as e:
             print(f"[upload-video] Erro ao detectar duração: {e}")
         
@@ -7104,10 +7195,12 @@ def transcribe_split_video_endpoint():
         return jsonify({'error': str(e)}), 500
 
 
-def _transcribe_video_part_direct(video_path: str, time_offset: float, minute_offset: float) -> dict:
+def _transcribe_video_part_direct(video_path: str, time_offset: float, minute_offset: float,
+                                  on_segments: callable = None) -> dict:
     """
     Transcribe a video part directly using FFmpeg + Whisper.
     Used as fallback when the main transcription method fails.
+    on_segments receives the part's segments shifted by time_offset (video time).
     """
     try:
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -7124,8 +7217,17 @@ def _transcribe_video_part_direct(video_path: str, time_offset: float, minute_of
             if result.returncode != 0 or not os.path.exists(audio_path):
                 return {'success': False, 'error': 'Failed to extract audio'}
             
+            def _shifted_segments(segments):
+                on_segments([
+                    dict(seg, start=seg['start'] + time_offset, end=seg['end'] + time_offset)
+                    for seg in segments
+                ])
+            
             # Transcribe with Whisper (uses Local Whisper priority chain)
-            transcription_result = ai_services.transcribe_audio_file(audio_path, match_id=None, language='pt')
+            transcription_result = ai_services.transcribe_audio_file(
+                audio_path, match_id=None, language='pt',
+                on_segments=_shifted_segments if on_segments else None
+            )
             
             if transcription_result.get('success'):
                 # Adjust timestamps by time_offset
@@ -7765,7 +7867,7 @@ def extract_clip_endpoint():
             return jsonify({'error': 'Falha ao baixar o vídeo'}), 500
         
         clip_path = os.path.join(tmpdir, 'clip.mp4')
-        if not extract_clip(input_path, clip_path, start_seconds, duration):
+        if not extract_clip(input_path, clip_path, start_seconds, duration, smart=False if include_vignettes else None):
             return jsonify({'error': 'Falha ao extrair clip'}), 500
         
         final_path = clip_path
@@ -7834,7 +7936,7 @@ def extract_batch_endpoint():
             
             clip_path = os.path.join(tmpdir, f'clip_{i}.mp4')
             
-            if extract_clip(input_path, clip_path, start_seconds, duration):
+            if extract_clip(input_path, clip_path, start_seconds, duration, smart=False if include_vignettes else None):
                 final_path = clip_path
                 
                 if include_vignettes:
@@ -8351,7 +8453,8 @@ def _split_video_parallel(video_path: str, num_parts: int, output_dir: str, half
         }
 
 
-def _transcribe_part_parallel(part_info: dict, half_type: str, match_id: str, minute_offset: float):
+def _transcribe_part_parallel(part_info: dict, half_type: str, match_id: str, minute_offset: float,
+                              on_segments: callable = None):
     """Transcribe a single video part - used by ThreadPoolExecutor."""
     try:
         part_path = part_info['path']
@@ -8368,7 +8471,7 @@ def _transcribe_part_parallel(part_info: dict, half_type: str, match_id: str, mi
               f"({file_size_mb:.1f} MB, estimativa: {file_size_mb * 0.3:.0f}-{file_size_mb * 0.6:.0f}s)")
         
         # Use direct transcription for local files
-        result = _transcribe_video_part_direct(part_path, part_start, minute_offset)
+        result = _transcribe_video_part_direct(part_path, part_start, minute_offset, on_segments=on_segments)
         
         if result.get('success') and result.get('text'):
             print(f"[ASYNC-TRANSCRIBE] Part {part_num}: CONCLUIDO - {len(result.get('text', ''))} chars")
@@ -8397,6 +8500,49 @@ def _transcribe_part_parallel(part_info: dict, half_type: str, match_id: str, mi
         }
 
 
+def _save_provisional_goals(match_id: str, match_half: str, goals: list):
+    """
+    Save goals found by IncrementalTranscript while Whisper is still running.
+    
+    Provisional rows make the goals visible to the event list early; PHASE 4
+    deletes this half's events before saving the final analysis, so they are
+    replaced, not duplicated.
+    """
+    if not goals:
+        return
+    session = get_session()
+    try:
+        for goal in goals:
+            session.add(MatchEvent(
+                match_id=match_id,
+                event_type='goal',
+                description=goal.get('description'),
+                minute=goal.get('game_minute', 0),
+                second=goal.get('second', 0),
+                match_half=match_half,
+                is_highlight=True,
+                event_metadata={
+                    'ai_generated': True,
+                    'provisional': True,
+                    'pipeline': 'early_detection',
+                    'team': goal.get('team'),
+                    'player': goal.get('player'),
+                    'isOwnGoal': goal.get('isOwnGoal', False),
+                    'confidence': goal.get('confidence'),
+                    'videoSecond': goal.get('videoSecond'),
+                    'detection_method': goal.get('detection_method'),
+                    'source_text': goal.get('source_text')
+                }
+            ))
+            print(f"[ASYNC-PIPELINE] ⚡ Gol antecipado: {goal.get('minute', 0):02d}:{goal.get('second', 0):02d} - {goal.get('team')}")
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"[ASYNC-PIPELINE] ⚠ Erro ao salvar gols antecipados: {e}")
+    finally:
+        session.close()
+
+
 def _process_match_pipeline(job_id: str, data: dict):
     """
     Main async processing pipeline.
@@ -8414,6 +8560,13 @@ def _process_match_pipeline(job_id: str, data: dict):
     
     start_time = time_module.time()
     
+    # Set by cancel_async_job; checked between phases
+    cancel_event = get_analysis_cancel_event(match_id)
+    
+    def check_cancelled():
+        if cancel_event.is_set():
+            raise validation_pool.ValidationCancelled()
+    
     print(f"\n{'='*60}")
     print(f"[ASYNC-PIPELINE] Starting job {job_id}")
     print(f"[ASYNC-PIPELINE] Match: {match_id}")
@@ -8779,6 +8932,8 @@ def _process_match_pipeline(job_id: str, data: dict):
                 else:
                     print(f"[ASYNC-PIPELINE] Full video is {full_duration/60:.1f} min — too short for split, processing as single block")
             
+            check_cancelled()
+            
             # ========== PHASE 2: PARALLEL SPLITTING (15%) ==========
             _update_async_job(job_id, 'splitting', 15, 'Dividindo vídeos...', 'splitting')
             
@@ -8944,7 +9099,11 @@ def _process_match_pipeline(job_id: str, data: dict):
                         print(f"[ASYNC-PIPELINE] ⚠ Erro obtendo duração: {dur_err}")
             
 
+            check_cancelled()
+            
             # ========== PHASE 3: TRANSCRIPTION (60%) ==========
+            # Early-detection sessions per half (only when Whisper runs here)
+            incrementals = {}
             # Check if we have pre-loaded transcriptions from frontend (skip Whisper)
             has_preloaded_first = bool(first_half_transcription and len(first_half_transcription.strip()) > 100)
             has_preloaded_second = bool(second_half_transcription and len(second_half_transcription.strip()) > 100)
@@ -9117,6 +9276,20 @@ def _process_match_pipeline(job_id: str, data: dict):
                 transcription_results = {'first': [], 'second': []}
                 completed_parts = 0
                 
+                # Stream finished Whisper segments of each half to a partial SRT +
+                # keyword detectors, so goals show up before the half is transcribed
+                for half_label in ('first', 'second'):
+                    if any(group['halfType'] == half_label for group in all_video_parts):
+                        incrementals[half_label] = IncrementalTranscript(
+                            home_team=home_team,
+                            away_team=away_team,
+                            half=half_label,
+                            segment_start_minute=0 if half_label == 'first' else 45,
+                            srt_path=str(get_subfolder_path(match_id, 'srt') / f'{half_label}_half.partial.srt'),
+                            on_events=lambda goals, _candidates, _half=half_label:
+                                _save_provisional_goals(match_id, f'{_half}_half', goals)
+                        )
+                
                 # Flatten all parts for parallel processing
                 all_parts_flat = []
                 for video_group in all_video_parts:
@@ -9147,7 +9320,10 @@ def _process_match_pipeline(job_id: str, data: dict):
                                     f'Transcrevendo parte {idx + 1}/{len(all_parts_flat)}{gpu_info}...',
                                     'transcribing', completed_parts, total_parts, parts_status)
                     
-                    result = _transcribe_part_parallel(part_info, half_type_part, match_id, minute_offset)
+                    result = _transcribe_part_parallel(
+                        part_info, half_type_part, match_id, minute_offset,
+                        on_segments=incrementals[half_type_part].add_segments
+                    )
                     completed_parts += 1
                     
                     # Update part status
@@ -9173,6 +9349,13 @@ def _process_match_pipeline(job_id: str, data: dict):
                                         f'Parte {completed_parts}/{len(all_parts_flat)} (erro)',
                                         'transcribing', completed_parts, total_parts, parts_status)
                 
+                for half_label, incremental in incrementals.items():
+                    summary = incremental.finalize()
+                    if summary['blocks']:
+                        print(f"[ASYNC-PIPELINE] ⚡ Detecção antecipada {half_label}: {len(summary['goals'])} gols, "
+                              f"{sum(len(v) for v in summary['candidates'].values())} candidatos "
+                              f"(primeiro evento após {summary['first_event_seconds']}s)")
+                
                 # Combine transcriptions from Whisper
                 first_half_text = '\n\n'.join([r['text'] for r in sorted(transcription_results['first'], key=lambda x: x['part'])])
                 second_half_text = '\n\n'.join([r['text'] for r in sorted(transcription_results['second'], key=lambda x: x['part'])])
@@ -9270,6 +9453,12 @@ def _process_match_pipeline(job_id: str, data: dict):
                     else:
                         print(f"[ASYNC-PIPELINE] ⚠ SRT não gerado para {half_label}: texto vazio após split")
             
+            # The partial SRTs stay readable until the final SRTs are on disk
+            for incremental in incrementals.values():
+                try:
+                    os.remove(incremental.srt_path)
+                except OSError:
+                    pass
             
             # ========== POST-TRANSCRIPTION AUDIO VERIFICATION ==========
             # Final safety net using ensure_audio_extracted (same method as manual process)
@@ -9279,6 +9468,8 @@ def _process_match_pipeline(job_id: str, data: dict):
             else:
                 print(f"[ASYNC-PIPELINE] ⚠️ AVISO: Nenhum áudio disponível após todas as tentativas")
 
+            check_cancelled()
+            
             # ========== PHASE 4: AI ANALYSIS (10%) ==========
             _update_async_job(job_id, 'analyzing', 80, 'Analisando com IA...', 'analyzing')
             
@@ -9451,6 +9642,8 @@ def _process_match_pipeline(job_id: str, data: dict):
             _update_async_job(job_id, 'analyzing', 90, f'{total_events} eventos detectados', 
                             'analyzing', events_detected=total_events)
             
+            check_cancelled()
+            
             # ========== PHASE 5: AUTO CLIPS (10%) ==========
             total_clips = 0
             if auto_clip and total_events > 0:
@@ -9483,9 +9676,11 @@ def _process_match_pipeline(job_id: str, data: dict):
                     for half_type, video_path in video_paths.items():
                         half_events = [e for e in events_data if e['match_half'] == f'{half_type}_half']
                         if half_events and os.path.exists(video_path):
+                            check_cancelled()
                             try:
                                 # ✅ Passar segment_start_minute correto para o segundo tempo
                                 segment_start = 45 if half_type == 'second' else 0
+                                half_label = '1º tempo' if half_type == 'first' else '2º tempo'
                                 clips = extract_event_clips_auto(
                                     match_id=match_id,
                                     video_path=video_path if not os.path.islink(video_path) else os.readlink(video_path),
@@ -9493,7 +9688,12 @@ def _process_match_pipeline(job_id: str, data: dict):
                                     half_type=half_type,
                                     home_team=home_team,
                                     away_team=away_team,
-                                    segment_start_minute=segment_start
+                                    segment_start_minute=segment_start,
+                                    on_progress=lambda done, total, clips_before=total_clips, half_label=half_label: _update_async_job(
+                                        job_id, 'clipping', 90 + int(9 * done / total),
+                                        f'Gerando clips ({half_label}): {done}/{total}', 'clipping',
+                                        clips_generated=clips_before + done
+                                    )
                                 )
                                 total_clips += len(clips)
                                 print(f"[ASYNC-PIPELINE] ✓ Clips {half_type}: {len(clips)}")
@@ -9502,6 +9702,8 @@ def _process_match_pipeline(job_id: str, data: dict):
                 finally:
                     session.close()
             
+            check_cancelled()
+            
             # ========== COMPLETE ==========
             elapsed = time_module.time() - start_time
             print(f"\n{'='*60}")
@@ -9563,6 +9765,9 @@ def _process_match_pipeline(job_id: str, data: dict):
             #     ...
             print(f"[ASYNC-PIPELINE] ℹ Cloud sync disabled - data saved locally only")
             
+    except validation_pool.ValidationCancelled:
+        print(f"[ASYNC-PIPELINE] 🛑 Job {job_id} cancelado pelo usuário")
+        _update_async_job(job_id, 'error', 0, 'Cancelado pelo usuário', 'error', error='Cancelado pelo usuário')
     except Exception as e:
         print(f"[ASYNC-PIPELINE] ✗ ERROR: {str(e)}")
         import traceback
@@ -9673,6 +9878,10 @@ def cancel_async_job(job_id):
             job.status = 'error'
             job.error_message = 'Cancelado pelo usuário'
             session.commit()
+            # Stop the pipeline at its next phase and drop pending vision/validation calls
+            cancel_event = analysis_cancel_events.get(job.match_id)
+            if cancel_event:
+                cancel_event.set()
         
         # Remove from in-memory tracker
         if job_id in async_processing_jobs:
@@ -10026,14 +10235,7 @@ def download_video_with_progress(url: str, output_path: str, job_id: str, match_
         # Detectar duração via ffprobe
         duration = None
         try:
-            result = subprocess.run([
-                'ffprobe', '-v', 'error',
-                '-show_entries', 'format=duration',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                output_path
-            ], capture_output=True, text=True, timeout=30)
-            if result.returncode == 0 and result.stdout.strip():
-                duration = int(float(result.stdout.strip()))
+            duration = int(media_probe.get_duration(output_path)) or None
         except Exception as e:
             print(f"[download-url] Não foi possível detectar duração: {e}")
         
@@ -13716,6 +13918,14 @@ def smart_import_transcribe():
         transcription_text = ''
         provider_used = None
 
+        # Tentativa 0: cache de transcrição (mesmo áudio já transcrito)
+        from transcription_cache import find_cached_transcription
+        cache_providers = (['gemini'] if gemini_available else []) + (['local_whisper'] if local_whisper_available else [])
+        cached = find_cached_transcription(audio_path, ai_services.get_transcription_cache_candidates(cache_providers))
+        if cached and cached.get('text', '').strip():
+            transcription_text = cached.get('text', '')
+            provider_used = f"{cached.get('provider')}_cache"
+
         # Tentativa 1: Gemini com áudio de 5 min
         if gemini_available and not transcription_text:
             print(f"[SmartImport] Tentativa 1: Gemini com áudio de {audio_size_mb:.1f}MB...")
@@ -13724,6 +13934,7 @@ def smart_import_transcribe():
                 if result.get('success') and result.get('text', '').strip():
                     transcription_text = result.get('text', '')
                     provider_used = 'gemini'
+                    ai_services.cache_transcription_result(audio_path, result)
                     print(f"[SmartImport] ✓ Gemini OK: {len(transcription_text)} chars")
             except Exception as e:
                 print(f"[SmartImport] ✗ Gemini falhou: {e}")
@@ -13736,6 +13947,7 @@ def smart_import_transcribe():
                 if result.get('success') and result.get('text', '').strip():
                     transcription_text = result.get('text', '')
                     provider_used = 'whisper_local'
+                    ai_services.cache_transcription_result(audio_path, result)
                     print(f"[SmartImport] ✓ Whisper Local OK: {len(transcription_text)} chars")
             except Exception as e:
                 print(f"[SmartImport] ✗ Whisper Local falhou: {e}")
@@ -13922,4 +14134,7 @@ Regras:
 
 if __name__ == '__main__':
     print_startup_status()
+    # Warm up Whisper in the serving process only (debug reloader spawns a child)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        ai_services.preload_whisper_model_async()
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -16,6 +16,9 @@ BASE_DIR = Path(os.environ.get('ARENA_BASE_DIR', os.path.dirname(__file__)))
 # Base storage directory - uses BASE_DIR for predictability
 STORAGE_DIR = Path(os.environ.get('ARENA_STORAGE_DIR', BASE_DIR / 'storage'))
 
+# Shared caches (transcriptions, probes...) - not a match folder
+CACHE_DIR = STORAGE_DIR / '_cache'
+
 # Subfolder types within each match folder
 MATCH_SUBFOLDERS = [
     "videos",    # Main match videos (full game, halves)
@@ -58,6 +61,13 @@ def init_storage():
     print(f"Storage initialized at: {STORAGE_DIR.absolute()}")
 
 
+def get_cache_dir(name: str) -> Path:
+    """Get or create a shared cache directory (storage/_cache/<name>)."""
+    cache_path = CACHE_DIR / name
+    cache_path.mkdir(parents=True, exist_ok=True)
+    return cache_path
+
+
 def get_match_storage_path(match_id: str) -> Path:
     """Get or create the storage path for a specific match."""
     match_path = STORAGE_DIR / match_id
@@ -358,7 +368,7 @@ def list_all_matches() -> list:
     
     matches = []
     for item in STORAGE_DIR.iterdir():
-        if item.is_dir():
+        if item.is_dir() and not item.name.startswith('_'):
             matches.append({
                 "match_id": item.name,
                 "path": str(item),
@@ -412,7 +422,7 @@ def get_storage_stats() -> dict:
     matches = []
     
     for match_dir in STORAGE_DIR.iterdir():
-        if match_dir.is_dir():
+        if match_dir.is_dir() and not match_dir.name.startswith('_'):
             match_stats = get_match_storage_stats(match_dir.name)
             if match_stats.get("exists"):
                 matches.append(match_stats)
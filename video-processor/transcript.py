@@ -0,0 +1,249 @@
+"""
+Transcript - SRT parsed once and shared by the text detectors.
+
+detect_events_by_keywords, detect_match_periods_from_transcription,
+refine_event_timestamp_from_srt, strip_srt_to_text and event_detector used to
+re-parse the same SRT (regex over the whole file, timestamp parsing, joins and
+lowercasing) on every call. A Transcript holds the parsed blocks, start/end
+arrays, one text buffer with per-block offsets, and lowercase/accent-folded
+and token views; every view is computed on first use. Detectors slice the
+views by offset instead of re-joining and re-normalizing every window.
+
+Instances are memoized in-process: load_transcript(path) by
+(realpath, size, mtime_ns) and get_transcript(content) by content.
+"""
+
+import os
+import re
+import bisect
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import cached_property
+from typing import Optional, List, Tuple
+
+# Same block layout detect_events_by_keywords always parsed:
+# "1\n00:24:45,000 --> 00:24:50,000\nText here\n\n"
+_SRT_BLOCK_RE = re.compile(
+    r'(\d+)\n(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}),(\d{3})\n(.+?)(?=\n\n|\Z)',
+    re.DOTALL
+)
+_SRT_TIMESTAMP_LINE_RE = re.compile(r'\d{2}:\d{2}:\d{2}[,.]\d{3}\s*-->\s*\d{2}:\d{2}:\d{2}[,.]\d{3}')
+_SRT_ARROW_RE = re.compile(r'(\d{2}:\d{2}:\d{2}[,.]\d{3})\s*-->')
+_BLOCK_NUMBER_RE = re.compile(r'^\d+$')
+_TOKEN_STRIP_RE = re.compile(r'[^\w\s]')
+_SPACES_RE = re.compile(r'\s+')
+
+_CACHE_SIZE = 8
+_cache_lock = threading.Lock()
+_path_cache: "OrderedDict[Tuple[str, int, int], Transcript]" = OrderedDict()
+_content_cache: "OrderedDict[str, Transcript]" = OrderedDict()
+
+
+def _timestamp_to_seconds(ts: str) -> float:
+    """HH:MM:SS,mmm (or .mmm) -> seconds."""
+    try:
+        parts = ts.replace(',', '.').split(':')
+        return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
+    except (ValueError, IndexError):
+        return 0.0
+
+
+def fold_accents(text: str) -> str:
+    """Remove accents keeping one output char per input char (offsets stay valid)."""
+    table = {}
+    for ch in set(text):
+        if ord(ch) < 128:
+            continue
+        base = unicodedata.normalize('NFKD', ch)[0]
+        if base != ch:
+            table[ord(ch)] = base
+    return text.translate(table) if table else text
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words with punctuation stripped (the goal-token tokenization)."""
+    t = _TOKEN_STRIP_RE.sub(' ', text.lower().replace('…', '...'))
+    t = _SPACES_RE.sub(' ', t).strip()
+    return t.split(' ') if t else []
+
+
+class Transcript:
+    """
+    Parsed SRT (or plain text) transcript.
+
+    blocks: tuples (index, hours, minutes, seconds, ms, text) - the format
+            detect_goals_by_sliding_window and detect_events_by_keywords use
+    starts / ends: block times in seconds
+    lines: one line per block (or per non-empty line of plain text)
+    text: lines joined by ' ', offsets[i] = start of line i in text
+    lower / folded: lowercase (and accent-folded) text, same offsets
+    tokens: per-line tokens (see tokenize)
+    """
+
+    def __init__(self, raw: str, source_path: Optional[str] = None):
+        self.raw = raw or ''
+        self.source_path = source_path
+
+    @cached_property
+    def is_srt(self) -> bool:
+        return any(_SRT_TIMESTAMP_LINE_RE.search(line) for line in self.raw.strip().split('\n')[:20])
+
+    @cached_property
+    def _parsed(self):
+        blocks = []
+        starts = []
+        ends = []
+        for m in _SRT_BLOCK_RE.finditer(self.raw):
+            hours, minutes, seconds, ms = int(m.group(2)), int(m.group(3)), int(m.group(4)), int(m.group(5))
+            blocks.append((int(m.group(1)), hours, minutes, seconds, ms, m.group(10).replace('\n', ' ').strip()))
+            starts.append(hours * 3600 + minutes * 60 + seconds + ms / 1000.0)
+            ends.append(int(m.group(6)) * 3600 + int(m.group(7)) * 60 + int(m.group(8)) + int(m.group(9)) / 1000.0)
+        return blocks, starts, ends
+
+    @property
+    def blocks(self) -> List[Tuple]:
+        return self._parsed[0]
+
+    @property
+    def starts(self) -> List[float]:
+        return self._parsed[1]
+
+    @property
+    def ends(self) -> List[float]:
+        return self._parsed[2]
+
+    @cached_property
+    def lines(self) -> List[str]:
+        """One line per block (SRT) or the non-empty lines of a plain-text transcript."""
+        if self.is_srt:
+            return [b[5] for b in self.blocks]
+        return [ln.strip() for ln in self.raw.splitlines() if ln.strip()]
+
+    @cached_property
+    def offsets(self) -> List[int]:
+        offsets = []
+        pos = 0
+        for line in self.lines:
+            offsets.append(pos)
+            pos += len(line) + 1
+        return offsets
+
+    @cached_property
+    def text(self) -> str:
+        return ' '.join(self.lines)
+
+    @cached_property
+    def lower(self) -> str:
+        lower = self.text.lower()
+        if len(lower) != len(self.text):
+            # A few chars (e.g. 'İ') grow when lowercased: keep them so offsets stay valid
+            lower = ''.join(ch if len(ch.lower()) != 1 else ch.lower() for ch in self.text)
+        return lower
+
+    @cached_property
+    def folded(self) -> str:
+        """Lowercase, accent-folded view aligned with text (same offsets)."""
+        return fold_accents(self.lower)
+
+    @cached_property
+    def tokens(self) -> List[List[str]]:
+        return [tokenize(line) for line in self.lines]
+
+    @cached_property
+    def plain_text(self) -> str:
+        """Same output as strip_srt_to_text: SRT without numbers/timestamps, joined by spaces."""
+        if not self.is_srt:
+            return self.raw
+        text_lines = []
+        for line in self.raw.strip().split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            if _BLOCK_NUMBER_RE.match(line):
+                continue
+            if _SRT_TIMESTAMP_LINE_RE.search(line):
+                continue
+            text_lines.append(line)
+        return ' '.join(text_lines)
+
+    @cached_property
+    def _arrows(self):
+        """Every 'HH:MM:SS,mmm -->' in raw: (starts, ends, seconds)."""
+        starts, ends, seconds = [], [], []
+        for m in _SRT_ARROW_RE.finditer(self.raw):
+            starts.append(m.start())
+            ends.append(m.end())
+            seconds.append(_timestamp_to_seconds(m.group(1)))
+        return starts, ends, seconds
+
+    # ------------------------------------------------------------------
+    def timestamp_before(self, raw_index: int, lookback: int = 500, lookahead: int = 0) -> Optional[float]:
+        """
+        Start time of the last SRT timestamp lying entirely inside
+        raw[raw_index - lookback : raw_index + lookahead] (None if none).
+        """
+        starts, ends, seconds = self._arrows
+        lo = max(0, raw_index - lookback)
+        hi = min(len(self.raw), raw_index + lookahead)
+        pos = bisect.bisect_right(ends, hi) - 1
+        if pos >= 0 and starts[pos] >= lo:
+            return seconds[pos]
+        return None
+
+    def block_index_at(self, seconds: float) -> int:
+        """Index of the last block starting at or before `seconds` (-1 if none)."""
+        return bisect.bisect_right(self.starts, seconds) - 1
+
+    def blocks_between(self, start_seconds: float, end_seconds: float) -> range:
+        """Indices of blocks starting within [start_seconds, end_seconds]."""
+        return range(bisect.bisect_left(self.starts, start_seconds), bisect.bisect_right(self.starts, end_seconds))
+
+    def line_at_offset(self, offset: int) -> int:
+        """Line/block index containing a character offset of `text`."""
+        return max(0, bisect.bisect_right(self.offsets, offset) - 1)
+
+    def window_text(self, start: int, end: int, view: str = 'text') -> str:
+        """
+        Lines [start, end) joined by ' ' - a slice of text/lower/folded,
+        equal to ' '.join(lines[start:end]) in that view.
+        """
+        if start >= end:
+            return ''
+        return getattr(self, view)[self.offsets[start]:self.offsets[end - 1] + len(self.lines[end - 1])]
+
+
+def get_transcript(content: str) -> Transcript:
+    """Transcript for an SRT/text string (memoized by content)."""
+    content = content or ''
+    with _cache_lock:
+        transcript = _content_cache.get(content)
+        if transcript is not None:
+            _content_cache.move_to_end(content)
+            return transcript
+        transcript = Transcript(content)
+        _content_cache[content] = transcript
+        while len(_content_cache) > _CACHE_SIZE:
+            _content_cache.popitem(last=False)
+        return transcript
+
+
+def load_transcript(srt_path: str) -> Transcript:
+    """Transcript for an SRT file (memoized until the file changes). Raises OSError."""
+    real = os.path.realpath(srt_path)
+    st = os.stat(real)
+    key = (real, st.st_size, st.st_mtime_ns)
+    with _cache_lock:
+        transcript = _path_cache.get(key)
+        if transcript is not None:
+            _path_cache.move_to_end(key)
+            return transcript
+
+    with open(real, 'r', encoding='utf-8') as f:
+        transcript = Transcript(f.read(), source_path=real)
+
+    with _cache_lock:
+        _path_cache[key] = transcript
+        while len(_path_cache) > _CACHE_SIZE:
+            _path_cache.popitem(last=False)
+    return transcript
@@ -0,0 +1,197 @@
+"""
+Transcription cache - content-addressed by audio hash.
+
+Entries are keyed by (sha256 of the audio bytes, provider, model, language)
+and stored under storage/_cache/transcriptions/<key>/ as:
+  transcription.srt, transcription.txt, segments.json, meta.json
+Every transcription entry point checks the cache before running a provider,
+so re-analysing a match skips the transcription stage.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+from storage import get_cache_dir
+
+CACHE_VERSION = 2
+CACHE_ENABLED = os.environ.get('TRANSCRIPTION_CACHE_ENABLED', 'true').lower() == 'true'
+
+# In-process memo of file hashes: (realpath, size, mtime_ns) -> sha256
+_hash_memo: Dict[Tuple[str, int, int], str] = {}
+_hash_lock = threading.Lock()
+
+
+def _cache_root() -> Path:
+    return get_cache_dir('transcriptions')
+
+
+def audio_content_hash(audio_path: str) -> Optional[str]:
+    """SHA-256 of the audio file contents (memoized by path, size and mtime)."""
+    try:
+        real_path = os.path.realpath(audio_path)
+        st = os.stat(real_path)
+    except OSError:
+        return None
+    
+    memo_key = (real_path, st.st_size, st.st_mtime_ns)
+    with _hash_lock:
+        if memo_key in _hash_memo:
+            return _hash_memo[memo_key]
+    
+    digest = hashlib.sha256()
+    with open(real_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    audio_hash = digest.hexdigest()
+    
+    with _hash_lock:
+        _hash_memo[memo_key] = audio_hash
+    return audio_hash
+
+
+def make_cache_key(audio_hash: str, provider: str, model: str, language: str = 'pt') -> str:
+    """Cache key for one (audio, provider, model, language) combination."""
+    raw = f"v{CACHE_VERSION}|{audio_hash}|{provider}|{model or ''}|{language or ''}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:40]
+
+
+def _entry_dir(key: str) -> Path:
+    return _cache_root() / key[:2] / key
+
+
+def get_cached_transcription(
+    audio_path: str,
+    provider: str,
+    model: str,
+    language: str = 'pt'
+) -> Optional[Dict[str, Any]]:
+    """
+    Load a cached transcription for this audio/provider/model/language.
+    
+    Returns:
+        Dict in the same shape as the transcription functions
+        ('success', 'text', 'srtContent', 'segments', 'provider', 'model')
+        with 'cached': True, or None on miss.
+    """
+    if not CACHE_ENABLED:
+        return None
+    
+    audio_hash = audio_content_hash(audio_path)
+    if not audio_hash:
+        return None
+    
+    entry = _entry_dir(make_cache_key(audio_hash, provider, model, language))
+    meta_path = entry / 'meta.json'
+    if not meta_path.exists():
+        return None
+    
+    try:
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        segments_path = entry / 'segments.json'
+        return {
+            'success': True,
+            'text': (entry / 'transcription.txt').read_text(encoding='utf-8'),
+            'srtContent': (entry / 'transcription.srt').read_text(encoding='utf-8'),
+            'segments': json.loads(segments_path.read_text(encoding='utf-8')) if segments_path.exists() else [],
+            'provider': meta.get('provider', provider),
+            'model': meta.get('model', model),
+            'cached': True,
+            'cacheKey': entry.name
+        }
+    except Exception as e:
+        print(f"[TranscriptionCache] ⚠ Entrada inválida {entry.name}: {e}")
+        return None
+
+
+def find_cached_transcription(
+    audio_path: str,
+    candidates: List[Tuple[str, str]],
+    language: str = 'pt'
+) -> Optional[Dict[str, Any]]:
+    """Return the first cache hit among (provider, model) candidates, in order."""
+    for provider, model in candidates:
+        cached = get_cached_transcription(audio_path, provider, model, language)
+        if cached:
+            print(f"[TranscriptionCache] ✓ Cache hit ({provider}/{model}): {len(cached.get('text', ''))} chars")
+            return cached
+    return None
+
+
+def store_transcription(
+    audio_path: str,
+    result: Dict[str, Any],
+    provider: str,
+    model: str,
+    language: str = 'pt'
+) -> bool:
+    """Store a successful transcription result. Writes atomically (tmp dir + rename)."""
+    if not CACHE_ENABLED or not result or not result.get('success') or result.get('cached'):
+        return False
+    if not (result.get('text') or '').strip():
+        return False
+    
+    audio_hash = audio_content_hash(audio_path)
+    if not audio_hash:
+        return False
+    
+    key = make_cache_key(audio_hash, provider, model, language)
+    entry = _entry_dir(key)
+    tmp_entry = entry.parent / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+    
+    try:
+        tmp_entry.mkdir(parents=True, exist_ok=True)
+        (tmp_entry / 'transcription.txt').write_text(result.get('text', ''), encoding='utf-8')
+        (tmp_entry / 'transcription.srt').write_text(result.get('srtContent', '') or '', encoding='utf-8')
+        (tmp_entry / 'segments.json').write_text(
+            json.dumps(result.get('segments') or [], ensure_ascii=False), encoding='utf-8'
+        )
+        (tmp_entry / 'meta.json').write_text(json.dumps({
+            'version': CACHE_VERSION,
+            'audioHash': audio_hash,
+            'audioSize': os.path.getsize(audio_path),
+            'provider': provider,
+            'model': model,
+            'language': language,
+            'createdAt': datetime.utcnow().isoformat()
+        }, indent=2), encoding='utf-8')
+        
+        if entry.exists():
+            shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp_entry, entry)
+        print(f"[TranscriptionCache] ✓ Salvo ({provider}/{model}): {key}")
+        return True
+    except Exception as e:
+        print(f"[TranscriptionCache] ⚠ Erro ao salvar cache: {e}")
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        return False
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Entry count and total size of the transcription cache."""
+    root = _cache_root()
+    entries = 0
+    total_size = 0
+    for meta_path in root.glob('*/*/meta.json'):
+        entries += 1
+        total_size += sum(f.stat().st_size for f in meta_path.parent.iterdir() if f.is_file())
+    return {
+        'enabled': CACHE_ENABLED,
+        'entries': entries,
+        'size_mb': round(total_size / (1024 * 1024), 2),
+        'path': str(root)
+    }
+
+
+def clear_transcription_cache() -> int:
+    """Remove every cached transcription. Returns number of entries removed."""
+    root = _cache_root()
+    removed = len(list(root.glob('*/*/meta.json')))
+    shutil.rmtree(root, ignore_errors=True)
+    root.mkdir(parents=True, exist_ok=True)
+    return removed
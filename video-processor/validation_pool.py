@@ -0,0 +1,111 @@
+"""
+Validation pool - bounded-concurrency execution of per-candidate AI calls.
+
+Refining/validating event candidates used to make one blocking model call per
+candidate, in sequence (30+ calls per half). map_bounded() runs them on a
+thread pool instead, with a per-provider concurrency limit: a local Ollama
+serves one or two generations at a time, while cloud APIs take several.
+
+- Limits are shared by every caller (module-level semaphores), so two
+  pipelines running at once do not double the load on a provider
+- Results come back in input order (None for failed/skipped items)
+- Cancellation: pass a threading.Event; once it is set, items that have not
+  started are dropped and ValidationCancelled is raised to the caller
+
+Usage:
+    results = validation_pool.map_bounded(refine_one, events, provider='lovable')
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from typing import Callable, Dict, Iterable, List, Optional, Any
+
+# Max concurrent calls per provider
+PROVIDER_LIMITS = {
+    'ollama': int(os.environ.get('VALIDATION_CONCURRENCY_OLLAMA', '2') or 2),
+    'lovable': int(os.environ.get('VALIDATION_CONCURRENCY_CLOUD', '4') or 4),
+    'gemini': int(os.environ.get('VALIDATION_CONCURRENCY_CLOUD', '4') or 4),
+    'openai': int(os.environ.get('VALIDATION_CONCURRENCY_CLOUD', '4') or 4),
+}
+DEFAULT_LIMIT = 2
+
+_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+class ValidationCancelled(Exception):
+    """Raised by map_bounded when its cancel event is set before all items ran."""
+
+
+def get_limit(provider: str) -> int:
+    return max(1, PROVIDER_LIMITS.get(provider, DEFAULT_LIMIT))
+
+
+def _get_semaphore(provider: str) -> threading.BoundedSemaphore:
+    semaphore = _semaphores.get(provider)
+    if semaphore is None:
+        with _semaphores_lock:
+            semaphore = _semaphores.setdefault(provider, threading.BoundedSemaphore(get_limit(provider)))
+    return semaphore
+
+
+def map_bounded(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    provider: str,
+    cancel_event: Optional[threading.Event] = None,
+    label: str = 'validação'
+) -> List[Any]:
+    """
+    Run fn(item) for every item with at most get_limit(provider) calls in flight.
+
+    Args:
+        fn: Called once per item (exceptions are logged, result becomes None)
+        items: Candidates, in the order results should be returned
+        provider: 'ollama', 'lovable', 'gemini' or 'openai' (selects the limit)
+        cancel_event: Optional threading.Event; when set, pending items are
+            skipped and ValidationCancelled is raised
+        label: Name used in log messages
+
+    Returns:
+        List with one result per item, in input order
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    limit = get_limit(provider)
+    semaphore = _get_semaphore(provider)
+    results: List[Any] = [None] * len(items)
+
+    def run(index: int):
+        with semaphore:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ValidationCancelled()
+            try:
+                results[index] = fn(items[index])
+            except ValidationCancelled:
+                raise
+            except Exception as e:
+                print(f"[ValidationPool] ⚠ {label} #{index + 1} falhou: {e}")
+
+    print(f"[ValidationPool] 🚦 {len(items)} itens de {label} ({provider}, até {limit} em paralelo)")
+    executor = ThreadPoolExecutor(max_workers=min(limit, len(items)), thread_name_prefix=f'validation-{provider}')
+    try:
+        futures = [executor.submit(run, index) for index in range(len(items))]
+        pending = futures
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_EXCEPTION)
+            cancelled = (cancel_event is not None and cancel_event.is_set()) or any(
+                isinstance(f.exception(), ValidationCancelled) for f in done if not f.cancelled()
+            )
+            if cancelled:
+                for future in pending:
+                    future.cancel()
+                print(f"[ValidationPool] 🛑 {label} cancelada ({sum(1 for f in futures if f.done() and not f.cancelled())}/{len(items)} concluídos)")
+                raise ValidationCancelled()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
@@ -0,0 +1,162 @@
+"""
+Arena Play - Whisper model pool
+Keeps loaded faster-whisper models in memory with LRU eviction under a
+memory budget, and supports background warm-up at server start.
+
+The PM2 config restarts the backend at 2G, so loading a second model on top
+of the first must evict the least-recently-used one instead of growing RSS.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Tuple, Callable
+
+# Pool limits (configurable via env or set_pool_limits)
+MAX_MODELS = int(os.environ.get('LOCAL_WHISPER_MAX_MODELS', '1') or 1)
+MEMORY_BUDGET_MB = int(os.environ.get('LOCAL_WHISPER_MEMORY_BUDGET_MB', '1500') or 1500)
+
+# Approximate resident size (MB) per model, used before the first load of a
+# model to decide what to evict. Real sizes are measured after loading.
+_ESTIMATED_SIZE_MB = {
+    'tiny': 120, 'base': 200, 'small': 600, 'medium': 1600,
+    'large': 3200, 'large-v1': 3200, 'large-v2': 3200, 'large-v3': 3200,
+    'turbo': 1700, 'large-v3-turbo': 1700, 'distil-large-v3': 1600,
+}
+
+_lock = threading.RLock()
+_load_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+_models: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+_preload_state: Dict[str, Any] = {'status': 'idle'}
+
+
+def set_pool_limits(max_models: int = None, memory_budget_mb: int = None):
+    """Update pool limits at runtime (from settings)."""
+    global MAX_MODELS, MEMORY_BUDGET_MB
+    if max_models is not None and max_models > 0:
+        MAX_MODELS = max_models
+    if memory_budget_mb is not None and memory_budget_mb > 0:
+        MEMORY_BUDGET_MB = memory_budget_mb
+
+
+def _current_rss_mb() -> float:
+    """Resident set size of this process in MB (0 if unavailable)."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        return 0.0
+
+
+def _estimate_size_mb(model_name: str, compute_type: str) -> float:
+    base = _ESTIMATED_SIZE_MB.get(model_name, 1000)
+    return base * (1.5 if compute_type in ('float16', 'float32') else 1.0)
+
+
+def _evict_for(incoming_mb: float):
+    """Evict least-recently-used models until the incoming model fits. Caller holds _lock."""
+    while _models:
+        used = sum(entry['resident_mb'] for entry in _models.values())
+        if len(_models) < MAX_MODELS and used + incoming_mb <= MEMORY_BUDGET_MB:
+            return
+        key, entry = _models.popitem(last=False)
+        print(f"[WhisperPool] ♻️ Removendo modelo '{key[0]}' ({key[1]}) da memória (LRU, {entry['resident_mb']:.0f}MB)")
+    import gc
+    gc.collect()
+
+
+def get_model(
+    model_name: str,
+    device: str,
+    compute_type: str,
+    loader: Callable[[str, str, str], Any]
+) -> Any:
+    """
+    Return a loaded model, loading it with loader(model_name, device, compute_type)
+    on a miss. Marks the model as most recently used.
+    """
+    key = (model_name, device, compute_type)
+    with _lock:
+        entry = _models.get(key)
+        if entry:
+            _models.move_to_end(key)
+            entry['last_used'] = time.time()
+            entry['hits'] += 1
+            return entry['model']
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    # Serialize loads of the same model (e.g. warm-up racing a request)
+    with load_lock:
+        with _lock:
+            entry = _models.get(key)
+            if entry:
+                _models.move_to_end(key)
+                entry['last_used'] = time.time()
+                entry['hits'] += 1
+                return entry['model']
+            _evict_for(_estimate_size_mb(model_name, compute_type))
+
+        print(f"[WhisperPool] Carregando modelo '{model_name}' ({device}/{compute_type})...")
+        rss_before = _current_rss_mb()
+        started = time.time()
+        model = loader(model_name, device, compute_type)
+        load_seconds = time.time() - started
+        resident_mb = max(_current_rss_mb() - rss_before, 0) or _estimate_size_mb(model_name, compute_type)
+        print(f"[WhisperPool] ✓ Modelo '{model_name}' carregado em {load_seconds:.1f}s (~{resident_mb:.0f}MB)")
+
+        with _lock:
+            _models[key] = {
+                'model': model,
+                'model_name': model_name,
+                'device': device,
+                'compute_type': compute_type,
+                'load_seconds': round(load_seconds, 2),
+                'resident_mb': round(resident_mb, 1),
+                'loaded_at': time.time(),
+                'last_used': time.time(),
+                'hits': 0
+            }
+            _models.move_to_end(key)
+        return model
+
+
+def preload_async(model_name: str, load_fn: Callable[[str], Any]) -> threading.Thread:
+    """Warm up a model in a daemon thread; load_fn(model_name) does the actual load."""
+    def _run():
+        _preload_state.update({'status': 'loading', 'model': model_name, 'started_at': time.time()})
+        try:
+            load_fn(model_name)
+            _preload_state.update({'status': 'ready', 'finished_at': time.time()})
+        except Exception as e:
+            print(f"[WhisperPool] ⚠ Falha no pré-carregamento de '{model_name}': {e}")
+            _preload_state.update({'status': 'error', 'error': str(e), 'finished_at': time.time()})
+
+    thread = threading.Thread(target=_run, name=f'whisper-preload-{model_name}', daemon=True)
+    thread.start()
+    return thread
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Loaded models (load time, resident size, usage), limits and warm-up status."""
+    with _lock:
+        models = [
+            {k: v for k, v in entry.items() if k != 'model'}
+            for entry in reversed(_models.values())
+        ]
+    return {
+        'models': models,
+        'loaded': len(models),
+        'max_models': MAX_MODELS,
+        'memory_budget_mb': MEMORY_BUDGET_MB,
+        'resident_mb': round(sum(m['resident_mb'] for m in models), 1),
+        'process_rss_mb': round(_current_rss_mb(), 1),
+        'preload': dict(_preload_state)
+    }